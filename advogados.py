@@ -0,0 +1,168 @@
+"""
+Cadastro dos advogados acompanhados e planejamento das consultas à API DJEN
+Fonte definida por ADVOGADOS_FONTE: 'config' (ADVOGADO_NOME/REGISTROS_OAB),
+'arquivo' (JSON em ADVOGADOS_ARQUIVO) ou 'tabela' (TABELA_ADVOGADOS no Supabase)
+"""
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from config import ADVOGADO_NOME, REGISTROS_OAB, ADVOGADOS_FONTE, ADVOGADOS_ARQUIVO
+from indice_invertido import normalizar
+
+logger = logging.getLogger(__name__)
+
+
+def gerar_id_advogado(nome: str) -> str:
+    """
+    Identificador estável a partir do nome ("Eduardo Koetz" -> "eduardo-koetz")
+    """
+    return re.sub(r'[^a-z0-9]+', '-', normalizar(nome)).strip('-')
+
+
+class Advogado:
+    """
+    Advogado acompanhado: nome e registros OAB consultados na API
+    """
+
+    def __init__(self, id: str, nome: str, registros_oab: Optional[List[Dict]] = None, ativo: bool = True):
+        self.id = id
+        self.nome = nome
+        self.registros_oab = registros_oab or []
+        self.ativo = ativo
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'Advogado':
+        """
+        Args:
+            dados: {'id' (opcional), 'nome', 'registros_oab': [{'numero', 'uf'}], 'ativo'}
+
+        Returns:
+            Advogado: Advogado do cadastro
+        """
+        return cls(
+            id=dados.get('id') or gerar_id_advogado(dados['nome']),
+            nome=dados['nome'],
+            registros_oab=[
+                {'numero': str(r['numero']), 'uf': r['uf'].upper()} for r in dados.get('registros_oab') or []
+            ],
+            ativo=dados.get('ativo', True)
+        )
+
+    def para_dict(self) -> Dict:
+        return {'id': self.id, 'nome': self.nome, 'registros_oab': self.registros_oab, 'ativo': self.ativo}
+
+    def consultas(self) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: Parâmetros de busca da API (nome e cada registro OAB)
+        """
+        return [{'nomeAdvogado': self.nome}] + [
+            {'numeroOab': r['numero'], 'ufOab': r['uf']} for r in self.registros_oab
+        ]
+
+
+def advogado_padrao() -> Advogado:
+    """
+    Returns:
+        Advogado: Advogado configurado em ADVOGADO_NOME/REGISTROS_OAB
+    """
+    return Advogado.de_dict({'nome': ADVOGADO_NOME, 'registros_oab': REGISTROS_OAB})
+
+
+def carregar_advogados(fonte: str = ADVOGADOS_FONTE, supabase_client=None) -> List[Advogado]:
+    """
+    Carrega os advogados ativos do cadastro configurado
+    Em caso de erro ou cadastro vazio, volta ao advogado padrão do config.
+
+    Args:
+        fonte: 'config', 'arquivo' ou 'tabela'
+        supabase_client: SupabaseClient (fonte 'tabela')
+
+    Returns:
+        List[Advogado]: Advogados ativos
+    """
+    try:
+        if fonte == 'arquivo':
+            with open(ADVOGADOS_ARQUIVO, encoding='utf-8') as arquivo:
+                registros = json.load(arquivo)
+        elif fonte == 'tabela' and supabase_client is not None:
+            registros = supabase_client.obter_advogados()
+        else:
+            return [advogado_padrao()]
+
+        advogados = [a for a in map(Advogado.de_dict, registros) if a.ativo]
+    except Exception as e:
+        logger.error(f"❌ Erro ao carregar cadastro de advogados ({fonte}): {e}")
+        advogados = []
+
+    if not advogados:
+        logger.warning("⚠️ Cadastro de advogados vazio: usando ADVOGADO_NOME/REGISTROS_OAB")
+        return [advogado_padrao()]
+
+    return advogados
+
+
+def chave_consulta(consulta: Dict) -> Tuple:
+    """
+    Chave de deduplicação de uma consulta (nome sem acentos ou OAB/UF)
+    """
+    if 'nomeAdvogado' in consulta:
+        return ('nome', normalizar(consulta['nomeAdvogado']).strip())
+    return ('oab', consulta['numeroOab'].lstrip('0'), consulta['ufOab'].upper())
+
+
+def planejar_consultas(advogados: List[Advogado]) -> List[Tuple[Dict, List[str]]]:
+    """
+    Une as consultas de todos os advogados, executando uma única vez as repetidas
+    (ex.: mesmo registro OAB cadastrado em dois advogados do escritório)
+
+    Args:
+        advogados: Advogados acompanhados
+
+    Returns:
+        List[Tuple[Dict, List[str]]]: (parâmetros da consulta, ids dos advogados atendidos)
+    """
+    planejadas: Dict[Tuple, Tuple[Dict, List[str]]] = {}
+    for advogado in advogados:
+        for consulta in advogado.consultas():
+            _, ids = planejadas.setdefault(chave_consulta(consulta), (consulta, []))
+            if advogado.id not in ids:
+                ids.append(advogado.id)
+    return list(planejadas.values())
+
+
+def mesclar_resultados(consultas: List[Tuple[Dict, List[str]]],
+                       resultados: List[Tuple[bool, List[Dict]]]) -> Tuple[bool, List[Dict], Dict[str, List[str]]]:
+    """
+    Mescla os items das consultas na ordem planejada, deduplicando por ID e
+    vinculando cada item a todos os advogados cujas consultas o retornaram
+
+    Args:
+        consultas: Saída de planejar_consultas
+        resultados: (sucesso, items) de cada consulta, na mesma ordem
+
+    Returns:
+        Tuple[bool, List[Dict], Dict[str, List[str]]]: (sucesso geral, items únicos,
+            ids dos advogados por id_intimacao)
+    """
+    todas_intimacoes = []
+    vinculos: Dict[str, List[str]] = {}
+    sucesso_geral = True
+
+    for (consulta, ids_advogados), (sucesso, items) in zip(consultas, resultados):
+        if not sucesso:
+            sucesso_geral = False
+            logger.warning(f"Falha na busca {consulta.get('nomeAdvogado') or consulta.get('numeroOab')}")
+
+        for item in items:
+            id_intimacao = str(item['id'])
+            vinculados = vinculos.get(id_intimacao)
+            if vinculados is None:
+                vinculos[id_intimacao] = list(ids_advogados)
+                todas_intimacoes.append(item)
+            else:
+                vinculados.extend(i for i in ids_advogados if i not in vinculados)
+
+    return sucesso_geral, todas_intimacoes, vinculos
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Agendador de extrações automáticas do DJEN
+Pode rodar embutido no api_server (modo desenvolvimento) ou como processo
+próprio (modo produção). Os agendamentos ficam na tabela TABELA_AGENDAMENTOS
+(expressão cron, próxima execução, última execução) e cada execução toma um
+lease no banco, de modo que apenas uma instância execute cada job mesmo com
+vários hosts. Um lock de arquivo evita loops redundantes no mesmo host.
+"""
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import config
+from metricas import AGENDADOR_ATRASO, AGENDADOR_ULTIMA
+
+logger = logging.getLogger('djen_extractor')
+
+# Mantém o arquivo de lock aberto enquanto o processo for líder
+_arquivo_lock = None
+
+NOMES_CAMPOS_CRON = ('minuto', 'hora', 'dia', 'mês', 'dia da semana')
+LIMITES_CRON = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class ExpressaoCron:
+    """
+    Expressão cron de 5 campos (minuto hora dia mês dia-da-semana)
+    Aceita '*', listas '1,15', faixas '8-18' e passos '*/30' ou '8-18/2';
+    dia da semana 0-7 (0 e 7 = domingo). Dia do mês e dia da semana
+    restritos ao mesmo tempo valem como "ou", como no cron tradicional.
+    """
+
+    def __init__(self, expressao: str):
+        campos = expressao.split()
+        if len(campos) != 5:
+            raise ValueError(f"Expressão cron deve ter 5 campos: '{expressao}'")
+
+        self.expressao = expressao
+        conjuntos = [self._interpretar(campo, nome, limites)
+                     for campo, nome, limites in zip(campos, NOMES_CAMPOS_CRON, LIMITES_CRON)]
+        self.minutos, self.horas, self.dias, self.meses, dias_semana = conjuntos
+        self.dias_semana = {d % 7 for d in dias_semana}
+        self.dia_restrito = campos[2] != '*'
+        self.semana_restrita = campos[4] != '*'
+
+    @staticmethod
+    def _interpretar(campo: str, nome: str, limites: Tuple[int, int]) -> Set[int]:
+        minimo, maximo = limites
+        valores = set()
+        for parte in campo.split(','):
+            faixa, _, passo = parte.partition('/')
+            if faixa == '*':
+                inicio, fim = minimo, maximo
+            elif '-' in faixa:
+                inicio, fim = (int(v) for v in faixa.split('-', 1))
+            else:
+                inicio = fim = int(faixa)
+                if passo:
+                    fim = maximo
+            if not (minimo <= inicio <= fim <= maximo):
+                raise ValueError(f"Campo {nome} fora do intervalo {minimo}-{maximo}: '{parte}'")
+            valores.update(range(inicio, fim + 1, int(passo) if passo else 1))
+        return valores
+
+    def _dia_valido(self, momento: datetime) -> bool:
+        no_dia = momento.day in self.dias
+        na_semana = (momento.weekday() + 1) % 7 in self.dias_semana
+        if self.dia_restrito and self.semana_restrita:
+            return no_dia or na_semana
+        return no_dia and na_semana
+
+    def proxima(self, apos: datetime) -> datetime:
+        """
+        Próximo instante que satisfaz a expressão, estritamente depois de `apos`
+
+        Args:
+            apos: Instante de referência
+
+        Returns:
+            datetime: Próxima ocorrência (mesmo fuso de `apos`)
+        """
+        momento = (apos + timedelta(minutes=1)).replace(second=0, microsecond=0)
+        limite = momento + timedelta(days=366 * 5)
+
+        while momento < limite:
+            if momento.month not in self.meses:
+                ano, mes = divmod(momento.month, 12)
+                momento = momento.replace(year=momento.year + ano, month=mes + 1, day=1, hour=0, minute=0)
+            elif not self._dia_valido(momento):
+                momento = (momento + timedelta(days=1)).replace(hour=0, minute=0)
+            elif momento.hour not in self.horas:
+                momento = (momento + timedelta(hours=1)).replace(minute=0)
+            elif momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+            else:
+                return momento
+
+        raise ValueError(f"Expressão cron sem ocorrências: '{self.expressao}'")
+
+
+def cron_do_horario(horario: str) -> str:
+    """
+    Converte AGENDADOR_HORARIO ('06:00') na expressão cron diária equivalente
+    """
+    hora, minuto = (int(parte) for parte in horario.split(':')[:2])
+    return f"{minuto} {hora} * * *"
+
+
+def agendamentos_padrao() -> List[Dict]:
+    """
+    Agendamentos criados na primeira execução (não sobrescrevem os do banco)
+
+    Returns:
+        List[Dict]: Extração diária, retenção diária (cria também as partições
+        futuras dos logs) e, se configurados, a incremental intradiária e o
+        reenvio dos webhooks
+    """
+    agendamentos = [{
+        'nome': 'extracao_diaria',
+        'tipo': 'extracao',
+        'cron': cron_do_horario(config.AGENDADOR_HORARIO),
+        'parametros': {'dias': config.DIAS_BUSCA},
+        'jitter_segundos': config.AGENDADOR_JITTER_SEGUNDOS,
+        'recuperar_perdidas': True
+    }, {
+        'nome': 'retencao',
+        'tipo': 'retencao',
+        'cron': '15 3 * * *',
+        'parametros': {},
+        'jitter_segundos': 0,
+        'recuperar_perdidas': False
+    }]
+    if config.AGENDADOR_INCREMENTAL_CRON:
+        agendamentos.append({
+            'nome': 'extracao_incremental',
+            'tipo': 'extracao',
+            'cron': config.AGENDADOR_INCREMENTAL_CRON,
+            'parametros': {'dias': 0},
+            'jitter_segundos': config.AGENDADOR_JITTER_SEGUNDOS,
+            'recuperar_perdidas': False
+        })
+    if config.WEBHOOK_URLS:
+        agendamentos.append({
+            'nome': 'reenvio_webhooks',
+            'tipo': 'webhooks',
+            'cron': '* * * * *',
+            'parametros': {},
+            'jitter_segundos': 0,
+            'recuperar_perdidas': False
+        })
+    return agendamentos
+
+
+def _instante(valor) -> Optional[datetime]:
+    """
+    Timestamp do banco (ISO com fuso) como datetime local
+    """
+    if not valor:
+        return None
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor.replace('Z', '+00:00'))
+    return valor.astimezone()
+
+
+def adquirir_lideranca(caminho: str = config.AGENDADOR_LOCK_FILE) -> bool:
+    """
+    Tenta se tornar a instância líder do agendador neste host
+
+    Args:
+        caminho: Caminho do arquivo de lock
+
+    Returns:
+        bool: True se esta instância deve rodar o loop do agendador
+    """
+    global _arquivo_lock
+
+    if _arquivo_lock is not None:
+        return True
+
+    if fcntl is None:
+        logger.warning("⚠️ Lock de arquivo indisponível nesta plataforma - assumindo instância única")
+        return True
+
+    arquivo = open(caminho, 'a+')
+    try:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        arquivo.close()
+        return False
+
+    arquivo.seek(0)
+    arquivo.truncate()
+    arquivo.write(str(os.getpid()))
+    arquivo.flush()
+
+    _arquivo_lock = arquivo
+    return True
+
+
+def salvar_status_agendador(extras: Optional[Dict] = None):
+    """
+    Grava o estado do agendador em disco para consulta pelos workers da API
+
+    Args:
+        extras: Campos adicionais (ex.: agendamentos, resultado da última execução)
+    """
+    status = ler_status_agendador()
+    status.update({
+        'pid': os.getpid(),
+        'atualizado_em': datetime.now().isoformat()
+    })
+    if extras:
+        status.update(extras)
+
+    try:
+        caminho_tmp = f"{config.AGENDADOR_STATUS_FILE}.tmp"
+        with open(caminho_tmp, 'w', encoding='utf-8') as f:
+            json.dump(status, f, ensure_ascii=False, default=str)
+        os.replace(caminho_tmp, config.AGENDADOR_STATUS_FILE)
+    except OSError as e:
+        logger.error(f"Erro ao gravar status do agendador: {e}")
+
+
+def ler_status_agendador() -> Dict:
+    """
+    Lê o estado gravado pela instância líder do agendador
+
+    Returns:
+        Dict: Status do agendador ou dict vazio se não houver
+    """
+    try:
+        with open(config.AGENDADOR_STATUS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Agendador:
+    """
+    Executa os agendamentos vencidos da tabela de agendamentos
+
+    A cada ciclo, para cada agendamento com proxima_execucao no passado:
+    toma o lease no banco (só uma instância consegue), executa a tarefa
+    cobrindo o período desde a última execução (recuperação de execuções
+    perdidas) e grava a próxima execução com jitter aleatório.
+    """
+
+    def __init__(self, extractor, cliente=None, dono: Optional[str] = None):
+        """
+        Args:
+            extractor: DJENExtractor usado nas extrações
+            cliente: SupabaseClient com a tabela de agendamentos (padrão: o do extractor)
+            dono: Identificação desta instância no lease (padrão: host:pid)
+        """
+        self.extractor = extractor
+        self.cliente = cliente or extractor.supabase_client
+        self.dono = dono or f"{socket.gethostname()}:{os.getpid()}"
+        self.tarefas: Dict[str, Callable[[Dict, Tuple[str, str]], Dict]] = {
+            'extracao': self._executar_extracao,
+            'webhooks': self._executar_webhooks,
+            'retencao': self._executar_retencao
+        }
+        self.agendamentos: List[Dict] = []
+
+    def registrar_tarefa(self, tipo: str, funcao: Callable[[Dict, Tuple[str, str]], Dict]):
+        """
+        Registra um novo tipo de tarefa agendável
+
+        Args:
+            tipo: Valor da coluna 'tipo' dos agendamentos
+            funcao: Recebe o agendamento e o período (data_inicio, data_fim) e devolve o relatório
+        """
+        self.tarefas[tipo] = funcao
+
+    def criar_padrao(self):
+        """
+        Cria no banco os agendamentos padrão ausentes (os existentes não são alterados)
+        """
+        self.cliente.registrar_agendamentos(agendamentos_padrao())
+
+    def sincronizar(self) -> List[Dict]:
+        """
+        Recarrega a tabela de agendamentos e preenche a próxima execução dos novos
+
+        Returns:
+            List[Dict]: Agendamentos ativos
+        """
+        agora = datetime.now().astimezone()
+
+        agendamentos = []
+        for agendamento in self.cliente.listar_agendamentos():
+            if not agendamento.get('ativo', True):
+                continue
+            if not agendamento.get('proxima_execucao'):
+                proxima = self._calcular_proxima(agendamento, agora)
+                self.cliente.atualizar_agendamento(
+                    agendamento['nome'], {'proxima_execucao': proxima.isoformat()}, somente_sem_proxima=True
+                )
+                agendamento['proxima_execucao'] = proxima.isoformat()
+            agendamentos.append(agendamento)
+
+        self.agendamentos = agendamentos
+        return agendamentos
+
+    @staticmethod
+    def _calcular_proxima(agendamento: Dict, apos: datetime) -> datetime:
+        proxima = ExpressaoCron(agendamento['cron']).proxima(apos)
+        jitter = agendamento.get('jitter_segundos') or 0
+        return proxima + timedelta(seconds=random.uniform(0, jitter)) if jitter else proxima
+
+    @staticmethod
+    def calcular_periodo(agendamento: Dict, hoje: date) -> Tuple[str, str]:
+        """
+        Período de busca da execução: os `dias` do agendamento até hoje, estendido
+        para trás até a última execução com sucesso quando houve execuções perdidas ou com erro
+        (limitado a AGENDADOR_RECUPERACAO_MAX_DIAS)
+
+        Args:
+            agendamento: Linha da tabela de agendamentos
+            hoje: Data de referência
+
+        Returns:
+            Tuple[str, str]: (data_inicio, data_fim) no formato YYYY-MM-DD
+        """
+        dias = int((agendamento.get('parametros') or {}).get('dias', config.DIAS_BUSCA))
+        inicio = hoje - timedelta(days=dias)
+
+        ultima = _instante(agendamento.get('ultima_execucao'))
+        if agendamento.get('recuperar_perdidas') and ultima:
+            inicio = min(inicio, ultima.date())
+
+        inicio = max(inicio, hoje - timedelta(days=config.AGENDADOR_RECUPERACAO_MAX_DIAS))
+        return inicio.isoformat(), hoje.isoformat()
+
+    def _executar_extracao(self, agendamento: Dict, periodo: Tuple[str, str]) -> Dict:
+        data_inicio, data_fim = periodo
+        return self.extractor.executar_extracao_diaria(data_inicio=data_inicio, data_fim=data_fim)
+
+    def _executar_webhooks(self, agendamento: Dict, periodo: Tuple[str, str]) -> Dict:
+        # Novas tentativas das entregas que falharam (as recentes saem logo após a ingestão)
+        if not self.extractor.webhooks:
+            return {'status_execucao': 'sucesso'}
+        resultado = self.extractor.webhooks.despachar()
+        return {'status_execucao': 'sucesso' if not resultado['falhas'] else 'parcial', **resultado}
+
+    def _executar_retencao(self, agendamento: Dict, periodo: Tuple[str, str]) -> Dict:
+        from retencao import executar_retencao
+        parametros = agendamento.get('parametros') or {}
+        return executar_retencao(
+            self.cliente,
+            logs_dias=int(parametros.get('logs_dias', config.RETENCAO_LOGS_DIAS)),
+            payloads_dias=int(parametros.get('payloads_dias', config.RETENCAO_PAYLOADS_DIAS))
+        )
+
+    def executar_pendentes(self) -> int:
+        """
+        Executa os agendamentos vencidos que esta instância conseguir travar
+
+        Returns:
+            int: Agendamentos executados
+        """
+        agora = datetime.now().astimezone()
+        executados = 0
+
+        for agendamento in self.agendamentos:
+            proxima = _instante(agendamento.get('proxima_execucao'))
+            if proxima is None or proxima > agora:
+                continue
+
+            # O lease só é concedido se o job ainda estiver vencido e livre
+            travado = self.cliente.adquirir_agendamento(
+                agendamento['nome'], self.dono, config.AGENDADOR_LEASE_SEGUNDOS
+            )
+            if not travado:
+                logger.info(f"ℹ️ Agendamento '{agendamento['nome']}' já em execução ou executado por outra instância")
+                continue
+
+            self._executar(travado, agora)
+            executados += 1
+
+        return executados
+
+    def _executar(self, agendamento: Dict, agora: datetime):
+        """
+        Executa um agendamento travado por esta instância e libera o lease
+        """
+        nome = agendamento['nome']
+        previsto = _instante(agendamento['proxima_execucao'])
+        atraso = max(0.0, (agora - previsto).total_seconds())
+        perdidas = ExpressaoCron(agendamento['cron']).proxima(previsto) <= agora
+
+        atualizacao = {}
+        try:
+            if perdidas and not agendamento.get('recuperar_perdidas'):
+                logger.info(f"⏭️ Agendamento '{nome}' atrasado {atraso:.0f}s sem recuperação - pulando para a próxima")
+                atualizacao['ultimo_status'] = 'ignorado'
+            else:
+                periodo = self.calcular_periodo(agendamento, agora.date())
+                logger.info(f"🕐 Executando agendamento '{nome}' ({agendamento['cron']}) "
+                            f"período {periodo[0]} a {periodo[1]}, atraso {atraso:.0f}s")
+
+                # Métricas e arquivo de status descrevem a extração; webhooks (a cada minuto)
+                # e retenção não podem mascarar uma extração atrasada
+                tipo = agendamento.get('tipo', 'extracao')
+                if tipo == 'extracao':
+                    AGENDADOR_ATRASO.definir(atraso)
+                    AGENDADOR_ULTIMA.definir(time.time())
+
+                resultado = self.tarefas[tipo](agendamento, periodo)
+                status = resultado.get('status_execucao', 'sucesso')
+
+                logger.info(f"✅ Agendamento '{nome}' concluído: {status}")
+
+                atualizacao['ultimo_status'] = status
+                # ultima_execucao ancora a recuperação (calcular_periodo): só avança com sucesso,
+                # senão a janela de uma execução com erro ou parcial não seria buscada de novo
+                if status == 'sucesso':
+                    atualizacao['ultima_execucao'] = agora.isoformat()
+                if tipo == 'extracao':
+                    salvar_status_agendador({
+                        'ultima_execucao': agora.isoformat(),
+                        'ultimo_status': status,
+                        'ultimo_agendamento': nome,
+                        'atraso_segundos': atraso
+                    })
+
+        except Exception as e:
+            logger.error(f"❌ Erro no agendamento '{nome}': {e}")
+            atualizacao['ultimo_status'] = 'erro'
+
+        finally:
+            atualizacao['proxima_execucao'] = self._calcular_proxima(agendamento, datetime.now().astimezone()).isoformat()
+            self.cliente.liberar_agendamento(nome, self.dono, atualizacao)
+            logger.info(f"📅 Próxima execução de '{nome}': {atualizacao['proxima_execucao']}")
+
+    def resumo(self) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: Estado dos agendamentos (para /scheduler/status)
+        """
+        campos = ('nome', 'tipo', 'cron', 'proxima_execucao', 'ultima_execucao', 'ultimo_status', 'bloqueado_por')
+        return [{campo: agendamento.get(campo) for campo in campos} for agendamento in self.agendamentos]
+
+    def loop(self):
+        """
+        Loop bloqueante: sincroniza com o banco, executa os vencidos e dorme
+        até o próximo vencimento (no máximo AGENDADOR_INTERVALO_SEGUNDOS)
+        """
+        while True:
+            try:
+                self.sincronizar()
+                if self.executar_pendentes():
+                    self.sincronizar()
+
+                proximas = [_instante(a['proxima_execucao']) for a in self.agendamentos if a.get('proxima_execucao')]
+                salvar_status_agendador({
+                    'dono': self.dono,
+                    'agendamentos': self.resumo(),
+                    'jobs_agendados': len(self.agendamentos),
+                    'proxima_execucao': min(proximas).isoformat() if proximas else None
+                })
+
+                espera = config.AGENDADOR_INTERVALO_SEGUNDOS
+                if proximas:
+                    ate_proxima = (min(proximas) - datetime.now().astimezone()).total_seconds()
+                    espera = min(espera, max(1.0, ate_proxima))
+            except Exception as e:
+                logger.error(f"❌ Erro no ciclo do agendador: {e}")
+                espera = config.AGENDADOR_INTERVALO_SEGUNDOS
+
+            time.sleep(espera)
+
+
+def iniciar_agendador(extractor):
+    """
+    Inicializa o agendador de extrações automáticas (loop bloqueante)
+
+    Args:
+        extractor: Instância de DJENExtractor usada nas execuções
+    """
+    try:
+        if not adquirir_lideranca():
+            logger.info("ℹ️ Outra instância já executa o agendador neste host - este processo não agendará extrações")
+            return
+
+        agendador = Agendador(extractor)
+        agendador.criar_padrao()
+        agendamentos = agendador.sincronizar()
+
+        for agendamento in agendamentos:
+            logger.info(f"📅 Agendamento '{agendamento['nome']}': {agendamento['cron']} "
+                        f"(próxima: {agendamento.get('proxima_execucao')})")
+            print(f"📅 Agendamento '{agendamento['nome']}': {agendamento['cron']}")
+
+        agendador.loop()
+
+    except Exception as e:
+        logger.error(f"❌ Erro no agendador: {e}")
+        print(f"❌ Erro no agendador: {e}")
+
+
+def main():
+    """Executa o agendador como processo próprio (modo produção)"""
+    from djen_extractor import criar_extractor
+    from logging_config import setup_logging
+
+    setup_logging()
+
+    print("📅 Iniciando processo do agendador DJEN...")
+
+    if not adquirir_lideranca():
+        print("❌ Já existe um agendador em execução neste host")
+        sys.exit(1)
+
+    try:
+        extractor = criar_extractor()
+    except Exception as e:
+        logger.error(f"❌ Erro ao inicializar extrator: {e}")
+        print(f"❌ Falha ao inicializar sistema DJEN: {e}")
+        sys.exit(1)
+
+    try:
+        iniciar_agendador(extractor)
+    except KeyboardInterrupt:
+        print("\n🛑 Agendador interrompido pelo usuário")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,21 +6,29 @@ Servidor API simples para integração com N8N webhook
 
 import os
 import sys
-from datetime import datetime
-from flask import Flask, jsonify, request, send_from_directory
+from datetime import date, datetime, timedelta
+from flask import Flask, Response, g, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 import threading
 import logging
-import schedule
 import time
+import uuid
 
 # Adicionar o diretório atual ao path para importar módulos
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Importar módulos do projeto
-from djen_extractor import DJENExtractor
+from djen_extractor import criar_extractor
 import config
+import agendador
+import exportacao
+import metricas
+from componentes import aquecer, componentes_prontos
 from logging_config import setup_logging
+from perfil_consultas import PERFIL, requisicao_atual
+from advogados import carregar_advogados
+from indice_invertido import gerar_trecho, tokenizar
+from text_processor import normalizar_numero_processo
 
 # Configurar Flask
 app = Flask(__name__)
@@ -37,14 +45,42 @@ logger = setup_logging()
 extractor = None
 
 def inicializar_extractor():
-    """Inicializar o extrator DJEN"""
+    """Inicializar o extrator DJEN (clientes criados sob demanda e aquecidos em segundo plano)"""
     global extractor
     try:
-        extractor = DJENExtractor()
+        extractor = criar_extractor()
         logger.info("✅ DJENExtractor inicializado para API server")
     except Exception as e:
         logger.error(f"❌ Erro ao inicializar extrator: {e}")
         extractor = None
+        return
+    
+    if config.AQUECER_COMPONENTES:
+        aquecer(extractor)
+
+def ler(metodo: str, **kwargs):
+    """
+    Executa uma leitura na réplica local (LEITURA_LOCAL) com fallback para o Supabase
+    
+    Args:
+        metodo: Nome do método de leitura (ex.: 'buscar_intimacoes')
+        **kwargs: Argumentos do método
+        
+    Returns:
+        Resultado da leitura
+    """
+    local = extractor.armazenamento_local if config.LEITURA_LOCAL else None
+    if local:
+        try:
+            resultado = getattr(local, metodo)(**kwargs)
+            metricas.LEITURAS.inc(fonte='local')
+            return resultado
+        except Exception as e:
+            logger.warning(f"⚠️ Leitura local '{metodo}' falhou, usando Supabase: {e}")
+            metricas.LEITURAS.inc(fonte='fallback')
+    
+    metricas.LEITURAS.inc(fonte='supabase')
+    return getattr(extractor.supabase_client, metodo)(**kwargs)
 
 @app.route('/status', methods=['GET'])
 def get_status():
@@ -58,10 +94,10 @@ def get_status():
             }), 500
         
         # Obter estatísticas do Supabase
-        stats = extractor.supabase_client.obter_estatisticas()
+        stats = ler('obter_estatisticas')
         
         # Obter última execução
-        logs = extractor.supabase_client.obter_logs_execucao(limite=1)
+        logs = ler('obter_logs_execucao', limite=1)
         ultima_extracao = 'Nunca'
         if logs:
             ultima_extracao = logs[0].get('data_extracao', 'Nunca')
@@ -182,8 +218,9 @@ def get_intimacoes():
         data_fim = request.args.get('data_fim')
         eduardo_unico = request.args.get('eduardo_unico', 'false').lower() == 'true'
         
-        # Buscar intimações no Supabase
-        intimacoes = extractor.supabase_client.buscar_intimacoes(
+        # Buscar intimações (réplica local ou Supabase)
+        intimacoes = ler(
+            'buscar_intimacoes',
             limite=limite,
             data_especifica=data,
             data_inicio=data_inicio,
@@ -205,6 +242,293 @@ def get_intimacoes():
         logger.error(f"Erro ao buscar intimações: {e}")
         return jsonify({'erro': str(e)}), 500
 
+@app.route('/exportar', methods=['GET'])
+def exportar_intimacoes():
+    """Exportação em fluxo (?formato=ndjson|csv|parquet; data_inicio=, data_fim=, tribunal=, colunas=)"""
+    if not extractor:
+        return jsonify({'erro': 'Sistema não inicializado'}), 500
+    
+    formato = request.args.get('formato', 'ndjson').lower()
+    if formato not in exportacao.FORMATOS:
+        return jsonify({'erro': f"Formato inválido; use {', '.join(exportacao.FORMATOS)}"}), 400
+    if formato == 'parquet' and not exportacao.parquet_disponivel():
+        return jsonify({'erro': "Exportação Parquet requer o pacote 'pyarrow' no servidor"}), 501
+    try:
+        colunas = exportacao.validar_colunas(request.args.get('colunas'))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    try:
+        for parametro in ('data_inicio', 'data_fim'):
+            if request.args.get(parametro):
+                date.fromisoformat(request.args[parametro])
+    except ValueError:
+        return jsonify({'erro': "Datas 'data_inicio'/'data_fim' devem estar no formato YYYY-MM-DD"}), 400
+    
+    blocos = exportacao.exportar(
+        extractor.supabase_client, formato, colunas,
+        data_inicio=request.args.get('data_inicio'),
+        data_fim=request.args.get('data_fim'),
+        tribunal=request.args.get('tribunal')
+    )
+    
+    def transmitir():
+        try:
+            yield from blocos
+        except Exception as e:
+            # Status já enviado: o cliente vê o arquivo truncado
+            logger.error(f"❌ Exportação {formato} interrompida: {e}")
+    
+    tipo, extensao = exportacao.FORMATOS[formato]
+    nome = f"intimacoes_{date.today().strftime('%Y%m%d')}.{extensao}"
+    return Response(stream_with_context(transmitir()), mimetype=tipo,
+                    headers={'Content-Disposition': f'attachment; filename="{nome}"'})
+
+@app.route('/webhooks/status', methods=['GET'])
+def webhooks_status():
+    """Fila dos webhooks de saída (entregas por status)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        if not config.WEBHOOK_URLS:
+            return jsonify({'ativo': False})
+        return jsonify({
+            'ativo': True,
+            'destinos': len(config.WEBHOOK_URLS),
+            'entregas': extractor.supabase_client.resumo_webhooks()
+        })
+        
+    except Exception as e:
+        logger.error(f"Erro ao obter status dos webhooks: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/advogados', methods=['GET'])
+def get_advogados():
+    """Endpoint com o cadastro de advogados acompanhados"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        advogados = carregar_advogados(supabase_client=extractor.supabase_client)
+        return jsonify([advogado.para_dict() for advogado in advogados])
+        
+    except Exception as e:
+        logger.error(f"Erro ao listar advogados: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/advogados/<advogado_id>/intimacoes', methods=['GET'])
+def get_intimacoes_advogado(advogado_id):
+    """Endpoint com as intimações de um advogado do cadastro (limit, offset)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        limite = request.args.get('limit', 50, type=int)
+        deslocamento = request.args.get('offset', 0, type=int)
+        intimacoes = extractor.supabase_client.buscar_por_advogado(
+            advogado_id, limite=limite, deslocamento=deslocamento
+        )
+        return jsonify(intimacoes)
+        
+    except Exception as e:
+        logger.error(f"Erro ao buscar intimações do advogado: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/prazos', methods=['GET'])
+def get_prazos():
+    """Endpoint de prazos a vencer (?ate=YYYY-MM-DD ou ?dias=N; de=, tribunal=, limit=)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        try:
+            inicio = date.fromisoformat(request.args['de']) if request.args.get('de') else date.today()
+            if request.args.get('ate'):
+                fim = date.fromisoformat(request.args['ate'])
+            else:
+                fim = inicio + timedelta(days=request.args.get('dias', 7, type=int))
+        except ValueError:
+            return jsonify({'erro': "Datas 'de'/'ate' devem estar no formato YYYY-MM-DD"}), 400
+        
+        limite = request.args.get('limit', 200, type=int)
+        prazos = extractor.supabase_client.listar_prazos(
+            inicio.isoformat(), fim.isoformat(), tribunal=request.args.get('tribunal'), limite=limite
+        )
+        return jsonify({'de': inicio.isoformat(), 'ate': fim.isoformat(), 'total': len(prazos), 'prazos': prazos})
+        
+    except Exception as e:
+        logger.error(f"Erro ao listar prazos: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/busca', methods=['GET'])
+def buscar():
+    """Endpoint de busca textual com ranking e trechos destacados"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        consulta = (request.args.get('q') or '').strip()
+        if not consulta:
+            return jsonify({'erro': "Parâmetro 'q' obrigatório"}), 400
+        
+        limite = max(1, min(100, request.args.get('limit', 20, type=int)))
+        deslocamento = max(0, request.args.get('offset', 0, type=int))
+        
+        filtros = {
+            'limite': limite,
+            'deslocamento': deslocamento,
+            'data_inicio': request.args.get('data_inicio'),
+            'data_fim': request.args.get('data_fim')
+        }
+        
+        motor = request.args.get('motor', config.MOTOR_BUSCA)
+        if motor == 'memoria' and extractor.indice_busca:
+            extractor.indice_busca.recarregar_se_alterado()
+            resultados = extractor.indice_busca.buscar(consulta, **filtros)
+            
+            # Trechos a partir da réplica local, quando disponível
+            if extractor.armazenamento_local and resultados:
+                termos = tokenizar(consulta)
+                textos = extractor.armazenamento_local.obter_textos([r['id_intimacao'] for r in resultados])
+                for resultado in resultados:
+                    texto = textos.get(resultado['id_intimacao'])
+                    resultado['trecho'] = gerar_trecho(texto, termos) if texto else None
+        else:
+            motor = 'postgres'
+            resultados = extractor.supabase_client.buscar_texto(consulta, **filtros)
+        
+        return jsonify({
+            'consulta': consulta,
+            'motor': motor,
+            'total': len(resultados),
+            'resultados': resultados
+        })
+        
+    except Exception as e:
+        logger.error(f"Erro na busca: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/processos', methods=['GET'])
+def get_processos():
+    """Endpoint com os resumos dos processos (?tribunal=, limit, offset)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        limite = request.args.get('limit', 50, type=int)
+        deslocamento = request.args.get('offset', 0, type=int)
+        processos = extractor.supabase_client.listar_processos(
+            limite=limite, deslocamento=deslocamento, tribunal=request.args.get('tribunal')
+        )
+        return jsonify(processos)
+        
+    except Exception as e:
+        logger.error(f"Erro ao listar processos: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/processos/<numero_processo>', methods=['GET'])
+def get_linha_do_tempo(numero_processo):
+    """Endpoint com a linha do tempo de um processo (resumo + intimações em ordem cronológica)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        if not normalizar_numero_processo(numero_processo):
+            return jsonify({'erro': 'Número de processo inválido (esperado padrão CNJ)'}), 400
+        
+        limite = request.args.get('limit', 500, type=int)
+        linha_do_tempo = extractor.supabase_client.obter_linha_do_tempo(numero_processo, limite=limite)
+        if not linha_do_tempo:
+            return jsonify({'erro': 'Processo não encontrado'}), 404
+        
+        return jsonify(linha_do_tempo)
+        
+    except Exception as e:
+        logger.error(f"Erro ao montar linha do tempo do processo: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/processos/<path:numero_processo>/intimacoes', methods=['GET'])
+def get_intimacoes_processo(numero_processo):
+    """Endpoint com todas as intimações de um processo"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        if not normalizar_numero_processo(numero_processo):
+            return jsonify({'erro': 'Número de processo inválido (esperado padrão CNJ)'}), 400
+        
+        limite = request.args.get('limit', 500, type=int)
+        return jsonify(extractor.supabase_client.buscar_por_processo(numero_processo, limite=limite))
+        
+    except Exception as e:
+        logger.error(f"Erro ao buscar intimações do processo: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/intimacoes/oab/<numero_oab>', methods=['GET'])
+def get_intimacoes_oab(numero_oab):
+    """Endpoint de intimações por OAB (?uf=RS opcional)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        limite = request.args.get('limit', 100, type=int)
+        intimacoes = extractor.supabase_client.buscar_por_oab(numero_oab, request.args.get('uf'), limite=limite)
+        return jsonify(intimacoes)
+        
+    except Exception as e:
+        logger.error(f"Erro ao buscar intimações por OAB: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/intimacoes/destinatario', methods=['GET'])
+def get_intimacoes_destinatario():
+    """Endpoint de intimações por nome de destinatário (?nome=, mínimo 3 letras)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        nome = (request.args.get('nome') or '').strip()
+        if len(nome) < 3:
+            return jsonify({'erro': "Parâmetro 'nome' obrigatório (mínimo 3 caracteres)"}), 400
+        
+        limite = request.args.get('limit', 100, type=int)
+        return jsonify(extractor.supabase_client.buscar_por_destinatario(nome, limite=limite))
+        
+    except Exception as e:
+        logger.error(f"Erro ao buscar intimações por destinatário: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/intimacoes/<id_intimacao>', methods=['GET'])
+def get_intimacao(id_intimacao):
+    """Endpoint de detalhe: intimação com o item bruto completo da API"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        intimacao = extractor.supabase_client.buscar_intimacao(id_intimacao)
+        if not intimacao:
+            return jsonify({'erro': 'Intimação não encontrada'}), 404
+        
+        # Item bruto carregado sob demanda (tabela fria de payloads)
+        intimacao['conteudo_original'] = extractor.supabase_client.obter_conteudo_original(id_intimacao, intimacao)
+        return jsonify(intimacao)
+        
+    except Exception as e:
+        logger.error(f"Erro ao buscar intimação {id_intimacao}: {e}")
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/intimacoes/<id_intimacao>/versoes', methods=['GET'])
+def get_versoes_intimacao(id_intimacao):
+    """Endpoint do histórico de versões (alterações detectadas na origem com DETECTAR_ALTERACOES)"""
+    try:
+        if not extractor:
+            return jsonify({'erro': 'Sistema não inicializado'}), 500
+        
+        return jsonify(extractor.supabase_client.listar_versoes(id_intimacao))
+        
+    except Exception as e:
+        logger.error(f"Erro ao listar versões da intimação {id_intimacao}: {e}")
+        return jsonify({'erro': str(e)}), 500
+
 @app.route('/estatisticas/tribunal', methods=['GET'])
 def get_estatisticas_tribunal():
     """Endpoint para estatísticas por tribunal"""
@@ -212,7 +536,7 @@ def get_estatisticas_tribunal():
         if not extractor:
             return jsonify({'erro': 'Sistema não inicializado'}), 500
         
-        stats = extractor.supabase_client.obter_estatisticas_tribunal()
+        stats = ler('obter_estatisticas_tribunal')
         return jsonify(stats)
         
     except Exception as e:
@@ -227,7 +551,7 @@ def get_logs():
             return jsonify({'erro': 'Sistema não inicializado'}), 500
         
         limite = request.args.get('limit', 10, type=int)
-        logs = extractor.supabase_client.obter_logs_execucao(limite=limite)
+        logs = ler('obter_logs_execucao', limite=limite)
         
         return jsonify(logs)
         
@@ -242,24 +566,36 @@ def health_check():
         'status': 'ok',
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0',
-        'sistema_inicializado': extractor is not None
+        'sistema_inicializado': extractor is not None,
+        'componentes_prontos': componentes_prontos(extractor) if extractor else []
     })
 
 @app.route('/scheduler/status', methods=['GET'])
 def scheduler_status():
     """Status do agendador de extração automática"""
     try:
-        jobs = schedule.get_jobs()
-        proximo_job = None
-        
-        if jobs:
-            proximo_job = jobs[0].next_run.isoformat() if jobs[0].next_run else None
+        # O agendador pode rodar em outro processo; o líder grava seu estado em disco
+        status = agendador.ler_status_agendador()
+        
+        # Agendamentos direto da tabela quando disponível (estado compartilhado entre hosts)
+        agendamentos = status.get('agendamentos', [])
+        if extractor:
+            agendamentos = [
+                {campo: a.get(campo) for campo in ('nome', 'tipo', 'cron', 'ativo', 'proxima_execucao',
+                                                   'ultima_execucao', 'ultimo_status', 'bloqueado_por')}
+                for a in extractor.supabase_client.listar_agendamentos()
+            ] or agendamentos
+        ativos = [a for a in agendamentos if a.get('ativo', True)]
+        proximas = [a['proxima_execucao'] for a in ativos if a.get('proxima_execucao')]
         
         return jsonify({
-            'status': 'active' if jobs else 'inactive',
-            'jobs_agendados': len(jobs),
-            'proxima_execucao': proximo_job,
-            'horario_configurado': '06:00 (diário)',
+            'status': 'active' if ativos and status.get('pid') else 'inactive',
+            'jobs_agendados': len(ativos),
+            'proxima_execucao': min(proximas) if proximas else None,
+            'horario_configurado': ', '.join(f"{a['nome']}: {a['cron']}" for a in ativos),
+            'agendamentos': agendamentos,
+            'pid_agendador': status.get('pid'),
+            'ultima_execucao': status.get('ultima_execucao'),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -279,14 +615,72 @@ def index():
         logger.error(f"Erro ao servir página principal: {e}")
         return jsonify({'erro': 'Página não encontrada'}), 404
 
+@app.route('/debug/queries', methods=['GET', 'DELETE'])
+def debug_queries():
+    """Perfil das consultas ao PostgREST deste worker (resumo, repetições N+1 e últimas consultas)"""
+    if request.method == 'DELETE':
+        PERFIL.limpar()
+        return jsonify({'status': 'ok'})
+    
+    return jsonify(PERFIL.relatorio(
+        limite=request.args.get('limit', 100, type=int),
+        operacao=request.args.get('operacao'),
+        somente_lentas=request.args.get('lentas', 'false').lower() == 'true'
+    ))
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas no formato texto do Prometheus"""
+    # Atraso do agendador: o líder pode estar em outro processo
+    status_agendador = agendador.ler_status_agendador()
+    if status_agendador.get('atraso_segundos') is not None:
+        metricas.AGENDADOR_ATRASO.definir(status_agendador['atraso_segundos'])
+    if status_agendador.get('ultima_execucao'):
+        try:
+            ultima = datetime.fromisoformat(status_agendador['ultima_execucao'])
+            metricas.AGENDADOR_ULTIMA.definir(ultima.timestamp())
+        except ValueError:
+            pass
+    
+    return Response(metricas.REGISTRO.exportar(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 # Middleware para log de requisições
 @app.before_request
 def log_request_info():
-    logger.info(f"API Request: {request.method} {request.url} - Origin: {request.headers.get('Origin', 'N/A')}")
+    g.inicio_requisicao = time.perf_counter()
+    # Consultas ao banco feitas nesta requisição (perfil_consultas)
+    g.perfil_requisicao = {'id': uuid.uuid4().hex[:12], 'consultas': 0,
+                           'rota': f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"}
+    g.perfil_token = requisicao_atual.set(g.perfil_requisicao)
+
+@app.teardown_request
+def limpar_requisicao(erro=None):
+    # Threads do gthread são reaproveitadas: a próxima requisição não herda o contexto
+    token = g.pop('perfil_token', None)
+    if token is not None:
+        requisicao_atual.reset(token)
 
 @app.after_request
 def log_response_info(response):
-    logger.info(f"API Response: {response.status_code}")
+    # Rota pelo padrão (ex.: /intimacoes) para não explodir a cardinalidade
+    rota = request.url_rule.rule if request.url_rule else 'nao_encontrada'
+    inicio = g.get('inicio_requisicao')
+    duracao = time.perf_counter() - inicio if inicio is not None else None
+    if duracao is not None:
+        metricas.HTTP_LATENCIA.observar(duracao, rota=rota, metodo=request.method)
+    metricas.HTTP_REQUISICOES.inc(rota=rota, metodo=request.method, status=response.status_code)
+    perfil = g.get('perfil_requisicao')
+    if perfil is not None:
+        response.headers['X-DJEN-Requisicao'] = perfil['id']
+        response.headers['X-DJEN-Consultas'] = str(perfil['consultas'])
+    
+    # Uma linha por requisição, amostrada (LOG_AMOSTRAGEM_REQUISICOES); erros sempre registrados
+    nivel = logging.WARNING if response.status_code >= 400 else logging.INFO
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, "API %s %s -> %s (%.1f ms)", request.method, request.full_path.rstrip('?'),
+                   response.status_code, (duracao or 0) * 1000,
+                   extra={'amostrar': True, 'rota': rota, 'metodo': request.method,
+                          'status': response.status_code, 'origem': request.headers.get('Origin')})
     return response
 
 @app.errorhandler(404)
@@ -297,56 +691,37 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'erro': 'Erro interno do servidor'}), 500
 
-def executar_extracao_automatica():
-    """Função para executar extração automática diária"""
-    try:
-        hora_atual = datetime.now().strftime("%H:%M:%S")
-        data_atual = datetime.now().strftime("%d/%m/%Y")
-        
-        logger.info(f"🕐 [{hora_atual}] Iniciando extração automática diária para {data_atual}")
-        print(f"🕐 [{hora_atual}] Iniciando extração automática diária para {data_atual}")
-        
-        if not extractor:
-            logger.error("❌ Extrator não inicializado para execução automática")
-            return
-        
-        # Executar extração
-        resultado = extractor.executar_extracao_diaria()
-        
-        logger.info(f"✅ Extração automática concluída: {resultado}")
-        print(f"✅ Extração automática concluída: {resultado}")
-        
-        # Log adicional sobre próxima execução
-        proxima_execucao = "06:00 (próximo dia)"
-        logger.info(f"📅 Próxima extração automática: {proxima_execucao}")
-        print(f"📅 Próxima extração automática: {proxima_execucao}")
-        
-    except Exception as e:
-        logger.error(f"❌ Erro na extração automática: {e}")
-        print(f"❌ Erro na extração automática: {e}")
+def _inicializar_worker(server, worker):
+    """Hook post_fork do gunicorn: cada worker cria seus próprios clientes"""
+    inicializar_extractor()
 
-def iniciar_agendador():
-    """Inicializa o agendador de extrações automáticas"""
-    try:
-        # Agendar extração para todo dia às 6:00 AM
-        schedule.every().day.at("06:00").do(executar_extracao_automatica)
-        
-        logger.info("📅 Agendador iniciado - Extração automática configurada para 06:00 diariamente")
-        print("📅 Agendador iniciado - Extração automática configurada para 06:00 diariamente")
-        
-        # 🧪 MODO TESTE (descomente as linhas abaixo para testar):
-        # Para executar em 2 minutos após inicializar:
-        # schedule.every(2).minutes.do(executar_extracao_automatica)
-        # logger.info("🧪 MODO TESTE: Executará em 2 minutos + diariamente às 06:00")
-        # print("🧪 MODO TESTE: Executará em 2 minutos + diariamente às 06:00")
-        
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Verificar a cada minuto
-            
-    except Exception as e:
-        logger.error(f"❌ Erro no agendador: {e}")
-        print(f"❌ Erro no agendador: {e}")
+def servir_producao():
+    """Inicia o servidor em modo produção com gunicorn (multi-worker)"""
+    from gunicorn.app.base import BaseApplication
+    
+    class ServidorProducao(BaseApplication):
+        def __init__(self, aplicacao, opcoes):
+            self.aplicacao = aplicacao
+            self.opcoes = opcoes
+            super().__init__()
+        
+        def load_config(self):
+            for chave, valor in self.opcoes.items():
+                self.cfg.set(chave, valor)
+        
+        def load(self):
+            return self.aplicacao
+    
+    opcoes = {
+        'bind': f"{config.SERVIDOR_HOST}:{config.SERVIDOR_PORTA}",
+        'workers': config.SERVIDOR_WORKERS,
+        'worker_class': 'gthread',
+        'threads': config.SERVIDOR_THREADS,
+        'timeout': config.SERVIDOR_TIMEOUT,
+        'post_fork': _inicializar_worker
+    }
+    
+    ServidorProducao(app, opcoes).run()
 
 def main():
     """Função principal para iniciar o servidor API"""
@@ -354,6 +729,15 @@ def main():
     print("=" * 60)
     print("🌐 Integração com N8N webhook: https://webhook.lnpassos.com.br/webhook/demo2")
     
+    if config.MODO_SERVIDOR == 'producao':
+        # Workers não executam extrações agendadas: o agendador roda em processo próprio
+        print(f"🏭 Modo produção: {config.SERVIDOR_WORKERS} workers x {config.SERVIDOR_THREADS} threads "
+              f"em {config.SERVIDOR_HOST}:{config.SERVIDOR_PORTA}")
+        print("📅 Agendador: execute 'python agendador.py' em um processo separado")
+        print("=" * 60)
+        servir_producao()
+        return
+    
     # Inicializar o extrator
     print("🔧 Inicializando sistema DJEN...")
     inicializar_extractor()
@@ -365,30 +749,47 @@ def main():
     print("✅ Sistema DJEN inicializado com sucesso!")
     
     # Inicializar agendador automático em thread separada
-    print("📅 Iniciando agendador de extração automática...")
-    scheduler_thread = threading.Thread(target=iniciar_agendador, daemon=True)
-    scheduler_thread.start()
-    print("✅ Agendador iniciado em background")
+    if config.AGENDADOR_EMBUTIDO:
+        print("📅 Iniciando agendador de extração automática...")
+        scheduler_thread = threading.Thread(target=agendador.iniciar_agendador, args=(extractor,), daemon=True)
+        scheduler_thread.start()
+        print("✅ Agendador iniciado em background")
+    else:
+        print("📅 Agendador embutido desativado (AGENDADOR_EMBUTIDO=false)")
     
-    print("🔗 API disponível em: http://localhost:8000")
-    print("🌐 Painel web: http://172.20.119.188:8000")
+    print(f"🔗 API disponível em: http://localhost:{config.SERVIDOR_PORTA}")
+    print(f"🌐 Painel web: http://172.20.119.188:{config.SERVIDOR_PORTA}")
     print("📋 Endpoints disponíveis:")
     print("  - GET  /status")
     print("  - GET  /testar")
     print("  - POST /extrair")
     print("  - GET  /intimacoes")
+    print("  - GET  /intimacoes/<id_intimacao>")
+    print("  - GET  /intimacoes/<id_intimacao>/versoes")
+    print("  - GET  /intimacoes/oab/<numero>?uf=")
+    print("  - GET  /intimacoes/destinatario?nome=")
+    print("  - GET  /advogados")
+    print("  - GET  /advogados/<id>/intimacoes")
+    print("  - GET  /prazos?ate=")
+    print("  - GET  /processos")
+    print("  - GET  /processos/<numero>")
+    print("  - GET  /processos/<numero>/intimacoes")
+    print("  - GET  /busca?q=")
     print("  - GET  /estatisticas/tribunal")
     print("  - GET  /logs")
     print("  - GET  /health")
     print("  - GET  /scheduler/status")
-    print("⏰ EXTRAÇÃO AUTOMÁTICA: Todos os dias às 06:00")
+    print("  - GET  /metrics")
+    print("  - GET  /debug/queries")
+    print(f"⏰ EXTRAÇÃO AUTOMÁTICA: agendamentos da tabela '{config.TABELA_AGENDAMENTOS}' "
+          f"(padrão: todos os dias às {config.AGENDADOR_HORARIO})")
     print("=" * 60)
     
     try:
         # Iniciar servidor Flask
         app.run(
-            host='0.0.0.0',  # Permitir conexões externas
-            port=8000,
+            host=config.SERVIDOR_HOST,  # Permitir conexões externas
+            port=config.SERVIDOR_PORTA,
             debug=False,
             use_reloader=False,
             threaded=True
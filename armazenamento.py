@@ -0,0 +1,66 @@
+"""
+Interface dos backends de armazenamento das intimações
+O backend de escrita é escolhido por BACKEND_ARMAZENAMENTO ('supabase' ou 'postgres')
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from config import BACKEND_ARMAZENAMENTO
+
+
+class ArmazenamentoIntimacoes(ABC):
+    """
+    Operações de escrita usadas pelo extrator
+    """
+
+    @abstractmethod
+    def testar_conexao(self) -> bool:
+        """
+        Returns:
+            bool: True se o backend estiver acessível
+        """
+
+    @abstractmethod
+    def processar_intimacoes(self, intimacoes: List[Dict]) -> Dict:
+        """
+        Grava as intimações novas, descartando duplicatas (id_intimacao ou hash_conteudo)
+
+        Args:
+            intimacoes: Lista de intimações processadas
+
+        Returns:
+            Dict: Estatísticas (total_processadas, novas_inseridas,
+                  duplicatas_encontradas, erros, detalhes_erros, ids_erros,
+                  ids_inseridas, ids_alteradas)
+        """
+
+    @abstractmethod
+    def registrar_log_execucao(self, log_dados: Dict) -> bool:
+        """
+        Args:
+            log_dados: Relatório de execução
+
+        Returns:
+            bool: True se inserido com sucesso
+        """
+
+
+def criar_armazenamento(supabase_client: Optional[ArmazenamentoIntimacoes] = None) -> ArmazenamentoIntimacoes:
+    """
+    Cria o backend de escrita configurado
+
+    Args:
+        supabase_client: SupabaseClient já conectado (reutilizado no backend 'supabase')
+
+    Returns:
+        ArmazenamentoIntimacoes: Backend de armazenamento
+    """
+    if BACKEND_ARMAZENAMENTO == 'postgres':
+        from postgres_client import PostgresClient
+        return PostgresClient()
+
+    if supabase_client is not None:
+        return supabase_client
+
+    from supabase_client import SupabaseClient
+    return SupabaseClient()
@@ -0,0 +1,284 @@
+"""
+Armazenamento local embutido (SQLite) das intimações
+Réplica de leitura do dashboard mantida pelo extrator a cada gravação
+"""
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, List
+
+from armazenamento import ArmazenamentoIntimacoes
+from config import ARMAZENAMENTO_LOCAL_ARQUIVO, DETECTAR_ALTERACOES
+from supabase_client import preparar_dados_intimacao, preparar_dados_log
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS intimacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_intimacao TEXT UNIQUE NOT NULL,
+    numero_processo TEXT,
+    tribunal TEXT,
+    orgao_julgador TEXT,
+    data_publicacao TEXT,
+    tipo_comunicacao TEXT,
+    data_extracao TEXT,
+    conteudo_texto TEXT NOT NULL,
+    conteudo_original TEXT,
+    hash_conteudo TEXT UNIQUE,
+    impressao_digital TEXT,
+    versao INTEGER NOT NULL DEFAULT 1,
+    metadados TEXT,
+    status_processamento TEXT DEFAULT 'extraido'
+);
+CREATE INDEX IF NOT EXISTS idx_intimacoes_data_publicacao ON intimacoes(data_publicacao);
+CREATE INDEX IF NOT EXISTS idx_intimacoes_tribunal ON intimacoes(tribunal);
+CREATE INDEX IF NOT EXISTS idx_intimacoes_data_extracao ON intimacoes(data_extracao);
+
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_extracao TEXT,
+    total_encontradas INTEGER DEFAULT 0,
+    total_novas INTEGER DEFAULT 0,
+    total_duplicadas INTEGER DEFAULT 0,
+    status_execucao TEXT,
+    erro_detalhes TEXT,
+    tempo_execucao_segundos REAL,
+    metricas_etapas TEXT,
+    parametros_busca TEXT,
+    response_api TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_logs_data_extracao ON logs(data_extracao);
+"""
+
+# Colunas acrescentadas depois da criação do esquema (bancos locais antigos as recebem no __init__)
+COLUNAS_MIGRADAS = (
+    ("intimacoes", "impressao_digital", "TEXT"),
+    ("intimacoes", "versao", "INTEGER NOT NULL DEFAULT 1"),
+)
+
+# Réplica das versões: a linha passa a refletir a nova versão (o histórico fica só no Supabase)
+SQL_ALTERACAO = (
+    "UPDATE intimacoes SET tipo_comunicacao = ?, conteudo_texto = ?, conteudo_original = ?, metadados = ?, "
+    "impressao_digital = ?, versao = versao + (impressao_digital IS NOT NULL) "
+    "WHERE id_intimacao = ? AND impressao_digital IS NOT ?"
+)
+
+COLUNAS_JSON_INTIMACAO = ("conteudo_original", "metadados")
+COLUNAS_JSON_LOG = ("metricas_etapas", "parametros_busca", "response_api")
+
+
+def _serializar(valor):
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+def _decodificar(row: sqlite3.Row, colunas_json) -> Dict:
+    """
+    Linha como dict, com as colunas JSON decodificadas (como o Supabase devolve)
+    Valores que não são JSON (ex.: payload comprimido) ficam como texto.
+    """
+    linha = dict(row)
+    for coluna in colunas_json:
+        valor = linha.get(coluna)
+        if isinstance(valor, str) and valor[:1] in ('{', '['):
+            try:
+                linha[coluna] = json.loads(valor)
+            except ValueError:
+                pass
+    return linha
+
+
+class ArmazenamentoLocal(ArmazenamentoIntimacoes):
+    """
+    Banco SQLite local com as mesmas leituras do SupabaseClient
+
+    As leituras propagam exceções (em vez de retornar vazio) para que
+    a API possa voltar ao Supabase quando o banco local falhar.
+    """
+
+    def __init__(self, caminho: str = ARMAZENAMENTO_LOCAL_ARQUIVO):
+        self.caminho = caminho
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._lock_escrita = threading.Lock()
+
+        with self._conexao() as conexao:
+            conexao.executescript(ESQUEMA)
+            for tabela, coluna, tipo in COLUNAS_MIGRADAS:
+                existentes = {row['name'] for row in conexao.execute(f"PRAGMA table_info({tabela})")}
+                if coluna not in existentes:
+                    conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+        self.logger.info(f"✅ Armazenamento local em {caminho}")
+
+    def _conexao(self) -> sqlite3.Connection:
+        """
+        Conexão por thread (sqlite3 não compartilha conexões entre threads)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30)
+            conexao.row_factory = sqlite3.Row
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def testar_conexao(self) -> bool:
+        """
+        Returns:
+            bool: True se o banco local responder
+        """
+        try:
+            self._conexao().execute("SELECT 1 FROM logs LIMIT 1")
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Teste do armazenamento local falhou: {e}")
+            return False
+
+    def processar_intimacoes(self, intimacoes: List[Dict]) -> Dict:
+        """
+        Grava as intimações numa única transação, ignorando as já existentes
+        (com DETECTAR_ALTERACOES, as existentes cuja impressão digital mudou são atualizadas)
+
+        Args:
+            intimacoes: Lista de intimações processadas
+
+        Returns:
+            Dict: Estatísticas do processamento
+        """
+        estatisticas = {
+            "total_processadas": len(intimacoes),
+            "novas_inseridas": 0,
+            "duplicatas_encontradas": 0,
+            "erros": 0,
+            "alteracoes_registradas": 0,
+            "detalhes_erros": [],
+            "ids_erros": []
+        }
+
+        if not intimacoes:
+            return estatisticas
+
+        linhas = [preparar_dados_intimacao(intimacao) for intimacao in intimacoes]
+        colunas = list(linhas[0])
+        sql = (
+            f"INSERT OR IGNORE INTO intimacoes ({', '.join(colunas)}) "
+            f"VALUES ({', '.join(['?'] * len(colunas))})"
+        )
+
+        try:
+            with self._lock_escrita, self._conexao() as conexao:
+                antes = conexao.total_changes
+                conexao.executemany(sql, [[_serializar(linha[c]) for c in colunas] for linha in linhas])
+                inseridas = conexao.total_changes - antes
+                if DETECTAR_ALTERACOES:
+                    antes = conexao.total_changes
+                    conexao.executemany(SQL_ALTERACAO, [
+                        [linha["tipo_comunicacao"], linha["conteudo_texto"], _serializar(linha["conteudo_original"]),
+                         _serializar(linha["metadados"]), linha["impressao_digital"],
+                         linha["id_intimacao"], linha["impressao_digital"]]
+                        for linha in linhas if linha["impressao_digital"]
+                    ])
+                    estatisticas["alteracoes_registradas"] = conexao.total_changes - antes
+            estatisticas["novas_inseridas"] = inseridas
+            estatisticas["duplicatas_encontradas"] = len(linhas) - inseridas
+        except sqlite3.Error as e:
+            estatisticas["erros"] = len(intimacoes)
+            estatisticas["detalhes_erros"].append(f"Erro no armazenamento local: {e}")
+            estatisticas["ids_erros"] = [i.get("id_intimacao") for i in intimacoes]
+            self.logger.error(f"❌ Erro no armazenamento local: {e}")
+
+        return estatisticas
+
+    def registrar_log_execucao(self, log_dados: Dict) -> bool:
+        """
+        Args:
+            log_dados: Relatório de execução
+
+        Returns:
+            bool: True se inserido com sucesso
+        """
+        try:
+            dados_log = preparar_dados_log(log_dados)
+            colunas = list(dados_log)
+            with self._lock_escrita, self._conexao() as conexao:
+                conexao.execute(
+                    f"INSERT INTO logs ({', '.join(colunas)}) VALUES ({', '.join(['?'] * len(colunas))})",
+                    [_serializar(dados_log[c]) for c in colunas]
+                )
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Erro ao registrar log local: {e}")
+            return False
+
+    def buscar_intimacoes(self, limite: int = 10, data_especifica: str = None,
+                         data_inicio: str = None, data_fim: str = None) -> List[Dict]:
+        """
+        Busca intimações (mesmos filtros do SupabaseClient)
+
+        Returns:
+            List[Dict]: Lista de intimações, extraídas mais recentemente primeiro
+        """
+        filtros, parametros = [], []
+        if data_especifica:
+            filtros.append("data_publicacao = ?")
+            parametros.append(data_especifica)
+        else:
+            if data_inicio:
+                filtros.append("data_publicacao >= ?")
+                parametros.append(data_inicio)
+            if data_fim:
+                filtros.append("data_publicacao <= ?")
+                parametros.append(data_fim)
+
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        cursor = self._conexao().execute(
+            f"SELECT * FROM intimacoes {where} ORDER BY data_extracao DESC LIMIT ?",
+            parametros + [limite]
+        )
+        return [_decodificar(row, COLUNAS_JSON_INTIMACAO) for row in cursor]
+
+    def obter_textos(self, ids_intimacao: List[str]) -> Dict[str, str]:
+        """
+        Returns:
+            Dict[str, str]: conteudo_texto por id_intimacao (apenas os existentes)
+        """
+        if not ids_intimacao:
+            return {}
+        cursor = self._conexao().execute(
+            f"SELECT id_intimacao, conteudo_texto FROM intimacoes "
+            f"WHERE id_intimacao IN ({', '.join(['?'] * len(ids_intimacao))})",
+            list(ids_intimacao)
+        )
+        return {row['id_intimacao']: row['conteudo_texto'] for row in cursor}
+    
+    def obter_estatisticas_tribunal(self) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: Total de intimações por tribunal, maior primeiro
+        """
+        cursor = self._conexao().execute(
+            "SELECT COALESCE(tribunal, 'N/A') AS tribunal, COUNT(*) AS total "
+            "FROM intimacoes GROUP BY tribunal ORDER BY total DESC"
+        )
+        return [dict(row) for row in cursor]
+
+    def obter_estatisticas(self) -> Dict:
+        """
+        Returns:
+            Dict: total_intimacoes e tribunais_unicos
+        """
+        row = self._conexao().execute(
+            "SELECT COUNT(*) AS total_intimacoes, COUNT(DISTINCT COALESCE(tribunal, 'N/A')) AS tribunais_unicos "
+            "FROM intimacoes"
+        ).fetchone()
+        return {'total_intimacoes': row['total_intimacoes'], 'tribunais_unicos': row['tribunais_unicos']}
+
+    def obter_logs_execucao(self, limite: int = 10) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: Logs de execução, mais recentes primeiro
+        """
+        cursor = self._conexao().execute("SELECT * FROM logs ORDER BY data_extracao DESC LIMIT ?", (limite,))
+        return [_decodificar(row, COLUNAS_JSON_LOG) for row in cursor]
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do pipeline de extração DJEN sobre um corpus sintético
+Os resultados são gravados em JSON para comparação entre commits:
+
+    python benchmark.py --itens 2000 --repeticoes 5
+    python benchmark.py --comparar resultados_benchmark/<base>.json
+    python benchmark.py --inicializacao         # só o tempo de partida (imports e /health)
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from corpus_sintetico import gerar_corpus, item_corresponde
+from config import ADVOGADO_NOME, REGISTROS_OAB
+
+DIRETORIO_RESULTADOS = 'resultados_benchmark'
+
+# Partida medida em processos novos: import a frio de cada módulo e primeira resposta do /health
+MODULOS_INICIALIZACAO = ('supabase_client', 'djen_extractor', 'api_server')
+CODIGO_HEALTH = (
+    "import api_server; api_server.inicializar_extractor(); "
+    "assert api_server.app.test_client().get('/health').status_code == 200"
+)
+
+
+class _Resposta:
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class _TabelaMemoria:
+    """
+    Tabela em memória com índice nas colunas de deduplicação
+    """
+    COLUNAS_INDEXADAS = ('id_intimacao', 'hash_conteudo')
+
+    def __init__(self):
+        self.linhas: List[Dict] = []
+        self.indices: Dict[str, Dict[str, List[Dict]]] = {c: {} for c in self.COLUNAS_INDEXADAS}
+
+    def inserir(self, linha: Dict):
+        self.linhas.append(linha)
+        for coluna, indice in self.indices.items():
+            if linha.get(coluna) is not None:
+                indice.setdefault(str(linha[coluna]), []).append(linha)
+
+
+class _ConsultaMemoria:
+    """
+    Subconjunto do query builder do PostgREST usado pelo SupabaseClient
+    """
+
+    def __init__(self, tabela: _TabelaMemoria, latencia: float):
+        self.tabela = tabela
+        self.latencia = latencia
+        self.filtros: List[Callable[[Dict], bool]] = []
+        self.candidatas: Optional[List[Dict]] = None
+        self.limite: Optional[int] = None
+        self.dados_insercao = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, limite: int):
+        self.limite = limite
+        return self
+
+    def eq(self, coluna: str, valor):
+        if coluna in self.tabela.indices and self.candidatas is None:
+            self.candidatas = self.tabela.indices[coluna].get(str(valor), [])
+        else:
+            self.filtros.append(lambda linha: str(linha.get(coluna)) == str(valor))
+        return self
+
+    def in_(self, coluna: str, valores):
+        alvo = {str(v) for v in valores}
+        self.filtros.append(lambda linha: str(linha.get(coluna)) in alvo)
+        return self
+
+    def or_(self, expressao: str):
+        condicoes = []
+        for parte in expressao.split(','):
+            coluna, _, valor = parte.split('.', 2)
+            condicoes.append((coluna, valor))
+        self.filtros.append(lambda linha: any(str(linha.get(c)) == v for c, v in condicoes))
+        return self
+
+    def insert(self, dados):
+        self.dados_insercao = dados
+        return self
+
+    def execute(self) -> _Resposta:
+        if self.latencia:
+            time.sleep(self.latencia)
+
+        if self.dados_insercao is not None:
+            linhas = self.dados_insercao if isinstance(self.dados_insercao, list) else [self.dados_insercao]
+            for linha in linhas:
+                self.tabela.inserir(dict(linha))
+            return _Resposta(linhas)
+
+        candidatas = self.candidatas if self.candidatas is not None else self.tabela.linhas
+        resultado = [linha for linha in candidatas if all(f(linha) for f in self.filtros)]
+        if self.limite is not None:
+            resultado = resultado[:self.limite]
+        return _Resposta(resultado, len(resultado))
+
+
+class ClienteSupabaseMemoria:
+    """
+    Substituto em memória do cliente supabase para medir o custo do pipeline
+    sem rede; `latencia_ms` simula o round-trip de cada chamada HTTP
+    """
+
+    def __init__(self, latencia_ms: float = 0.0):
+        self.latencia = latencia_ms / 1000
+        self.tabelas: Dict[str, _TabelaMemoria] = {}
+
+    def table(self, nome: str) -> _ConsultaMemoria:
+        return _ConsultaMemoria(self.tabelas.setdefault(nome, _TabelaMemoria()), self.latencia)
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir(nome: str, func: Callable[[], None], itens: int, repeticoes: int,
+          bytes_processados: int = 0, preparar: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Executa `func` várias vezes e resume o tempo
+
+    Args:
+        nome: Nome do benchmark
+        func: Função medida (processa `itens` items por chamada)
+        itens: Items processados por chamada
+        repeticoes: Número de repetições
+        bytes_processados: Bytes processados por chamada (para MB/s)
+        preparar: Função executada antes de cada repetição (fora da medição)
+
+    Returns:
+        Dict: Estatísticas do benchmark
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+
+    mediana = statistics.median(tempos)
+    resultado = {
+        "itens": itens,
+        "repeticoes": repeticoes,
+        "tempo_mediano_s": round(mediana, 6),
+        "tempo_min_s": round(min(tempos), 6),
+        "tempo_max_s": round(max(tempos), 6),
+        "itens_por_segundo": round(itens / mediana, 1) if mediana else None
+    }
+    if bytes_processados:
+        resultado["mb_por_segundo"] = round(bytes_processados / mediana / 1_000_000, 2) if mediana else None
+
+    print(f"  {nome:<40} {resultado['tempo_mediano_s'] * 1000:>10.2f} ms  "
+          f"{resultado['itens_por_segundo'] or 0:>12.1f} itens/s", file=sys.stderr)
+    return resultado
+
+
+def executar_benchmarks_inicializacao(repeticoes: int = 5) -> Dict:
+    """
+    Tempo de partida de um processo novo (interpretador, imports e /health)
+    Cada repetição é um `python -c` separado, sem cache de módulos do processo atual.
+
+    Args:
+        repeticoes: Repetições por benchmark
+
+    Returns:
+        Dict: Resultados por benchmark (o do interpretador é a linha de base)
+    """
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    ambiente = {**os.environ, 'LOG_FILE': os.devnull, 'AQUECER_COMPONENTES': 'false'}
+    ambiente.setdefault('SUPABASE_URL', 'http://localhost')
+    ambiente.setdefault('SUPABASE_KEY', 'benchmark')
+
+    def executar_python(codigo: str):
+        subprocess.run([sys.executable, '-c', codigo], cwd=diretorio, env=ambiente, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    resultados = {
+        "inicializacao_interpretador": medir(
+            "inicializacao (interpretador)", lambda: executar_python("pass"), 1, repeticoes)
+    }
+    for modulo in MODULOS_INICIALIZACAO:
+        resultados[f"inicializacao_import_{modulo}"] = medir(
+            f"inicializacao (import {modulo})", lambda m=modulo: executar_python(f"import {m}"), 1, repeticoes)
+    resultados["inicializacao_health"] = medir(
+        "inicializacao (primeiro /health)", lambda: executar_python(CODIGO_HEALTH), 1, repeticoes)
+    return resultados
+
+
+def executar_benchmarks(itens: int = 2000, repeticoes: int = 5, semente: int = 42,
+                        latencia_supabase_ms: float = 0.0, so_inicializacao: bool = False) -> Dict:
+    """
+    Executa todos os benchmarks do pipeline
+
+    Args:
+        itens: Tamanho do corpus sintético
+        repeticoes: Repetições por benchmark
+        semente: Semente do corpus
+        latencia_supabase_ms: Latência simulada por chamada ao Supabase
+        so_inicializacao: Se True, mede apenas o tempo de partida
+
+    Returns:
+        Dict: Resultados com metadados do ambiente
+    """
+    print("⏱️ Medindo o tempo de partida...", file=sys.stderr)
+    resultados = executar_benchmarks_inicializacao(repeticoes)
+    if so_inicializacao:
+        return _com_metadados(resultados, {"repeticoes": repeticoes})
+
+    from djen_api import DJENApiClient
+    from supabase_client import SupabaseClient
+    from text_processor import TextProcessor
+
+    print(f"📦 Gerando corpus sintético: {itens} items (semente {semente})", file=sys.stderr)
+    corpus = gerar_corpus(itens, semente=semente)
+    processor = TextProcessor()
+
+    textos = [item['texto'] for item in corpus]
+    bytes_html = sum(len(t.encode('utf-8')) for t in textos)
+    textos_limpos = [processor.processar_texto(t) for t in textos]
+    bytes_limpos = sum(len(t.encode('utf-8')) for t in textos_limpos)
+    intimacoes = [processor.processar_intimacao_completa(item) for item in corpus]
+
+    print("⏱️ Executando benchmarks...", file=sys.stderr)
+
+    resultados["processar_texto"] = medir(
+        "processar_texto", lambda: [processor.processar_texto(t) for t in textos],
+        len(textos), repeticoes, bytes_html)
+
+    resultados["extrair_metadados_texto"] = medir(
+        "extrair_metadados_texto", lambda: [processor.extrair_metadados_texto(t) for t in textos_limpos],
+        len(textos_limpos), repeticoes, bytes_limpos)
+
+    resultados["eh_eduardo_unico_advogado"] = medir(
+        "eh_eduardo_unico_advogado", lambda: [processor.eh_eduardo_unico_advogado(t) for t in textos_limpos],
+        len(textos_limpos), repeticoes, bytes_limpos)
+
+    resultados["processar_intimacao_completa"] = medir(
+        "processar_intimacao_completa", lambda: [processor.processar_intimacao_completa(i) for i in corpus],
+        len(corpus), repeticoes, bytes_html)
+
+    # Mesclagem de buscar_todas_oabs_eduardo com respostas pré-calculadas por consulta
+    respostas = {("nome", ADVOGADO_NOME): [i for i in corpus if item_corresponde(i, nome=ADVOGADO_NOME)]}
+    for registro in REGISTROS_OAB:
+        respostas[("oab", registro["numero"], registro["uf"])] = [
+            i for i in corpus if item_corresponde(i, numero_oab=registro["numero"], uf_oab=registro["uf"])
+        ]
+
+    class ClienteDJENMemoria(DJENApiClient):
+        def _fazer_requisicao(self, params):
+            if "nomeAdvogado" in params:
+                items = respostas[("nome", params["nomeAdvogado"])]
+            else:
+                items = respostas[("oab", params["numeroOab"], params["ufOab"])]
+            return True, {"status": "success", "count": len(items), "items": items}
+
+    cliente_djen = ClienteDJENMemoria()
+    total_respostas = sum(len(v) for v in respostas.values())
+    resultados["buscar_todas_oabs_eduardo_merge"] = medir(
+        "buscar_todas_oabs_eduardo (merge)",
+        lambda: cliente_djen.buscar_todas_oabs_eduardo("2025-06-21", "2025-07-21"),
+        total_respostas, repeticoes)
+
+    # processar_intimacoes contra o Supabase em memória
+    supabase = SupabaseClient.__new__(SupabaseClient)
+    supabase.url = 'memoria'
+    supabase.logger = logging.getLogger('supabase_client')
+
+    def base_vazia():
+        supabase.client = ClienteSupabaseMemoria(latencia_supabase_ms)
+
+    resultados["processar_intimacoes_novas"] = medir(
+        "processar_intimacoes (novas)", lambda: supabase.processar_intimacoes(intimacoes),
+        len(intimacoes), repeticoes, preparar=base_vazia)
+
+    resultados["processar_intimacoes_duplicadas"] = medir(
+        "processar_intimacoes (duplicadas)", lambda: supabase.processar_intimacoes(intimacoes),
+        len(intimacoes), repeticoes)
+
+    return _com_metadados(resultados, {
+        "itens": itens,
+        "repeticoes": repeticoes,
+        "semente": semente,
+        "latencia_supabase_ms": latencia_supabase_ms,
+        "bytes_html": bytes_html
+    })
+
+
+def _com_metadados(resultados: Dict, parametros: Dict) -> Dict:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": parametros,
+        "resultados": resultados
+    }
+
+
+def salvar_resultados(resultados: Dict, diretorio: str = DIRETORIO_RESULTADOS) -> str:
+    """
+    Grava os resultados em `<diretorio>/<data>_<commit>.json`
+
+    Returns:
+        str: Caminho do arquivo gravado
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    carimbo = datetime.now().strftime('%Y%m%d_%H%M%S')
+    caminho = os.path.join(diretorio, f"{carimbo}_{resultados.get('commit') or 'sem_commit'}.json")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return caminho
+
+
+def comparar_resultados(base: Dict, atual: Dict, tolerancia: float = 0.10) -> List[Dict]:
+    """
+    Compara o tempo mediano de cada benchmark com uma execução base
+
+    Args:
+        base: Resultados de referência
+        atual: Resultados novos
+        tolerancia: Variação relativa acima da qual há regressão
+
+    Returns:
+        List[Dict]: Comparação por benchmark
+    """
+    comparacao = []
+    for nome, resultado in atual["resultados"].items():
+        referencia = base.get("resultados", {}).get(nome)
+        if not referencia:
+            continue
+        variacao = (resultado["tempo_mediano_s"] - referencia["tempo_mediano_s"]) / referencia["tempo_mediano_s"]
+        comparacao.append({
+            "benchmark": nome,
+            "base_s": referencia["tempo_mediano_s"],
+            "atual_s": resultado["tempo_mediano_s"],
+            "variacao_percentual": round(variacao * 100, 1),
+            "regressao": variacao > tolerancia
+        })
+    return comparacao
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline DJEN")
+    parser.add_argument('--itens', type=int, default=2000, help="Tamanho do corpus sintético")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--latencia-supabase-ms', type=float, default=0.0,
+                        help="Latência simulada por chamada ao Supabase")
+    parser.add_argument('--saida', default=DIRETORIO_RESULTADOS, help="Diretório dos resultados JSON")
+    parser.add_argument('--comparar', help="Arquivo JSON de uma execução base para comparação")
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help="Variação relativa considerada regressão (padrão 10%%)")
+    parser.add_argument('--inicializacao', action='store_true',
+                        help="Mede apenas o tempo de partida (imports e primeiro /health)")
+    args = parser.parse_args(argv)
+
+    # Os logs por intimação distorceriam as medições
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    resultados = executar_benchmarks(args.itens, args.repeticoes, args.semente, args.latencia_supabase_ms,
+                                     so_inicializacao=args.inicializacao)
+    caminho = salvar_resultados(resultados, args.saida)
+    print(f"💾 Resultados gravados em {caminho}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        comparacao = comparar_resultados(base, resultados, args.tolerancia)
+        for linha in comparacao:
+            marcador = '❌' if linha["regressao"] else '✅'
+            print(f"  {marcador} {linha['benchmark']:<40} {linha['variacao_percentual']:>+7.1f}%", file=sys.stderr)
+        if any(linha["regressao"] for linha in comparacao):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Componentes criados sob demanda
+Clientes (Supabase, API DJEN, réplica local, índice) só são montados no primeiro
+uso; o servidor os aquece em segundo plano para não atrasar o /health.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class componente:
+    """
+    Atributo de instância criado no primeiro acesso (uma única vez, mesmo com várias threads)
+
+    Uso como decorador de um método fábrica:
+
+        @componente
+        def supabase_client(self) -> SupabaseClient:
+            return SupabaseClient()
+
+    Atribuir o atributo (ex.: um cliente falso) substitui o componente sem criá-lo.
+    """
+
+    def __init__(self, fabrica: Callable):
+        self.fabrica = fabrica
+        self.nome = fabrica.__name__
+        self.__doc__ = fabrica.__doc__
+        self._lock = threading.Lock()
+
+    def __set_name__(self, dono, nome: str):
+        self.nome = nome
+
+    def __get__(self, instancia, dono=None):
+        if instancia is None:
+            return self
+
+        valores = instancia.__dict__
+        if self.nome in valores:
+            return valores[self.nome]
+
+        with self._lock:
+            if self.nome not in valores:
+                inicio = time.perf_counter()
+                valores[self.nome] = self.fabrica(instancia)
+                logger.debug(f"Componente '{self.nome}' criado em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        return valores[self.nome]
+
+
+def componentes(classe: type) -> List[str]:
+    """
+    Returns:
+        List[str]: Nomes dos componentes declarados na classe (e nas bases)
+    """
+    nomes = []
+    for base in reversed(classe.__mro__):
+        nomes.extend(nome for nome, valor in vars(base).items() if isinstance(valor, componente) and nome not in nomes)
+    return nomes
+
+
+def componentes_prontos(instancia) -> List[str]:
+    """
+    Componentes já criados (não cria nenhum)
+
+    Args:
+        instancia: Objeto com atributos @componente
+
+    Returns:
+        List[str]: Nomes dos componentes inicializados
+    """
+    return [nome for nome in componentes(type(instancia)) if nome in instancia.__dict__]
+
+
+def aquecer(instancia, nomes: Optional[Iterable[str]] = None) -> threading.Thread:
+    """
+    Cria os componentes numa thread de fundo; falhas só são registradas
+    (o componente é tentado de novo no primeiro uso)
+
+    Args:
+        instancia: Objeto com atributos @componente
+        nomes: Componentes a criar (padrão: todos, na ordem de declaração)
+
+    Returns:
+        threading.Thread: Thread do aquecimento (daemon)
+    """
+    nomes = list(nomes or componentes(type(instancia)))
+
+    def executar():
+        inicio = time.perf_counter()
+        for nome in nomes:
+            try:
+                getattr(instancia, nome)
+            except Exception as e:
+                logger.warning(f"⚠️ Aquecimento de '{nome}' falhou (nova tentativa no primeiro uso): {e}")
+        logger.info(f"🔥 Componentes aquecidos em {time.perf_counter() - inicio:.2f}s")
+
+    thread = threading.Thread(target=executar, name='aquecimento', daemon=True)
+    thread.start()
+    return thread
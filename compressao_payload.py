@@ -0,0 +1,77 @@
+"""
+Compressão dos itens brutos da API DJEN (tabela fria intimacoes_payloads)
+Formato texto "<algoritmo>:<base64>" para trafegar pelo PostgREST sem bytea
+"""
+import base64
+import gzip
+import json
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd é opcional; gzip está sempre disponível
+    zstandard = None
+
+NIVEL_ZSTD = 10
+NIVEL_GZIP = 6
+
+
+def comprimir_payload(dados: Any) -> str:
+    """
+    Serializa e comprime um payload JSON
+
+    Args:
+        dados: Estrutura serializável em JSON
+
+    Returns:
+        str: "zstd:<base64>" (se zstandard estiver instalado) ou "gzip:<base64>"
+    """
+    bruto = json.dumps(dados, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    if zstandard is not None:
+        algoritmo = 'zstd'
+        comprimido = zstandard.ZstdCompressor(level=NIVEL_ZSTD).compress(bruto)
+    else:
+        algoritmo = 'gzip'
+        comprimido = gzip.compress(bruto, compresslevel=NIVEL_GZIP, mtime=0)
+
+    return f"{algoritmo}:{base64.b64encode(comprimido).decode('ascii')}"
+
+
+def descomprimir_payload(valor: Any) -> Any:
+    """
+    Reverte comprimir_payload, aceitando também os formatos legados
+    (dict já decodificado ou string JSON sem compressão)
+
+    Args:
+        valor: Valor lido do banco
+
+    Returns:
+        Any: Payload decodificado (None se vazio)
+    """
+    if valor is None or isinstance(valor, (dict, list)):
+        return valor
+
+    algoritmo, _, conteudo = valor.partition(':')
+
+    if algoritmo == 'gzip':
+        return json.loads(gzip.decompress(base64.b64decode(conteudo)))
+    if algoritmo == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Payload zstd requer o pacote 'zstandard'")
+        return json.loads(zstandard.ZstdDecompressor().decompress(base64.b64decode(conteudo)))
+
+    return json.loads(valor) if valor else None
+
+
+def payload_sem_texto(item_api: Optional[Dict]) -> Dict:
+    """
+    Cópia do item da API sem o campo 'texto' (já armazenado limpo em conteudo_texto)
+
+    Args:
+        item_api: Item bruto da API DJEN
+
+    Returns:
+        Dict: Item sem 'texto'
+    """
+    return {chave: valor for chave, valor in (item_api or {}).items() if chave != 'texto'}
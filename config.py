@@ -31,9 +31,27 @@ REGISTROS_OAB = [
     {"numero": "204531", "uf": "MG"}
 ]
 
+# Cadastro de advogados acompanhados: 'config' (acima), 'arquivo' (JSON) ou 'tabela' (Supabase)
+ADVOGADOS_FONTE = os.getenv('ADVOGADOS_FONTE', 'config')
+ADVOGADOS_ARQUIVO = os.getenv('ADVOGADOS_ARQUIVO', 'advogados.json')
+
+# Limite de requisições à API DJEN (compartilhado por todas as consultas; 0 = sem limite)
+DJEN_REQUISICOES_POR_SEGUNDO = float(os.getenv('DJEN_REQUISICOES_POR_SEGUNDO', '10'))
+DJEN_RAJADA = int(os.getenv('DJEN_RAJADA', '10'))
+# Consultas simultâneas no cliente síncrono
+EXTRACAO_MAX_CONCORRENCIA = int(os.getenv('EXTRACAO_MAX_CONCORRENCIA', '4'))
+
 # Configurações de logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FILE = os.getenv('LOG_FILE', 'djen_extractor.log')
+# 'texto' ou 'json' (uma linha JSON por registro, para agregadores de log)
+LOG_FORMATO = os.getenv('LOG_FORMATO', 'texto')
+# Escrita em thread própria (QueueHandler/QueueListener): disco e formatação fora das requisições
+LOG_ASSINCRONO = os.getenv('LOG_ASSINCRONO', 'false').lower() == 'true'
+# Níveis por logger, ex.: 'werkzeug=WARNING,httpx=WARNING,djen_api=DEBUG'
+LOG_NIVEIS = os.getenv('LOG_NIVEIS', '')
+# Fração das requisições HTTP registradas (erros e respostas >= 400 sempre entram)
+LOG_AMOSTRAGEM_REQUISICOES = float(os.getenv('LOG_AMOSTRAGEM_REQUISICOES', '1.0'))
 
 # Headers para requisições
 DEFAULT_HEADERS = {
@@ -45,6 +63,106 @@ DEFAULT_HEADERS = {
 # Configurações das tabelas
 TABELA_INTIMACOES = 'intimacoes_eduardo_koetz'
 TABELA_LOGS = 'logs_extracao_djen'
+TABELA_PAYLOADS = 'intimacoes_payloads'
+TABELA_PROCESSOS = 'processos_resumo'
+TABELA_PRAZOS = 'prazos_intimacoes'
+TABELA_FERIADOS = 'feriados'
+TABELA_ADVOGADOS = 'advogados'
+TABELA_INTIMACOES_ADVOGADOS = 'intimacoes_advogados'
+TABELA_AGENDAMENTOS = 'agendamentos'
+TABELA_VERSOES = 'intimacoes_versoes'
+TABELA_WEBHOOKS = 'webhooks_saida'
+TABELA_WEBHOOKS_DESTINOS = 'webhooks_destinos'
+
+# Motor de extração: 'sync' (requests) ou 'async' (httpx/asyncio com HTTP/2)
+MOTOR_EXTRACAO = os.getenv('MOTOR_EXTRACAO', 'sync')
+ASYNC_MAX_REQUISICOES_API = int(os.getenv('ASYNC_MAX_REQUISICOES_API', '10'))
+ASYNC_MAX_ESCRITAS_SUPABASE = int(os.getenv('ASYNC_MAX_ESCRITAS_SUPABASE', '10'))
+ASYNC_TAMANHO_LOTE = int(os.getenv('ASYNC_TAMANHO_LOTE', '200'))
+
+# Backend de escrita das intimações: 'supabase' (PostgREST) ou 'postgres' (psycopg2 direto)
+# As leituras do dashboard continuam no Supabase.
+BACKEND_ARMAZENAMENTO = os.getenv('BACKEND_ARMAZENAMENTO', 'supabase')
+DATABASE_URL = os.getenv('DATABASE_URL')
+POSTGRES_POOL_MIN = int(os.getenv('POSTGRES_POOL_MIN', '1'))
+POSTGRES_POOL_MAX = int(os.getenv('POSTGRES_POOL_MAX', '5'))
+POSTGRES_TAMANHO_LOTE = int(os.getenv('POSTGRES_TAMANHO_LOTE', '500'))
+
+# Payloads brutos comprimidos (zstd/gzip) na tabela fria TABELA_PAYLOADS;
+# conteudo_original passa a ser gravado sem o campo 'texto'
+COMPRIMIR_PAYLOADS = os.getenv('COMPRIMIR_PAYLOADS', 'false').lower() == 'true'
+
+# Motor da busca textual (GET /busca): 'postgres' (tsvector/GIN) ou 'memoria' (índice invertido local)
+MOTOR_BUSCA = os.getenv('MOTOR_BUSCA', 'postgres')
+INDICE_BUSCA_ARQUIVO = os.getenv('INDICE_BUSCA_ARQUIVO', 'indice_busca.idx')
+
+# Réplica local (SQLite) mantida pelo extrator; LEITURA_LOCAL faz a API ler dela
+ARMAZENAMENTO_LOCAL = os.getenv('ARMAZENAMENTO_LOCAL', 'false').lower() == 'true'
+ARMAZENAMENTO_LOCAL_ARQUIVO = os.getenv('ARMAZENAMENTO_LOCAL_ARQUIVO', 'djen_local.db')
+LEITURA_LOCAL = os.getenv('LEITURA_LOCAL', 'false').lower() == 'true'
+
+# Vencimentos de prazo (tabela TABELA_PRAZOS) calculados pelo extrator a cada gravação
+CALCULAR_PRAZOS = os.getenv('CALCULAR_PRAZOS', 'false').lower() == 'true'
+
+# Detecção de alterações: itens já gravados cuja impressão digital mudou (status, ativo,
+# texto) viram uma nova versão da linha, com a anterior guardada em TABELA_VERSOES
+DETECTAR_ALTERACOES = os.getenv('DETECTAR_ALTERACOES', 'false').lower() == 'true'
+
+# Reprocessamento a partir do item bruto (python -m djen reprocessar)
+REPROCESSAMENTO_PROCESSOS = int(os.getenv('REPROCESSAMENTO_PROCESSOS', str(os.cpu_count() or 1)))
+REPROCESSAMENTO_TAMANHO_LOTE = int(os.getenv('REPROCESSAMENTO_TAMANHO_LOTE', '500'))
+
+# Webhooks de saída: intimações novas enviadas em lote para cada URL (vírgula separa várias)
+# Fila durável em TABELA_WEBHOOKS; falhas voltam com backoff exponencial até WEBHOOK_MAX_TENTATIVAS
+WEBHOOK_URLS = [url.strip() for url in os.getenv('WEBHOOK_URLS', '').split(',') if url.strip()]
+WEBHOOK_SEGREDO = os.getenv('WEBHOOK_SEGREDO', '')
+WEBHOOK_TAMANHO_LOTE = int(os.getenv('WEBHOOK_TAMANHO_LOTE', '100'))
+WEBHOOK_CONCORRENCIA = int(os.getenv('WEBHOOK_CONCORRENCIA', '4'))
+WEBHOOK_TIMEOUT = int(os.getenv('WEBHOOK_TIMEOUT', '10'))
+WEBHOOK_MAX_TENTATIVAS = int(os.getenv('WEBHOOK_MAX_TENTATIVAS', '8'))
+WEBHOOK_BACKOFF_SEGUNDOS = int(os.getenv('WEBHOOK_BACKOFF_SEGUNDOS', '30'))
+
+# Retenção (retencao.py, diária pelo agendador): logs e itens brutos mais antigos que os dias
+# abaixo vão para arquivos .ndjson.gz em ARQUIVO_DIR e saem da base; 0 mantém tudo
+RETENCAO_LOGS_DIAS = int(os.getenv('RETENCAO_LOGS_DIAS', '0'))
+RETENCAO_PAYLOADS_DIAS = int(os.getenv('RETENCAO_PAYLOADS_DIAS', '0'))
+ARQUIVO_DIR = os.getenv('ARQUIVO_DIR', 'arquivo')
+# Partições mensais dos logs criadas com antecedência
+PARTICOES_MESES_A_FRENTE = int(os.getenv('PARTICOES_MESES_A_FRENTE', '3'))
+
+# Perfil das consultas ao PostgREST (GET /debug/queries): buffer circular por processo e
+# log de consultas lentas (acima de PERFIL_LENTA_MS ou de PERFIL_GRANDE_BYTES na resposta)
+PERFIL_CONSULTAS = os.getenv('PERFIL_CONSULTAS', 'true').lower() == 'true'
+PERFIL_TAMANHO_BUFFER = int(os.getenv('PERFIL_TAMANHO_BUFFER', '2000'))
+PERFIL_LENTA_MS = float(os.getenv('PERFIL_LENTA_MS', '500'))
+PERFIL_GRANDE_BYTES = int(os.getenv('PERFIL_GRANDE_BYTES', '1000000'))
+# Valores dos filtros (OAB, nomes de partes) ficam mascarados como '?' salvo se true
+PERFIL_VALORES_FILTROS = os.getenv('PERFIL_VALORES_FILTROS', 'false').lower() == 'true'
+
+# Configurações do servidor API
+# MODO_SERVIDOR: 'desenvolvimento' (Flask embutido) ou 'producao' (gunicorn multi-worker)
+MODO_SERVIDOR = os.getenv('MODO_SERVIDOR', 'desenvolvimento')
+SERVIDOR_HOST = os.getenv('SERVIDOR_HOST', '0.0.0.0')
+SERVIDOR_PORTA = int(os.getenv('SERVIDOR_PORTA', '8000'))
+SERVIDOR_WORKERS = int(os.getenv('SERVIDOR_WORKERS', str((os.cpu_count() or 1) * 2 + 1)))
+SERVIDOR_THREADS = int(os.getenv('SERVIDOR_THREADS', '4'))
+SERVIDOR_TIMEOUT = int(os.getenv('SERVIDOR_TIMEOUT', '120'))
+# Clientes do extrator criados em segundo plano ao subir o servidor (senão, no primeiro uso)
+AQUECER_COMPONENTES = os.getenv('AQUECER_COMPONENTES', 'true').lower() == 'true'
+
+# Configurações do agendador
+# Em produção o agendador roda como processo próprio (python agendador.py)
+# Os agendamentos ficam em TABELA_AGENDAMENTOS; os valores abaixo só criam os padrão
+AGENDADOR_EMBUTIDO = os.getenv('AGENDADOR_EMBUTIDO', 'true').lower() == 'true'
+AGENDADOR_HORARIO = os.getenv('AGENDADOR_HORARIO', '06:00')
+# Extração incremental intradiária (cron, ex.: '*/30 7-20 * * 1-5'); vazio desativa
+AGENDADOR_INCREMENTAL_CRON = os.getenv('AGENDADOR_INCREMENTAL_CRON', '')
+AGENDADOR_JITTER_SEGUNDOS = int(os.getenv('AGENDADOR_JITTER_SEGUNDOS', '0'))
+AGENDADOR_LEASE_SEGUNDOS = int(os.getenv('AGENDADOR_LEASE_SEGUNDOS', '3600'))
+AGENDADOR_RECUPERACAO_MAX_DIAS = int(os.getenv('AGENDADOR_RECUPERACAO_MAX_DIAS', '30'))
+AGENDADOR_INTERVALO_SEGUNDOS = int(os.getenv('AGENDADOR_INTERVALO_SEGUNDOS', '30'))
+AGENDADOR_LOCK_FILE = os.getenv('AGENDADOR_LOCK_FILE', 'agendador.lock')
+AGENDADOR_STATUS_FILE = os.getenv('AGENDADOR_STATUS_FILE', 'agendador_status.json')
 
 # Validação de configurações obrigatórias
 def validar_configuracoes():
@@ -55,5 +173,11 @@ def validar_configuracoes():
         raise ValueError("SUPABASE_URL não configurada")
     if not SUPABASE_KEY:
         raise ValueError("SUPABASE_KEY não configurada")
+    if BACKEND_ARMAZENAMENTO not in ('supabase', 'postgres'):
+        raise ValueError(f"BACKEND_ARMAZENAMENTO inválido: {BACKEND_ARMAZENAMENTO}")
+    if ADVOGADOS_FONTE not in ('config', 'arquivo', 'tabela'):
+        raise ValueError(f"ADVOGADOS_FONTE inválido: {ADVOGADOS_FONTE}")
+    if BACKEND_ARMAZENAMENTO == 'postgres' and not DATABASE_URL:
+        raise ValueError("DATABASE_URL não configurada (BACKEND_ARMAZENAMENTO=postgres)")
     
     return True
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Gerador de corpus sintético de items da API DJEN
+Usado pelos benchmarks e pelo servidor DJEN local de testes
+"""
+import hashlib
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from config import ADVOGADO_NOME, REGISTROS_OAB
+
+TRIBUNAIS = ['TJRS', 'TJSC', 'TJPR', 'TJSP', 'TJMG', 'TRF4', 'TRF3', 'TRF6', 'TRT4', 'TRT12', 'STJ']
+
+ORGAOS = [
+    '1ª Vara Cível', '2ª Vara Federal', 'Juizado Especial Federal', '3ª Vara do Trabalho',
+    'Turma Recursal', 'Vara de Família e Sucessões', '5ª Câmara de Direito Privado',
+    'Vara Previdenciária', 'Gabinete do Desembargador', 'Central de Conciliação'
+]
+
+CLASSES = [
+    ('PROCEDIMENTO COMUM CÍVEL', 7), ('PROCEDIMENTO DO JUIZADO ESPECIAL CÍVEL', 436),
+    ('CUMPRIMENTO DE SENTENÇA', 156), ('APELAÇÃO CÍVEL', 198), ('AGRAVO DE INSTRUMENTO', 202),
+    ('RECURSO INOMINADO CÍVEL', 460), ('EXECUÇÃO FISCAL', 1116)
+]
+
+TIPOS_COMUNICACAO = ['Intimação', 'Intimação', 'Intimação', 'Citação', 'Edital']
+TIPOS_DOCUMENTO = ['Despacho', 'Sentença', 'Decisão', 'Acórdão', 'Ato Ordinatório', 'Certidão']
+
+PRENOMES = ['MARIA', 'JOSÉ', 'ANA', 'JOÃO', 'CARLOS', 'PAULO', 'LUCAS', 'FERNANDA', 'JULIANA',
+            'RAFAEL', 'GABRIELA', 'MARCOS', 'PATRÍCIA', 'ANDRÉ', 'BEATRIZ', 'RODRIGO']
+SOBRENOMES = ['SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'PEREIRA', 'COSTA', 'RODRIGUES', 'ALMEIDA',
+              'NASCIMENTO', 'LIMA', 'ARAÚJO', 'FERREIRA', 'CARVALHO', 'GOMES', 'MARTINS', 'ROCHA']
+UFS = ['RS', 'SC', 'PR', 'SP', 'MG', 'RJ', 'BA', 'GO']
+
+PRAZOS = [(5, 'cinco'), (10, 'dez'), (15, 'quinze'), (30, 'trinta')]
+
+FRASES = [
+    'Vistos.', 'Intime-se a parte autora para que se manifeste sobre a contestação.',
+    'Defiro o pedido de gratuidade da justiça.', 'Cite-se a parte ré para apresentar resposta.',
+    'Junte-se aos autos o laudo pericial e dê-se vista às partes.',
+    'Considerando o requerimento formulado pela parte, determino a expedição de ofício ao INSS.',
+    'Nada mais havendo, arquivem-se os autos com as cautelas de estilo.',
+    'Trata-se de ação previdenciária em que a parte autora postula a concessão de benefício por incapacidade.',
+    'Ante o exposto, JULGO PROCEDENTE o pedido, extinguindo o feito com resolução de mérito.',
+    'Documento assinado eletronicamente, conforme art. 1º, III, "b", da Lei 11.419/2006.',
+    'A autenticidade do documento pode ser conferida no site do tribunal, informando o código verificador.'
+]
+
+ENTIDADES = ['&nbsp;', '&amp;', '&ccedil;', '&atilde;', '&eacute;', '&ordm;', '&quot;', '&#39;', '&lt;', '&gt;']
+
+
+def _nome(rng: random.Random) -> str:
+    return f"{rng.choice(PRENOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def _numero_processo(rng: random.Random) -> str:
+    """
+    Número no formato CNJ: NNNNNNN-DD.AAAA.J.TR.OOOO
+    """
+    return (f"{rng.randint(0, 9999999):07d}-{rng.randint(0, 99):02d}.{rng.randint(2015, 2025)}."
+            f"{rng.choice([4, 5, 8])}.{rng.randint(1, 27):02d}.{rng.randint(1, 9999):04d}")
+
+
+def _advogado(rng: random.Random, eduardo: bool, oab_eduardo: Optional[Dict] = None) -> Dict:
+    if eduardo:
+        registro = oab_eduardo or rng.choice(REGISTROS_OAB)
+        return {"nome": ADVOGADO_NOME.upper(), "numero_oab": registro["numero"], "uf_oab": registro["uf"]}
+    return {"nome": _nome(rng), "numero_oab": str(rng.randint(1000, 199999)), "uf_oab": rng.choice(UFS)}
+
+
+def _linha_advogados(rng: random.Random, advogados: List[Dict]) -> str:
+    """
+    Linha "ADV:" nos formatos que eh_eduardo_unico_advogado interpreta
+    """
+    estilo = rng.random()
+    if estilo < 0.15 or not advogados:
+        return ''
+    if estilo < 0.6:
+        nomes = ', '.join(f"{a['nome']} (OAB {a['numero_oab']}/{a['uf_oab']})" for a in advogados)
+        return f"ADV: {nomes}"
+    if estilo < 0.85:
+        nomes = ', '.join(f"{a['nome']} OAB {a['uf_oab']}{a['numero_oab']}" for a in advogados)
+        return f"ADVOGADO(A): {nomes}"
+    nomes = ', '.join(a['nome'] for a in advogados)
+    return f"Advogados: {nomes}"
+
+
+def _texto_html(rng: random.Random, numero_processo: str, tipo_documento: str,
+                advogados: List[Dict], paragrafos: int, densidade_entidades: float) -> str:
+    partes = [f"<p><b>PROCESSO: {numero_processo}</b></p>", f"<p>{tipo_documento.upper()}</p>"]
+
+    for _ in range(paragrafos):
+        frases = ' '.join(rng.choice(FRASES) for _ in range(rng.randint(1, 4)))
+        if rng.random() < densidade_entidades:
+            palavras = frases.split(' ')
+            for _ in range(max(1, len(palavras) // 6)):
+                palavras.insert(rng.randrange(len(palavras) + 1), rng.choice(ENTIDADES))
+            frases = ' '.join(palavras)
+        if rng.random() < 0.25:
+            dias, extenso = rng.choice(PRAZOS)
+            frases += f" Fica a parte intimada para, no prazo de {dias} ({extenso}) dias, cumprir a determinação."
+        separador = rng.choice(['<br>', '<br/>', '<br />', '</p><p>', '<div>'])
+        partes.append(f"<p>{frases}{separador}</p>")
+
+    linha_adv = _linha_advogados(rng, advogados)
+    if linha_adv:
+        partes.append(f"<p>{linha_adv}</p>")
+
+    partes.append("<p>Documento assinado eletronicamente. Verifique a data da assinatura eletrônica.</p>")
+    return '\n'.join(partes)
+
+
+def gerar_item(rng: random.Random, id_item: int, data_base: date,
+               dias_periodo: int = 30, proporcao_eduardo: float = 0.85) -> Dict:
+    """
+    Gera um item no formato retornado pela API DJEN
+
+    Args:
+        rng: Gerador aleatório (semente controlada pelo chamador)
+        id_item: ID da comunicação
+        data_base: Data final do período gerado
+        dias_periodo: Quantos dias para trás as disponibilizações se espalham
+        proporcao_eduardo: Fração dos items que citam o Eduardo Koetz
+
+    Returns:
+        Dict: Item sintético
+    """
+    numero_processo = _numero_processo(rng)
+    tipo_documento = rng.choice(TIPOS_DOCUMENTO)
+    classe, codigo_classe = rng.choice(CLASSES)
+    disponibilizacao = data_base - timedelta(days=rng.randint(0, max(0, dias_periodo - 1)))
+
+    # Advogados: Eduardo sozinho, Eduardo com outros, ou só outros
+    advogados = []
+    if rng.random() < proporcao_eduardo:
+        advogados.append(_advogado(rng, eduardo=True))
+        if rng.random() < 0.4:
+            advogados += [_advogado(rng, eduardo=False) for _ in range(rng.randint(1, 4))]
+        rng.shuffle(advogados)
+    else:
+        advogados = [_advogado(rng, eduardo=False) for _ in range(rng.randint(1, 3))]
+
+    # Tamanho do HTML com cauda longa: maioria curta, alguns acórdãos enormes
+    paragrafos = min(400, int(rng.paretovariate(1.3) * 3))
+    densidade = rng.choice([0.0, 0.1, 0.5, 0.9])
+    texto = _texto_html(rng, numero_processo, tipo_documento, advogados, paragrafos, densidade)
+
+    criado = datetime.combine(disponibilizacao, datetime.min.time()).isoformat()
+    destinatarios = [
+        {"nome": _nome(rng), "polo": rng.choice(['A', 'P']), "comunicacao_id": id_item}
+        for _ in range(rng.randint(1, 3))
+    ]
+    destinatario_advogados = [
+        {
+            "id": id_item * 10 + i,
+            "comunicacao_id": id_item,
+            "advogado_id": int(a["numero_oab"]) % 100000 + i,
+            "created_at": criado,
+            "updated_at": criado,
+            "advogado": {"id": int(a["numero_oab"]), **a}
+        }
+        for i, a in enumerate(advogados)
+    ]
+
+    return {
+        "id": id_item,
+        "data_disponibilizacao": disponibilizacao.isoformat(),
+        "siglaTribunal": rng.choice(TRIBUNAIS),
+        "tipoComunicacao": rng.choice(TIPOS_COMUNICACAO),
+        "nomeOrgao": rng.choice(ORGAOS),
+        "texto": texto,
+        "numero_processo": numero_processo.replace('-', '').replace('.', ''),
+        "numeroprocessocommascara": numero_processo,
+        "meio": "D",
+        "meiocompleto": "Diário de Justiça Eletrônico Nacional",
+        "link": f"https://comunica.pje.jus.br/consulta/{id_item}",
+        "tipoDocumento": tipo_documento,
+        "nomeClasse": classe,
+        "codigoClasse": str(codigo_classe),
+        "numeroComunicacao": rng.randint(1, 999999),
+        "ativo": rng.random() > 0.02,
+        "status": "P",
+        "hash": hashlib.sha1(f"{id_item}:{numero_processo}".encode()).hexdigest(),
+        "destinatarios": destinatarios,
+        "destinatarioadvogados": destinatario_advogados
+    }
+
+
+def gerar_corpus(
+    quantidade: int,
+    semente: int = 42,
+    data_base: Optional[date] = None,
+    dias_periodo: int = 30,
+    proporcao_eduardo: float = 0.85
+) -> List[Dict]:
+    """
+    Gera um corpus reprodutível de items DJEN
+
+    Args:
+        quantidade: Número de items
+        semente: Semente do gerador (mesma semente => mesmo corpus)
+        data_base: Data final do período (padrão: 2025-07-21, fixa para reprodutibilidade)
+        dias_periodo: Dias cobertos pelas disponibilizações
+        proporcao_eduardo: Fração dos items que citam o Eduardo Koetz
+
+    Returns:
+        List[Dict]: Items sintéticos
+    """
+    rng = random.Random(semente)
+    data_base = data_base or date(2025, 7, 21)
+    return [
+        gerar_item(rng, 100000 + i, data_base, dias_periodo, proporcao_eduardo)
+        for i in range(quantidade)
+    ]
+
+
+def item_corresponde(item: Dict, nome: Optional[str] = None,
+                     numero_oab: Optional[str] = None, uf_oab: Optional[str] = None) -> bool:
+    """
+    Verifica se um item seria retornado pelos filtros de advogado da API DJEN
+
+    Args:
+        item: Item DJEN
+        nome: Filtro nomeAdvogado
+        numero_oab: Filtro numeroOab
+        uf_oab: Filtro ufOab
+
+    Returns:
+        bool: True se o item atende aos filtros informados
+    """
+    advogados = [d.get("advogado", {}) for d in item.get("destinatarioadvogados", [])]
+
+    if nome and not any(nome.upper() in (a.get("nome") or '').upper() for a in advogados):
+        return False
+    if numero_oab and not any(
+        a.get("numero_oab") == numero_oab and (not uf_oab or a.get("uf_oab") == uf_oab)
+        for a in advogados
+    ):
+        return False
+    return True
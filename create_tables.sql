@@ -34,7 +34,8 @@ CREATE TABLE IF NOT EXISTS logs_extracao_djen (
   total_duplicadas INTEGER DEFAULT 0,
   status_execucao VARCHAR(50), -- 'sucesso', 'erro', 'parcial'
   erro_detalhes TEXT,
-  tempo_execucao_segundos INTEGER,
+  tempo_execucao_segundos NUMERIC(10,3),
+  metricas_etapas JSONB, -- Tempo, chamadas, bytes e p50/p95 por etapa da extração
   parametros_busca JSONB,
   response_api JSONB -- Resposta completa da API para debug
 );
@@ -43,16 +44,704 @@ CREATE TABLE IF NOT EXISTS logs_extracao_djen (
 CREATE INDEX IF NOT EXISTS idx_logs_data_extracao ON logs_extracao_djen(data_extracao);
 CREATE INDEX IF NOT EXISTS idx_logs_status ON logs_extracao_djen(status_execucao);
 
+-- Migração para bases existentes: tempo fracionado e métricas por etapa
+ALTER TABLE logs_extracao_djen ALTER COLUMN tempo_execucao_segundos TYPE NUMERIC(10,3);
+ALTER TABLE logs_extracao_djen ADD COLUMN IF NOT EXISTS metricas_etapas JSONB;
+
+-- Tabela fria com o item bruto da API comprimido (COMPRIMIR_PAYLOADS=true)
+-- payload: "zstd:<base64>" ou "gzip:<base64>"; lido só na visão de detalhe e no reprocessamento
+CREATE TABLE IF NOT EXISTS intimacoes_payloads (
+  id_intimacao VARCHAR(255) PRIMARY KEY,
+  payload TEXT NOT NULL,
+  data_criacao TIMESTAMP DEFAULT NOW()
+);
+
+-- Busca textual (GET /busca): configuração portuguesa sem acentos, coluna tsvector e índice GIN
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'djen_portugues') THEN
+    CREATE TEXT SEARCH CONFIGURATION public.djen_portugues (COPY = pg_catalog.portuguese);
+    ALTER TEXT SEARCH CONFIGURATION public.djen_portugues
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+  END IF;
+END
+$$;
+
+-- Mantida pelo próprio Postgres a cada INSERT/UPDATE (número do processo pesa mais que o texto)
+ALTER TABLE intimacoes_eduardo_koetz ADD COLUMN IF NOT EXISTS busca_tsv tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('public.djen_portugues'::regconfig, coalesce(numero_processo, '')), 'A') ||
+    setweight(to_tsvector('public.djen_portugues'::regconfig, coalesce(conteudo_texto, '')), 'B')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_busca_tsv ON intimacoes_eduardo_koetz USING GIN (busca_tsv);
+
+-- Ranking com ts_rank_cd; ts_headline (caro) só é calculado para a página retornada
+CREATE OR REPLACE FUNCTION buscar_intimacoes_texto(
+  consulta TEXT,
+  limite INTEGER DEFAULT 20,
+  deslocamento INTEGER DEFAULT 0,
+  data_inicio DATE DEFAULT NULL,
+  data_fim DATE DEFAULT NULL
+)
+RETURNS TABLE (
+  id_intimacao VARCHAR,
+  numero_processo VARCHAR,
+  tribunal VARCHAR,
+  data_publicacao DATE,
+  tipo_comunicacao VARCHAR,
+  relevancia REAL,
+  trecho TEXT
+)
+LANGUAGE sql STABLE
+AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('public.djen_portugues'::regconfig, consulta) AS tsq
+  ),
+  pagina AS (
+    SELECT i.id_intimacao, i.numero_processo, i.tribunal, i.data_publicacao, i.tipo_comunicacao,
+           i.conteudo_texto, ts_rank_cd(i.busca_tsv, q.tsq) AS relevancia
+    FROM intimacoes_eduardo_koetz i, q
+    WHERE i.busca_tsv @@ q.tsq
+      AND (data_inicio IS NULL OR i.data_publicacao >= data_inicio)
+      AND (data_fim IS NULL OR i.data_publicacao <= data_fim)
+    ORDER BY relevancia DESC, i.data_publicacao DESC
+    LIMIT limite OFFSET deslocamento
+  )
+  SELECT p.id_intimacao, p.numero_processo, p.tribunal, p.data_publicacao, p.tipo_comunicacao,
+         p.relevancia,
+         ts_headline('public.djen_portugues'::regconfig, p.conteudo_texto, q.tsq,
+                     'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10')
+  FROM pagina p, q
+  ORDER BY p.relevancia DESC, p.data_publicacao DESC;
+$$;
+
+-- Consultas estruturadas (processo, OAB, destinatário)
+-- 1) Correção: metadados/conteudo_original/parametros_busca eram gravados como string JSON
+UPDATE intimacoes_eduardo_koetz SET metadados = (metadados #>> '{}')::jsonb
+  WHERE jsonb_typeof(metadados) = 'string';
+UPDATE intimacoes_eduardo_koetz SET conteudo_original = (conteudo_original #>> '{}')::jsonb
+  WHERE jsonb_typeof(conteudo_original) = 'string';
+UPDATE logs_extracao_djen SET parametros_busca = (parametros_busca #>> '{}')::jsonb
+  WHERE jsonb_typeof(parametros_busca) = 'string';
+UPDATE logs_extracao_djen SET response_api = (response_api #>> '{}')::jsonb
+  WHERE jsonb_typeof(response_api) = 'string' AND left(response_api #>> '{}', 1) IN ('{', '[');
+
+-- 2) Colunas geradas e índices
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION djen_sem_acentos(texto TEXT) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, coalesce(texto, ''))) $$;
+
+CREATE OR REPLACE FUNCTION djen_nomes_destinatarios(metadados JSONB) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT djen_sem_acentos(string_agg(d->>'nome', ' | '))
+  FROM jsonb_array_elements(
+    CASE WHEN jsonb_typeof(metadados->'destinatarios') = 'array' THEN metadados->'destinatarios' ELSE '[]'::jsonb END
+  ) AS d
+$$;
+
+-- TEXT: numero_processo pode vir do texto livre ou não ser CNJ (mais de 20 dígitos);
+-- as consultas de processo só usam os valores com length(...) = 20
+ALTER TABLE intimacoes_eduardo_koetz ADD COLUMN IF NOT EXISTS numero_processo_normalizado TEXT
+  GENERATED ALWAYS AS (regexp_replace(coalesce(numero_processo, ''), '\D', '', 'g')) STORED;
+-- Migração: bases criadas com VARCHAR(20) (conversão sem reescrita da tabela)
+ALTER TABLE intimacoes_eduardo_koetz ALTER COLUMN numero_processo_normalizado TYPE TEXT;
+ALTER TABLE intimacoes_eduardo_koetz ADD COLUMN IF NOT EXISTS destinatarios_nomes TEXT
+  GENERATED ALWAYS AS (djen_nomes_destinatarios(metadados)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_numero_processo_normalizado
+  ON intimacoes_eduardo_koetz(numero_processo_normalizado, data_publicacao);
+CREATE INDEX IF NOT EXISTS idx_destinatarios_nomes_trgm
+  ON intimacoes_eduardo_koetz USING GIN (destinatarios_nomes gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_metadados_advogados
+  ON intimacoes_eduardo_koetz USING GIN ((metadados->'advogados_destinatarios') jsonb_path_ops);
+
+-- Linha do tempo dos processos (GET /processos/<numero>)
+-- Resumo por processo mantido a cada INSERT por um trigger de statement (um upsert por lote)
+CREATE TABLE IF NOT EXISTS processos_resumo (
+  numero_processo_normalizado VARCHAR(20) PRIMARY KEY,
+  numero_processo VARCHAR(50),
+  total_intimacoes INTEGER NOT NULL DEFAULT 0,
+  primeira_publicacao DATE,
+  ultima_publicacao DATE,
+  ultimo_id_intimacao VARCHAR(255),
+  ultimo_tipo_comunicacao VARCHAR(100),
+  ultimo_orgao_julgador VARCHAR(255),
+  tribunais TEXT[] NOT NULL DEFAULT '{}',
+  atualizado_em TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_ultima_publicacao ON processos_resumo(ultima_publicacao DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_tribunais ON processos_resumo USING GIN (tribunais);
+
+CREATE OR REPLACE FUNCTION djen_atualizar_processos_resumo() RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO processos_resumo AS r (
+    numero_processo_normalizado, numero_processo, total_intimacoes, primeira_publicacao, ultima_publicacao,
+    ultimo_id_intimacao, ultimo_tipo_comunicacao, ultimo_orgao_julgador, tribunais, atualizado_em
+  )
+  SELECT g.numero_processo_normalizado, u.numero_processo, g.total, g.primeira, g.ultima,
+         u.id_intimacao, u.tipo_comunicacao, u.orgao_julgador, g.tribunais, NOW()
+  FROM (
+    SELECT numero_processo_normalizado, COUNT(*) AS total,
+           MIN(data_publicacao) AS primeira, MAX(data_publicacao) AS ultima,
+           COALESCE(array_agg(DISTINCT tribunal) FILTER (WHERE tribunal <> ''), '{}') AS tribunais
+    FROM novas
+    WHERE length(numero_processo_normalizado) = 20
+    GROUP BY numero_processo_normalizado
+  ) g
+  JOIN (
+    SELECT DISTINCT ON (numero_processo_normalizado)
+           numero_processo_normalizado, numero_processo, id_intimacao, tipo_comunicacao, orgao_julgador
+    FROM novas
+    WHERE length(numero_processo_normalizado) = 20
+    ORDER BY numero_processo_normalizado, data_publicacao DESC NULLS LAST
+  ) u USING (numero_processo_normalizado)
+  ON CONFLICT (numero_processo_normalizado) DO UPDATE SET
+    total_intimacoes = r.total_intimacoes + EXCLUDED.total_intimacoes,
+    primeira_publicacao = LEAST(r.primeira_publicacao, EXCLUDED.primeira_publicacao),
+    ultima_publicacao = GREATEST(r.ultima_publicacao, EXCLUDED.ultima_publicacao),
+    ultimo_id_intimacao = CASE WHEN COALESCE(EXCLUDED.ultima_publicacao >= r.ultima_publicacao, r.ultima_publicacao IS NULL)
+                               THEN EXCLUDED.ultimo_id_intimacao ELSE r.ultimo_id_intimacao END,
+    ultimo_tipo_comunicacao = CASE WHEN COALESCE(EXCLUDED.ultima_publicacao >= r.ultima_publicacao, r.ultima_publicacao IS NULL)
+                                   THEN EXCLUDED.ultimo_tipo_comunicacao ELSE r.ultimo_tipo_comunicacao END,
+    ultimo_orgao_julgador = CASE WHEN COALESCE(EXCLUDED.ultima_publicacao >= r.ultima_publicacao, r.ultima_publicacao IS NULL)
+                                 THEN EXCLUDED.ultimo_orgao_julgador ELSE r.ultimo_orgao_julgador END,
+    tribunais = ARRAY(SELECT DISTINCT t FROM unnest(r.tribunais || EXCLUDED.tribunais) AS t ORDER BY t),
+    atualizado_em = NOW();
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_processos_resumo ON intimacoes_eduardo_koetz;
+CREATE TRIGGER trg_processos_resumo
+  AFTER INSERT ON intimacoes_eduardo_koetz
+  REFERENCING NEW TABLE AS novas
+  FOR EACH STATEMENT EXECUTE FUNCTION djen_atualizar_processos_resumo();
+
+-- Nova versão (djen_registrar_alteracoes) ou reprocessamento regravam a linha: se ela é a
+-- última do processo, o resumo acompanha o tipo de comunicação e o órgão julgador
+CREATE OR REPLACE FUNCTION djen_atualizar_ultima_processos_resumo() RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE processos_resumo r SET
+    ultimo_tipo_comunicacao = a.tipo_comunicacao,
+    ultimo_orgao_julgador = a.orgao_julgador,
+    atualizado_em = NOW()
+  FROM alteradas a
+  WHERE r.numero_processo_normalizado = a.numero_processo_normalizado
+    AND r.ultimo_id_intimacao = a.id_intimacao
+    AND (r.ultimo_tipo_comunicacao IS DISTINCT FROM a.tipo_comunicacao
+         OR r.ultimo_orgao_julgador IS DISTINCT FROM a.orgao_julgador);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_processos_resumo_alteracao ON intimacoes_eduardo_koetz;
+CREATE TRIGGER trg_processos_resumo_alteracao
+  AFTER UPDATE ON intimacoes_eduardo_koetz
+  REFERENCING NEW TABLE AS alteradas
+  FOR EACH STATEMENT EXECUTE FUNCTION djen_atualizar_ultima_processos_resumo();
+
+-- Recalcula o resumo inteiro (carga inicial e `python djen.py estatisticas --reconstruir`);
+-- o lock segura o trigger dos lotes inseridos durante a reconstrução
+CREATE OR REPLACE FUNCTION djen_reconstruir_processos_resumo() RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  total INTEGER;
+BEGIN
+  LOCK TABLE processos_resumo IN EXCLUSIVE MODE;
+  DELETE FROM processos_resumo;
+  INSERT INTO processos_resumo (
+    numero_processo_normalizado, numero_processo, total_intimacoes, primeira_publicacao, ultima_publicacao,
+    ultimo_id_intimacao, ultimo_tipo_comunicacao, ultimo_orgao_julgador, tribunais
+  )
+  SELECT g.numero_processo_normalizado, u.numero_processo, g.total, g.primeira, g.ultima,
+         u.id_intimacao, u.tipo_comunicacao, u.orgao_julgador, g.tribunais
+  FROM (
+    SELECT numero_processo_normalizado, COUNT(*) AS total,
+           MIN(data_publicacao) AS primeira, MAX(data_publicacao) AS ultima,
+           COALESCE(array_agg(DISTINCT tribunal) FILTER (WHERE tribunal <> ''), '{}') AS tribunais
+    FROM intimacoes_eduardo_koetz
+    WHERE length(numero_processo_normalizado) = 20
+    GROUP BY numero_processo_normalizado
+  ) g
+  JOIN (
+    SELECT DISTINCT ON (numero_processo_normalizado)
+           numero_processo_normalizado, numero_processo, id_intimacao, tipo_comunicacao, orgao_julgador
+    FROM intimacoes_eduardo_koetz
+    WHERE length(numero_processo_normalizado) = 20
+    ORDER BY numero_processo_normalizado, data_publicacao DESC NULLS LAST
+  ) u USING (numero_processo_normalizado);
+  GET DIAGNOSTICS total = ROW_COUNT;
+  RETURN total;
+END;
+$$;
+
+-- Carga inicial do resumo a partir das intimações já gravadas
+SELECT djen_reconstruir_processos_resumo();
+
+-- Prazos (GET /prazos): vencimentos em dias úteis pré-calculados pelo extrator (prazos.py)
+-- feriados: calendário local; tribunal '' vale para todos (os nacionais são calculados no código)
+CREATE TABLE IF NOT EXISTS feriados (
+  data DATE NOT NULL,
+  tribunal VARCHAR(100) NOT NULL DEFAULT '',
+  descricao VARCHAR(255),
+  PRIMARY KEY (data, tribunal)
+);
+
+CREATE TABLE IF NOT EXISTS prazos_intimacoes (
+  id BIGSERIAL PRIMARY KEY,
+  id_intimacao VARCHAR(255) NOT NULL,
+  numero_processo VARCHAR(50),
+  tribunal VARCHAR(100),
+  dias_prazo INTEGER NOT NULL,
+  data_publicacao DATE NOT NULL,
+  data_publicacao_efetiva DATE NOT NULL,
+  data_inicio_contagem DATE NOT NULL,
+  data_vencimento DATE NOT NULL,
+  data_calculo TIMESTAMP DEFAULT NOW(),
+  UNIQUE (id_intimacao, dias_prazo)
+);
+
+CREATE INDEX IF NOT EXISTS idx_prazos_vencimento ON prazos_intimacoes(data_vencimento);
+CREATE INDEX IF NOT EXISTS idx_prazos_tribunal_vencimento ON prazos_intimacoes(tribunal, data_vencimento);
+
+-- Recálculo das intimações com nova versão: troca todos os prazos delas numa transação
+-- (um prazo que sumiu do texto não pode continuar vencendo)
+CREATE OR REPLACE FUNCTION djen_substituir_prazos(p_ids TEXT[], p_linhas JSONB) RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  total INTEGER;
+BEGIN
+  DELETE FROM prazos_intimacoes WHERE id_intimacao = ANY(p_ids);
+  INSERT INTO prazos_intimacoes (id_intimacao, numero_processo, tribunal, dias_prazo, data_publicacao,
+                                 data_publicacao_efetiva, data_inicio_contagem, data_vencimento)
+  SELECT id_intimacao, numero_processo, tribunal, dias_prazo, data_publicacao,
+         data_publicacao_efetiva, data_inicio_contagem, data_vencimento
+  FROM jsonb_to_recordset(COALESCE(p_linhas, '[]')) AS n(
+    id_intimacao VARCHAR, numero_processo VARCHAR, tribunal VARCHAR, dias_prazo INTEGER, data_publicacao DATE,
+    data_publicacao_efetiva DATE, data_inicio_contagem DATE, data_vencimento DATE
+  )
+  WHERE id_intimacao = ANY(p_ids)
+  ON CONFLICT (id_intimacao, dias_prazo) DO NOTHING;
+  GET DIAGNOSTICS total = ROW_COUNT;
+  RETURN total;
+END;
+$$;
+
+-- Exemplos de feriados forenses da Justiça Federal (Lei 5.010/66, art. 62)
+INSERT INTO feriados (data, tribunal, descricao) VALUES
+  ('2025-08-11', 'TRF4', 'Criação dos cursos jurídicos'),
+  ('2025-11-01', 'TRF4', 'Todos os Santos'),
+  ('2025-12-08', 'TRF4', 'Dia da Justiça')
+ON CONFLICT DO NOTHING;
+
+-- Vários advogados (ADVOGADOS_FONTE=tabela): cadastro e vínculo intimação x advogado
+-- Uma intimação retornada para vários advogados é gravada uma vez e vinculada a todos
+CREATE TABLE IF NOT EXISTS advogados (
+  id VARCHAR(64) PRIMARY KEY, -- ex.: 'eduardo-koetz'
+  nome VARCHAR(255) NOT NULL,
+  registros_oab JSONB NOT NULL DEFAULT '[]', -- [{"numero": "73409", "uf": "RS"}, ...]
+  ativo BOOLEAN NOT NULL DEFAULT TRUE,
+  data_criacao TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO advogados (id, nome, registros_oab) VALUES (
+  'eduardo-koetz', 'Eduardo Koetz',
+  '[{"numero": "42934", "uf": "SC"}, {"numero": "73409", "uf": "RS"}, {"numero": "72951", "uf": "PR"},
+    {"numero": "435266", "uf": "SP"}, {"numero": "204531", "uf": "MG"}]'
+) ON CONFLICT (id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS intimacoes_advogados (
+  advogado_id VARCHAR(64) NOT NULL REFERENCES advogados(id) ON DELETE CASCADE,
+  id_intimacao VARCHAR(255) NOT NULL REFERENCES intimacoes_eduardo_koetz(id_intimacao) ON DELETE CASCADE,
+  data_publicacao DATE, -- cópia da intimação para a leitura por advogado ser só o índice abaixo
+  data_vinculo TIMESTAMP DEFAULT NOW(),
+  PRIMARY KEY (advogado_id, id_intimacao)
+);
+
+CREATE INDEX IF NOT EXISTS idx_intimacoes_advogados_publicacao
+  ON intimacoes_advogados(advogado_id, data_publicacao DESC);
+CREATE INDEX IF NOT EXISTS idx_intimacoes_advogados_intimacao ON intimacoes_advogados(id_intimacao);
+
+-- Intimações já gravadas pertencem ao advogado original
+INSERT INTO intimacoes_advogados (advogado_id, id_intimacao, data_publicacao)
+SELECT 'eduardo-koetz', id_intimacao, data_publicacao FROM intimacoes_eduardo_koetz
+ON CONFLICT DO NOTHING;
+
+-- Agendador: jobs cron persistentes com recuperação de execuções perdidas e lease exclusivo
+CREATE TABLE IF NOT EXISTS agendamentos (
+  nome VARCHAR(100) PRIMARY KEY,
+  tipo VARCHAR(50) NOT NULL DEFAULT 'extracao',
+  cron VARCHAR(100) NOT NULL, -- 'minuto hora dia mês dia-da-semana'
+  parametros JSONB NOT NULL DEFAULT '{}', -- ex.: {"dias": 1}
+  jitter_segundos INTEGER NOT NULL DEFAULT 0,
+  recuperar_perdidas BOOLEAN NOT NULL DEFAULT TRUE,
+  ativo BOOLEAN NOT NULL DEFAULT TRUE,
+  proxima_execucao TIMESTAMPTZ,
+  ultima_execucao TIMESTAMPTZ,
+  ultimo_status VARCHAR(50),
+  bloqueado_por VARCHAR(255),
+  bloqueado_ate TIMESTAMPTZ,
+  atualizado_em TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Sem linhas iniciais: o agendador cria os jobs na primeira execução a partir do config
+-- (AGENDADOR_HORARIO, DIAS_BUSCA, AGENDADOR_JITTER_SEGUNDOS...); um seed aqui os ignoraria
+
+-- Lease atômico: só trava se o job estiver ativo, vencido e livre (ou com lease expirado)
+CREATE OR REPLACE FUNCTION djen_adquirir_agendamento(p_nome TEXT, p_dono TEXT, p_lease_segundos INTEGER)
+RETURNS SETOF agendamentos
+LANGUAGE sql
+AS $$
+  UPDATE agendamentos
+  SET bloqueado_por = p_dono,
+      bloqueado_ate = NOW() + make_interval(secs => p_lease_segundos),
+      atualizado_em = NOW()
+  WHERE nome = p_nome
+    AND ativo
+    AND proxima_execucao <= NOW()
+    AND (bloqueado_ate IS NULL OR bloqueado_ate < NOW())
+  RETURNING *;
+$$;
+
+-- Detecção de alterações (DETECTAR_ALTERACOES=true): impressão digital dos campos mutáveis
+-- (texto, status, ativo, tipo de comunicação/documento) gravada na ingestão. Um item repetido
+-- com impressão diferente vira nova versão da linha; a anterior vai para intimacoes_versoes.
+ALTER TABLE intimacoes_eduardo_koetz ADD COLUMN IF NOT EXISTS impressao_digital VARCHAR(32);
+ALTER TABLE intimacoes_eduardo_koetz ADD COLUMN IF NOT EXISTS versao INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE intimacoes_eduardo_koetz ADD COLUMN IF NOT EXISTS data_atualizacao TIMESTAMP;
+
+CREATE TABLE IF NOT EXISTS intimacoes_versoes (
+  id BIGSERIAL PRIMARY KEY,
+  id_intimacao VARCHAR(255) NOT NULL REFERENCES intimacoes_eduardo_koetz(id_intimacao) ON DELETE CASCADE,
+  versao INTEGER NOT NULL,
+  impressao_digital VARCHAR(32),
+  tipo_comunicacao VARCHAR(100),
+  conteudo_texto TEXT,
+  conteudo_original JSONB,
+  metadados JSONB,
+  vigente_desde TIMESTAMP,
+  substituida_em TIMESTAMP DEFAULT NOW(),
+  UNIQUE (id_intimacao, versao)
+);
+
+-- Recebe as intimações cuja impressão digital difere da gravada; guarda a versão vigente no
+-- histórico e regrava a linha com versao + 1. Linhas anteriores à impressão digital (NULL)
+-- só passam a tê-la, sem nova versão. Retorna as intimações versionadas.
+CREATE OR REPLACE FUNCTION djen_registrar_alteracoes(p_linhas JSONB)
+RETURNS TABLE (alterada VARCHAR, nova_versao INTEGER)
+LANGUAGE sql AS $$
+  WITH novas AS (
+    SELECT * FROM jsonb_to_recordset(p_linhas) AS n(
+      id_intimacao VARCHAR, impressao_digital VARCHAR, tipo_comunicacao VARCHAR,
+      conteudo_texto TEXT, conteudo_original JSONB, metadados JSONB
+    )
+  ),
+  anteriores AS (
+    SELECT atual.*
+    FROM intimacoes_eduardo_koetz atual
+    JOIN novas ON novas.id_intimacao = atual.id_intimacao
+    WHERE atual.impressao_digital IS NOT NULL
+      AND atual.impressao_digital IS DISTINCT FROM novas.impressao_digital
+    FOR UPDATE OF atual
+  ),
+  historico AS (
+    INSERT INTO intimacoes_versoes (id_intimacao, versao, impressao_digital, tipo_comunicacao,
+                                    conteudo_texto, conteudo_original, metadados, vigente_desde)
+    SELECT id_intimacao, versao, impressao_digital, tipo_comunicacao,
+           conteudo_texto, conteudo_original, metadados, COALESCE(data_atualizacao, data_extracao)
+    FROM anteriores
+    ON CONFLICT (id_intimacao, versao) DO NOTHING
+  ),
+  adotadas AS (
+    UPDATE intimacoes_eduardo_koetz atual SET impressao_digital = novas.impressao_digital
+    FROM novas
+    WHERE atual.id_intimacao = novas.id_intimacao AND atual.impressao_digital IS NULL
+  )
+  UPDATE intimacoes_eduardo_koetz atual SET
+    tipo_comunicacao = novas.tipo_comunicacao,
+    conteudo_texto = novas.conteudo_texto,
+    conteudo_original = novas.conteudo_original,
+    metadados = novas.metadados,
+    impressao_digital = novas.impressao_digital,
+    versao = atual.versao + 1,
+    data_atualizacao = NOW()
+  FROM novas
+  WHERE atual.id_intimacao = novas.id_intimacao
+    AND atual.id IN (SELECT id FROM anteriores)
+  RETURNING atual.id_intimacao, atual.versao;
+$$;
+
+-- Reprocessamento (python -m djen reprocessar): regrava os campos derivados recalculados
+-- a partir do item bruto; linhas sem diferença não são reescritas. Retorna as atualizadas.
+CREATE OR REPLACE FUNCTION djen_atualizar_derivados(p_linhas JSONB) RETURNS INTEGER
+LANGUAGE sql AS $$
+  WITH atualizadas AS (
+    UPDATE intimacoes_eduardo_koetz atual SET
+      numero_processo = novas.numero_processo,
+      conteudo_texto = novas.conteudo_texto,
+      metadados = novas.metadados
+    FROM jsonb_to_recordset(p_linhas) AS novas(
+      id_intimacao VARCHAR, numero_processo VARCHAR, conteudo_texto TEXT, metadados JSONB
+    )
+    WHERE atual.id_intimacao = novas.id_intimacao
+      AND (atual.numero_processo, atual.conteudo_texto, atual.metadados)
+          IS DISTINCT FROM (novas.numero_processo, novas.conteudo_texto, novas.metadados)
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM atualizadas;
+$$;
+
+-- Webhooks de saída (WEBHOOK_URLS): fila durável das intimações novas a notificar.
+-- Uma linha por destino e intimação; o despachante reserva lotes (lease em bloqueado_ate),
+-- envia e marca como enviadas ou reagenda com backoff exponencial.
+CREATE TABLE IF NOT EXISTS webhooks_saida (
+  id BIGSERIAL PRIMARY KEY,
+  destino TEXT NOT NULL,
+  id_intimacao VARCHAR(255) NOT NULL,
+  payload JSONB NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'pendente', -- pendente, enviado, falhou
+  tentativas INTEGER NOT NULL DEFAULT 0,
+  proxima_tentativa TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  bloqueado_ate TIMESTAMPTZ,
+  ultimo_erro TEXT,
+  criado_em TIMESTAMPTZ DEFAULT NOW(),
+  enviado_em TIMESTAMPTZ,
+  UNIQUE (destino, id_intimacao)
+);
+
+CREATE INDEX IF NOT EXISTS idx_webhooks_saida_pendentes
+  ON webhooks_saida(proxima_tentativa) WHERE status = 'pendente';
+
+-- Destinos ativos (espelho de WEBHOOK_URLS, sincronizado pelo despachante ao iniciar)
+CREATE TABLE IF NOT EXISTS webhooks_destinos (
+  destino TEXT PRIMARY KEY,
+  ativo BOOLEAN NOT NULL DEFAULT TRUE,
+  atualizado_em TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- A fila é gravada pelo trigger, na mesma transação da inserção das intimações:
+-- uma queda do processo ou falha posterior da extração não perde notificações
+CREATE OR REPLACE FUNCTION djen_enfileirar_webhooks() RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO webhooks_saida (destino, id_intimacao, payload)
+  SELECT d.destino, n.id_intimacao, jsonb_build_object(
+    'id_intimacao', n.id_intimacao,
+    'numero_processo', n.numero_processo,
+    'tribunal', n.tribunal,
+    'orgao_julgador', n.orgao_julgador,
+    'data_publicacao', n.data_publicacao,
+    'tipo_comunicacao', n.tipo_comunicacao,
+    'conteudo_texto', n.conteudo_texto,
+    'metadados', n.metadados
+  )
+  FROM novas n
+  CROSS JOIN webhooks_destinos d
+  WHERE d.ativo
+  ON CONFLICT (destino, id_intimacao) DO NOTHING;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_webhooks_saida ON intimacoes_eduardo_koetz;
+CREATE TRIGGER trg_webhooks_saida
+  AFTER INSERT ON intimacoes_eduardo_koetz
+  REFERENCING NEW TABLE AS novas
+  FOR EACH STATEMENT EXECUTE FUNCTION djen_enfileirar_webhooks();
+
+-- Reserva até p_limite entregas vencidas e livres, as mais antigas primeiro; SKIP LOCKED
+-- deixa vários despachantes (workers, agendador) trabalharem sem repetir envios
+CREATE OR REPLACE FUNCTION djen_reservar_webhooks(p_limite INTEGER, p_lease_segundos INTEGER)
+RETURNS SETOF webhooks_saida
+LANGUAGE sql AS $$
+  UPDATE webhooks_saida w
+  SET bloqueado_ate = NOW() + make_interval(secs => p_lease_segundos)
+  WHERE w.id IN (
+    SELECT id FROM webhooks_saida
+    WHERE status = 'pendente'
+      AND proxima_tentativa <= NOW()
+      AND (bloqueado_ate IS NULL OR bloqueado_ate < NOW())
+    ORDER BY proxima_tentativa, id
+    LIMIT p_limite
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING w.*;
+$$;
+
+-- Falha de envio: nova tentativa em p_backoff_segundos * 2^tentativas (com jitter, até 1 h);
+-- após p_max_tentativas a entrega fica como 'falhou'
+CREATE OR REPLACE FUNCTION djen_reagendar_webhooks(
+  p_ids BIGINT[], p_erro TEXT, p_backoff_segundos INTEGER, p_max_tentativas INTEGER
+) RETURNS INTEGER
+LANGUAGE sql AS $$
+  WITH reagendadas AS (
+    UPDATE webhooks_saida SET
+      tentativas = tentativas + 1,
+      status = CASE WHEN tentativas + 1 >= p_max_tentativas THEN 'falhou' ELSE 'pendente' END,
+      proxima_tentativa = NOW() + make_interval(secs => LEAST(
+        3600, p_backoff_segundos * power(2, tentativas) * (0.5 + random() / 2)
+      )),
+      bloqueado_ate = NULL,
+      ultimo_erro = p_erro
+    WHERE id = ANY(p_ids)
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM reagendadas;
+$$;
+
+-- Partições mensais por faixa de data (RETENCAO_*, retencao.py)
+-- Cria as partições de p_inicio até p_meses_a_frente meses adiante; linhas do mês que já
+-- tinham caído na partição padrão (<tabela>_padrao) são movidas antes do ATTACH
+CREATE OR REPLACE FUNCTION djen_criar_particoes_mensais(
+  p_tabela TEXT, p_coluna TEXT, p_inicio DATE, p_meses_a_frente INTEGER DEFAULT 3
+) RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  mes DATE := date_trunc('month', p_inicio)::date;
+  ultimo DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_meses_a_frente))::date;
+  particao TEXT;
+  criadas INTEGER := 0;
+BEGIN
+  IF p_tabela NOT IN ('logs_extracao_djen') THEN
+    RAISE EXCEPTION 'Tabela sem particionamento mensal: %', p_tabela;
+  END IF;
+
+  WHILE mes <= ultimo LOOP
+    particao := format('%s_%s', p_tabela, to_char(mes, 'YYYY_MM'));
+    IF to_regclass(particao) IS NULL THEN
+      EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', particao, p_tabela);
+      EXECUTE format(
+        'WITH movidas AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM movidas',
+        p_tabela || '_padrao', p_coluna, mes, p_coluna, (mes + INTERVAL '1 month')::date, particao
+      );
+      EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                     p_tabela, particao, mes, (mes + INTERVAL '1 month')::date);
+      criadas := criadas + 1;
+    END IF;
+    mes := (mes + INTERVAL '1 month')::date;
+  END LOOP;
+  RETURN criadas;
+END;
+$$;
+
+-- Descarta um mês já arquivado: DROP da partição (sem DELETE nem VACUUM) ou, se o mês
+-- não tiver partição própria, DELETE da faixa. Retorna as linhas removidas
+CREATE OR REPLACE FUNCTION djen_descartar_mes(p_tabela TEXT, p_coluna TEXT, p_mes DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  inicio DATE := date_trunc('month', p_mes)::date;
+  particao TEXT := format('%s_%s', p_tabela, to_char(date_trunc('month', p_mes), 'YYYY_MM'));
+  removidas INTEGER;
+BEGIN
+  IF p_tabela NOT IN ('logs_extracao_djen') THEN
+    RAISE EXCEPTION 'Tabela sem particionamento mensal: %', p_tabela;
+  END IF;
+
+  IF to_regclass(particao) IS NOT NULL THEN
+    EXECUTE format('SELECT COUNT(*) FROM %I', particao) INTO removidas;
+    EXECUTE format('DROP TABLE %I', particao);
+  ELSE
+    EXECUTE format('DELETE FROM %I WHERE %I >= %L AND %I < %L',
+                   p_tabela, p_coluna, inicio, p_coluna, (inicio + INTERVAL '1 month')::date);
+    GET DIAGNOSTICS removidas = ROW_COUNT;
+  END IF;
+  RETURN removidas;
+END;
+$$;
+
+-- Migração: logs_extracao_djen vira tabela particionada por mês de data_extracao
+-- (a chave primária passa a incluir a coluna de partição). Só roda enquanto a tabela
+-- ainda for comum; as linhas existentes são copiadas para as partições do seu mês
+DO $$
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = 'logs_extracao_djen'::regclass) = 'r' THEN
+    ALTER TABLE logs_extracao_djen RENAME TO logs_extracao_djen_legado;
+    ALTER INDEX IF EXISTS logs_extracao_djen_pkey RENAME TO logs_extracao_djen_legado_pkey;
+    DROP INDEX IF EXISTS idx_logs_data_extracao;
+    DROP INDEX IF EXISTS idx_logs_status;
+    UPDATE logs_extracao_djen_legado SET data_extracao = NOW() WHERE data_extracao IS NULL;
+
+    CREATE TABLE logs_extracao_djen (LIKE logs_extracao_djen_legado INCLUDING DEFAULTS)
+      PARTITION BY RANGE (data_extracao);
+    ALTER TABLE logs_extracao_djen ADD PRIMARY KEY (id, data_extracao);
+    CREATE TABLE logs_extracao_djen_padrao PARTITION OF logs_extracao_djen DEFAULT;
+
+    PERFORM djen_criar_particoes_mensais(
+      'logs_extracao_djen', 'data_extracao',
+      COALESCE((SELECT MIN(data_extracao)::date FROM logs_extracao_djen_legado), CURRENT_DATE)
+    );
+    INSERT INTO logs_extracao_djen SELECT * FROM logs_extracao_djen_legado;
+    DROP TABLE logs_extracao_djen_legado;
+  END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_logs_data_extracao ON logs_extracao_djen(data_extracao);
+CREATE INDEX IF NOT EXISTS idx_logs_status ON logs_extracao_djen(status_execucao);
+
+-- Arquivamento dos payloads frios: intimações publicadas antes de RETENCAO_PAYLOADS_DIAS
+-- têm o item bruto gravado em arquivo (retencao.py) e removido da base; o texto limpo,
+-- os metadados e a busca continuam na tabela de intimações
+ALTER TABLE intimacoes_eduardo_koetz ADD COLUMN IF NOT EXISTS arquivado_em TIMESTAMP;
+CREATE INDEX IF NOT EXISTS idx_intimacoes_a_arquivar
+  ON intimacoes_eduardo_koetz(data_publicacao) WHERE arquivado_em IS NULL;
+
+CREATE OR REPLACE FUNCTION djen_arquivar_payloads(p_ids TEXT[])
+RETURNS INTEGER
+LANGUAGE sql AS $$
+  WITH removidos AS (
+    DELETE FROM intimacoes_payloads WHERE id_intimacao = ANY(p_ids)
+  ), arquivadas AS (
+    UPDATE intimacoes_eduardo_koetz SET
+      conteudo_original = CASE WHEN jsonb_typeof(conteudo_original) = 'object'
+                               THEN conteudo_original - 'texto' END,
+      arquivado_em = NOW()
+    WHERE id_intimacao = ANY(p_ids)
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM arquivadas;
+$$;
+
 -- Comentários nas tabelas
 COMMENT ON TABLE intimacoes_eduardo_koetz IS 'Tabela principal para armazenar as intimações do Eduardo Koetz extraídas do DJEN';
 COMMENT ON TABLE logs_extracao_djen IS 'Log de execuções do sistema de extração DJEN';
+COMMENT ON TABLE intimacoes_payloads IS 'Itens brutos da API DJEN comprimidos (armazenamento frio)';
+COMMENT ON COLUMN intimacoes_eduardo_koetz.arquivado_em IS 'Quando o item bruto foi movido para o arquivo local (retencao.py)';
 
 -- Comentários nas colunas principais
 COMMENT ON COLUMN intimacoes_eduardo_koetz.id_intimacao IS 'ID único da intimação na API DJEN';
 COMMENT ON COLUMN intimacoes_eduardo_koetz.hash_conteudo IS 'Hash do conteúdo para deduplicação';
 COMMENT ON COLUMN intimacoes_eduardo_koetz.conteudo_texto IS 'Texto da intimação limpo e formatado';
-COMMENT ON COLUMN intimacoes_eduardo_koetz.conteudo_original IS 'JSON completo retornado pela API';
+COMMENT ON COLUMN intimacoes_eduardo_koetz.conteudo_original IS 'JSON retornado pela API (sem o campo texto quando o item completo está em intimacoes_payloads)';
 COMMENT ON COLUMN intimacoes_eduardo_koetz.metadados IS 'Metadados estruturados extraídos';
+COMMENT ON COLUMN intimacoes_eduardo_koetz.busca_tsv IS 'Vetor de busca textual (djen_portugues: stemming português sem acentos)';
+COMMENT ON COLUMN intimacoes_eduardo_koetz.numero_processo_normalizado IS 'Número do processo só com dígitos (CNJ)';
+COMMENT ON COLUMN intimacoes_eduardo_koetz.destinatarios_nomes IS 'Nomes dos destinatários em minúsculas e sem acentos (índice trigram)';
+COMMENT ON COLUMN intimacoes_eduardo_koetz.impressao_digital IS 'Hash BLAKE2b dos campos mutáveis do item da API (detecção de alterações)';
+COMMENT ON COLUMN intimacoes_eduardo_koetz.versao IS 'Versão vigente da intimação (incrementada a cada alteração na origem)';
+COMMENT ON TABLE intimacoes_versoes IS 'Versões anteriores das intimações alteradas na origem (DETECTAR_ALTERACOES)';
+COMMENT ON TABLE agendamentos IS 'Jobs do agendador (cron, próxima/última execução e lease de execução exclusiva)';
+COMMENT ON TABLE advogados IS 'Advogados acompanhados (nome e registros OAB consultados na API DJEN)';
+COMMENT ON TABLE intimacoes_advogados IS 'Vínculo intimação x advogado (uma intimação pode pertencer a vários)';
+COMMENT ON TABLE prazos_intimacoes IS 'Vencimentos de prazo por intimação (dias úteis, CPC arts. 219, 220 e 224)';
+COMMENT ON TABLE webhooks_saida IS 'Fila durável dos webhooks de saída (intimações novas por destino, com tentativas e backoff)';
+COMMENT ON TABLE webhooks_destinos IS 'Destinos dos webhooks de saída (WEBHOOK_URLS); o trigger trg_webhooks_saida enfileira para os ativos';
+COMMENT ON TABLE processos_resumo IS 'Resumo por processo (contagem, última movimentação, tribunais) mantido pelos triggers trg_processos_resumo e trg_processos_resumo_alteracao';
+COMMENT ON COLUMN logs_extracao_djen.metricas_etapas IS 'Métricas por etapa (busca_api, requisicao_api, processamento, deduplicacao, insercao, armazenamento)';
 
 -- Inserir registro inicial para teste
 INSERT INTO logs_extracao_djen (
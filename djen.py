@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Linha de comando do DJEN: extrações e tarefas em lote fora do servidor web
+O progresso vai para stderr e o relatório final (JSON) para stdout ou --saida:
+
+    python -m djen extrair --data-inicio 2025-07-01 --data-fim 2025-07-21
+    python -m djen backfill --de 2025-01-01 --ate 2025-06-30 --janela-dias 7 --concorrencia 3
+    python -m djen reprocessar --processos 8 --tamanho-lote 1000
+    python -m djen estatisticas --reconstruir
+    python -m djen retencao --logs-dias 180 --payloads-dias 730
+    python -m djen benchmark --itens 2000 --repeticoes 5
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    REPROCESSAMENTO_PROCESSOS, REPROCESSAMENTO_TAMANHO_LOTE, RETENCAO_LOGS_DIAS, RETENCAO_PAYLOADS_DIAS
+)
+
+# Campos do relatório de extração repetidos em cada janela do backfill
+CAMPOS_RESUMO = (
+    "status_execucao", "total_encontradas", "total_novas", "total_duplicadas",
+    "total_alteradas", "total_erros", "tempo_execucao_segundos"
+)
+TOTAIS_BACKFILL = ("total_encontradas", "total_novas", "total_duplicadas", "total_alteradas", "total_erros")
+
+
+def progresso(mensagem: str):
+    print(mensagem, file=sys.stderr, flush=True)
+
+
+def janelas(inicio: date, fim: date, dias: int) -> List[Tuple[str, str]]:
+    """
+    Divide o período em janelas consecutivas sem sobreposição
+
+    Args:
+        inicio: Primeiro dia (inclusive)
+        fim: Último dia (inclusive)
+        dias: Dias por janela
+
+    Returns:
+        List[Tuple[str, str]]: (data_inicio, data_fim) de cada janela, em ISO
+    """
+    periodos = []
+    atual = inicio
+    while atual <= fim:
+        ultimo = min(atual + timedelta(days=dias - 1), fim)
+        periodos.append((atual.isoformat(), ultimo.isoformat()))
+        atual = ultimo + timedelta(days=1)
+    return periodos
+
+
+def _data(valor: str) -> date:
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida '{valor}' (use AAAA-MM-DD)")
+
+
+def _resumo(relatorio: Dict) -> Dict:
+    return {campo: relatorio.get(campo) for campo in CAMPOS_RESUMO}
+
+
+def comando_extrair(args) -> Dict:
+    from djen_extractor import criar_extractor
+
+    extractor = criar_extractor()
+    inicio = time.perf_counter()
+    progresso(f"📡 Extraindo {args.data_inicio or 'padrão'} → {args.data_fim or 'hoje'}...")
+    relatorio = extractor.executar_extracao_diaria(
+        data_inicio=args.data_inicio.isoformat() if args.data_inicio else None,
+        data_fim=args.data_fim.isoformat() if args.data_fim else None
+    )
+    progresso(f"{'✅' if relatorio.get('status_execucao') == 'sucesso' else '❌'} "
+              f"{relatorio.get('total_encontradas', 0)} encontradas, {relatorio.get('total_novas', 0)} novas "
+              f"({time.perf_counter() - inicio:.1f}s)")
+    return {"comando": "extrair", "status": relatorio.get("status_execucao"), "relatorio": relatorio}
+
+
+def comando_backfill(args) -> Dict:
+    from djen_extractor import criar_extractor
+
+    if args.ate < args.de:
+        raise ValueError("--ate anterior a --de")
+
+    periodos = janelas(args.de, args.ate, args.janela_dias)
+    extractor = criar_extractor()
+    resultados: Dict[Tuple[str, str], Dict] = {}
+    inicio = time.perf_counter()
+
+    progresso(f"📚 Backfill {args.de} → {args.ate}: {len(periodos)} janelas de {args.janela_dias} dias, "
+              f"concorrência {args.concorrencia}")
+
+    def executar(periodo: Tuple[str, str]) -> Dict:
+        try:
+            return extractor.executar_extracao_diaria(data_inicio=periodo[0], data_fim=periodo[1])
+        except Exception as e:
+            return {"status_execucao": "erro", "erro_detalhes": str(e)}
+
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        futuros = {executor.submit(executar, periodo): periodo for periodo in periodos}
+        for concluidas, futuro in enumerate(as_completed(futuros), 1):
+            periodo = futuros[futuro]
+            relatorio = resultados[periodo] = futuro.result()
+            marcador = '✅' if relatorio.get('status_execucao') == 'sucesso' else '❌'
+            progresso(f"  [{concluidas}/{len(periodos)}] {marcador} {periodo[0]} → {periodo[1]}: "
+                      f"{relatorio.get('total_encontradas', 0)} encontradas, {relatorio.get('total_novas', 0)} novas")
+
+    relatorios = [{"data_inicio": p[0], "data_fim": p[1], **_resumo(resultados[p])} for p in periodos]
+    falhas = [r for r in relatorios if r["status_execucao"] != "sucesso"]
+    status = "sucesso" if not falhas else ("erro" if len(falhas) == len(relatorios) else "parcial")
+    totais = {campo: sum(r.get(campo) or 0 for r in relatorios) for campo in TOTAIS_BACKFILL}
+
+    progresso(f"🏁 {len(relatorios) - len(falhas)}/{len(relatorios)} janelas concluídas, "
+              f"{totais['total_novas']} novas em {time.perf_counter() - inicio:.1f}s")
+    return {
+        "comando": "backfill",
+        "status": status,
+        "parametros": {"de": args.de.isoformat(), "ate": args.ate.isoformat(),
+                       "janela_dias": args.janela_dias, "concorrencia": args.concorrencia},
+        "totais": totais,
+        "tempo_execucao_segundos": round(time.perf_counter() - inicio, 3),
+        "janelas": relatorios
+    }
+
+
+def comando_reprocessar(args) -> Dict:
+    from reprocessamento import reprocessar
+    from supabase_client import SupabaseClient
+
+    inicio = time.perf_counter()
+
+    def mostrar(parcial: Dict):
+        progresso(f"  ♻️ {parcial['lidas']} lidas, {parcial['alteradas']} alteradas, {parcial['erros']} erros "
+                  f"({time.perf_counter() - inicio:.0f}s)")
+
+    cliente = SupabaseClient()
+    progresso(f"♻️ Reprocessando com {args.processos} processos, lotes de {args.tamanho_lote}...")
+    estatisticas = reprocessar(cliente, limite=args.limite, progresso=mostrar,
+                               processos=args.processos, tamanho_lote=args.tamanho_lote)
+    resultado = {
+        "comando": "reprocessar",
+        "status": "sucesso" if not estatisticas["erros"] else "parcial",
+        "estatisticas": estatisticas
+    }
+
+    if estatisticas["processos_alterados"]:
+        # O trigger do resumo só acompanha inserções
+        progresso(f"🔄 {estatisticas['processos_alterados']} números de processo mudaram; reconstruindo o resumo...")
+        resultado["processos_resumo"] = cliente.reconstruir_resumo_processos()
+
+    resultado["tempo_execucao_segundos"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+def comando_estatisticas(args) -> Dict:
+    from supabase_client import SupabaseClient
+
+    cliente = SupabaseClient()
+    resultado = {"comando": "estatisticas", "status": "sucesso"}
+
+    if args.reconstruir:
+        progresso("🔄 Reconstruindo o resumo dos processos...")
+        processos = cliente.reconstruir_resumo_processos()
+        if processos is None:
+            resultado["status"] = "erro"
+        else:
+            progresso(f"  ✅ {processos} processos no resumo")
+        resultado["processos_resumo"] = processos
+
+    resultado["base"] = cliente.obter_estatisticas_base()
+    resultado["por_tribunal"] = cliente.obter_estatisticas_tribunal()
+    return resultado
+
+
+def comando_retencao(args) -> Dict:
+    from retencao import executar_retencao, restaurar_payloads
+    from supabase_client import SupabaseClient
+
+    cliente = SupabaseClient()
+    if args.restaurar:
+        progresso(f"📦 Restaurando payloads de {args.restaurar}...")
+        estatisticas = restaurar_payloads(cliente, args.restaurar)
+        return {"comando": "retencao", "status": "sucesso" if not estatisticas["erros"] else "parcial",
+                "restauracao": estatisticas}
+
+    progresso(f"🗄️ Retenção: logs com mais de {args.logs_dias or '∞'} dias, "
+              f"payloads com mais de {args.payloads_dias or '∞'} dias...")
+    relatorio = executar_retencao(cliente, logs_dias=args.logs_dias, payloads_dias=args.payloads_dias)
+    progresso(f"  {'✅' if relatorio['status_execucao'] == 'sucesso' else '⚠️'} "
+              f"{relatorio['logs']['arquivados']} logs e {relatorio['payloads']['arquivadas']} payloads arquivados")
+    return {"comando": "retencao", "status": relatorio.pop("status_execucao"), **relatorio}
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="djen", description="Extração DJEN e tarefas em lote")
+    parser.add_argument('--saida', help="Grava o relatório JSON neste arquivo (padrão: stdout)")
+    parser.add_argument('-v', '--verboso', action='store_true', help="Mostra os logs INFO também no terminal")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    extrair = subparsers.add_parser('extrair', help="Extração diária (ou de um período)")
+    extrair.add_argument('--data-inicio', type=_data)
+    extrair.add_argument('--data-fim', type=_data)
+    extrair.set_defaults(funcao=comando_extrair)
+
+    backfill = subparsers.add_parser('backfill', help="Extração de um período longo em janelas paralelas")
+    backfill.add_argument('--de', type=_data, required=True, help="Primeiro dia (AAAA-MM-DD)")
+    backfill.add_argument('--ate', type=_data, default=date.today(), help="Último dia (padrão: hoje)")
+    backfill.add_argument('--janela-dias', type=int, default=7, help="Dias por extração (padrão 7)")
+    backfill.add_argument('--concorrencia', type=int, default=2,
+                          help="Janelas extraídas ao mesmo tempo (a API continua sob o limitador de taxa)")
+    backfill.set_defaults(funcao=comando_backfill)
+
+    reprocessar = subparsers.add_parser('reprocessar', help="Refaz texto e metadados a partir do item bruto gravado")
+    reprocessar.add_argument('--limite', type=int, help="Máximo de intimações lidas")
+    reprocessar.add_argument('--processos', type=int, default=REPROCESSAMENTO_PROCESSOS,
+                             help=f"Processos de trabalho (padrão {REPROCESSAMENTO_PROCESSOS}; 1 = sem pool)")
+    reprocessar.add_argument('--tamanho-lote', type=int, default=REPROCESSAMENTO_TAMANHO_LOTE,
+                             help=f"Linhas por lote de leitura e gravação (padrão {REPROCESSAMENTO_TAMANHO_LOTE})")
+    reprocessar.set_defaults(funcao=comando_reprocessar)
+
+    estatisticas = subparsers.add_parser('estatisticas', help="Estatísticas da base")
+    estatisticas.add_argument('--reconstruir', action='store_true', help="Recalcula o resumo dos processos")
+    estatisticas.set_defaults(funcao=comando_estatisticas)
+
+    retencao = subparsers.add_parser('retencao', help="Arquiva logs e itens brutos antigos e cria as partições")
+    retencao.add_argument('--logs-dias', type=int, default=RETENCAO_LOGS_DIAS,
+                          help=f"Dias de logs mantidos na base (padrão {RETENCAO_LOGS_DIAS}; 0 = todos)")
+    retencao.add_argument('--payloads-dias', type=int, default=RETENCAO_PAYLOADS_DIAS,
+                          help=f"Dias de itens brutos mantidos na base (padrão {RETENCAO_PAYLOADS_DIAS}; 0 = todos)")
+    retencao.add_argument('--restaurar', metavar='ARQUIVO', help="Devolve à base os payloads de um arquivo")
+    retencao.set_defaults(funcao=comando_retencao)
+
+    subparsers.add_parser('benchmark', help="Benchmarks do pipeline (argumentos do benchmark.py)", add_help=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = criar_parser()
+    args, extras = parser.parse_known_args(argv)
+
+    if args.comando == 'benchmark':
+        import benchmark
+        return benchmark.main(extras)
+    if extras:
+        parser.error(f"argumentos não reconhecidos: {' '.join(extras)}")
+    for opcao in ('janela_dias', 'concorrencia', 'processos', 'tamanho_lote'):
+        if getattr(args, opcao, 1) < 1:
+            parser.error(f"--{opcao.replace('_', '-')} deve ser >= 1")
+
+    from logging_config import setup_logging
+    # Sem -v o terminal fica só com o progresso; os logs completos continuam no LOG_FILE
+    setup_logging(nivel_console=None if args.verboso else logging.WARNING)
+
+    try:
+        resultado = args.funcao(args)
+    except Exception as e:
+        resultado = {"comando": args.comando, "status": "erro", "erro": str(e)}
+        progresso(f"❌ {e}")
+
+    resultado["gerado_em"] = datetime.now().isoformat()
+    relatorio = json.dumps(resultado, ensure_ascii=False, indent=2, default=str)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(relatorio)
+        progresso(f"💾 Relatório gravado em {args.saida}")
+    else:
+        print(relatorio)
+
+    return 0 if resultado.get("status") == "sucesso" else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,14 +3,20 @@ Classe para consulta da API DJEN (Diário de Justiça Eletrônico Nacional)
 """
 import requests
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlencode
 
 from config import (
     DJEN_API_URL, DEFAULT_HEADERS, TIMEOUT_REQUESTS, ITEMS_POR_PAGINA,
-    ADVOGADO_NOME, REGISTROS_OAB, DIAS_BUSCA
+    ADVOGADO_NOME, DIAS_BUSCA, EXTRACAO_MAX_CONCORRENCIA
 )
+from advogados import Advogado, advogado_padrao, mesclar_resultados, planejar_consultas
+from instrumentacao import registrar_amostra
+from limitador_taxa import limitador_compartilhado
+from metricas import DJEN_REQUISICOES, DJEN_LATENCIA
 
 class DJENApiClient:
     """
@@ -21,6 +27,7 @@ class DJENApiClient:
         self.api_url = DJEN_API_URL
         self.headers = DEFAULT_HEADERS.copy()
         self.timeout = TIMEOUT_REQUESTS
+        self.limitador = limitador_compartilhado()
         self.logger = logging.getLogger(__name__)
     
     def _fazer_requisicao(self, params: Dict) -> Tuple[bool, Optional[Dict]]:
@@ -34,46 +41,58 @@ class DJENApiClient:
             Tuple[bool, Optional[Dict]]: (sucesso, dados)
         """
         try:
-            self.logger.info(f"Fazendo requisição para API DJEN: {params}")
+            self.logger.debug("Fazendo requisição para API DJEN: %s", params)
             
+            self.limitador.aguardar()
+            inicio = time.perf_counter()
             response = requests.get(
                 self.api_url,
                 params=params,
                 headers=self.headers,
                 timeout=self.timeout
             )
+            duracao = time.perf_counter() - inicio
+            registrar_amostra('requisicao_api', duracao, len(response.content))
+            DJEN_LATENCIA.observar(duracao)
             
-            self.logger.info(f"Status Code: {response.status_code}")
+            self.logger.debug("Status Code: %s", response.status_code)
             
             if response.status_code == 200:
                 data = response.json()
                 
                 # Verificar se a resposta tem a estrutura esperada
                 if 'status' in data and data['status'] == 'success':
-                    self.logger.info(f"Requisição bem-sucedida. Count: {data.get('count', 0)}")
+                    self.logger.debug("Requisição bem-sucedida. Count: %s", data.get('count', 0))
+                    DJEN_REQUISICOES.inc(resultado='sucesso')
                     return True, data
                 else:
                     self.logger.warning(f"Resposta com status não esperado: {data.get('status')}")
+                    DJEN_REQUISICOES.inc(resultado='status_inesperado')
                     return False, data
                     
             else:
                 self.logger.error(f"Erro na requisição: {response.status_code} - {response.text}")
+                DJEN_REQUISICOES.inc(resultado=f'http_{response.status_code}')
                 return False, None
                 
         except requests.exceptions.Timeout:
             self.logger.error(f"Timeout na requisição após {self.timeout}s")
+            DJEN_REQUISICOES.inc(resultado='timeout')
             return False, None
             
         except requests.exceptions.ConnectionError:
             self.logger.error("Erro de conexão com a API DJEN")
+            DJEN_REQUISICOES.inc(resultado='erro_conexao')
             return False, None
             
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Erro na requisição: {e}")
+            DJEN_REQUISICOES.inc(resultado='erro_requisicao')
             return False, None
             
         except Exception as e:
             self.logger.error(f"Erro inesperado: {e}")
+            DJEN_REQUISICOES.inc(resultado='erro_inesperado')
             return False, None
     
     def buscar_por_nome(
@@ -153,13 +172,56 @@ class DJENApiClient:
         
         return self._fazer_requisicao(params)
     
+    def buscar_advogados(
+        self,
+        advogados: List[Advogado],
+        data_inicio: Optional[str] = None,
+        data_fim: Optional[str] = None
+    ) -> Tuple[bool, List[Dict], Dict[str, List[str]]]:
+        """
+        Busca intimações de vários advogados (nome e registros OAB de cada um)
+        As consultas repetidas entre advogados saem uma única vez e rodam em
+        paralelo, todas sob o limitador de taxa compartilhado.
+        
+        Args:
+            advogados: Advogados acompanhados
+            data_inicio: Data início (yyyy-mm-dd)
+            data_fim: Data fim (yyyy-mm-dd)
+            
+        Returns:
+            Tuple[bool, List[Dict], Dict[str, List[str]]]: (sucesso, intimações únicas,
+                ids dos advogados por id_intimacao)
+        """
+        consultas = planejar_consultas(advogados)
+        
+        self.logger.info(f"Buscando {len(consultas)} consultas de {len(advogados)} advogado(s)")
+        
+        def executar(consulta: Dict) -> Tuple[bool, List[Dict]]:
+            if 'nomeAdvogado' in consulta:
+                sucesso, dados = self.buscar_por_nome(consulta['nomeAdvogado'], data_inicio, data_fim)
+                descricao = consulta['nomeAdvogado']
+            else:
+                sucesso, dados = self.buscar_por_oab(consulta['numeroOab'], consulta['ufOab'], data_inicio, data_fim)
+                descricao = f"OAB {consulta['numeroOab']}/{consulta['ufOab']}"
+            items = ((dados or {}).get('items') or []) if sucesso else []
+            self.logger.info(f"{descricao}: {len(items)} intimações")
+            return sucesso, items
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(EXTRACAO_MAX_CONCORRENCIA, len(consultas)))) as executor:
+            resultados = list(executor.map(executar, [consulta for consulta, _ in consultas]))
+        
+        sucesso_geral, todas_intimacoes, vinculos = mesclar_resultados(consultas, resultados)
+        
+        self.logger.info(f"Total de intimações únicas encontradas: {len(todas_intimacoes)}")
+        return sucesso_geral, todas_intimacoes, vinculos
+    
     def buscar_todas_oabs_eduardo(
         self,
         data_inicio: Optional[str] = None,
         data_fim: Optional[str] = None
     ) -> Tuple[bool, List[Dict]]:
         """
-        Busca intimações em todos os registros OAB do Eduardo Koetz
+        Busca intimações por nome e em todos os registros OAB do advogado configurado
         
         Args:
             data_inicio: Data início (yyyy-mm-dd)
@@ -168,43 +230,8 @@ class DJENApiClient:
         Returns:
             Tuple[bool, List[Dict]]: (sucesso, lista de todas as intimações)
         """
-        todas_intimacoes = []
-        sucesso_geral = True
-        
-        self.logger.info(f"Buscando em {len(REGISTROS_OAB)} registros OAB do Eduardo Koetz")
-        
-        # Buscar por nome primeiro
-        sucesso, dados = self.buscar_por_nome(data_inicio=data_inicio, data_fim=data_fim)
-        if sucesso and dados and dados.get('items'):
-            todas_intimacoes.extend(dados['items'])
-            self.logger.info(f"Encontradas {len(dados['items'])} intimações por nome")
-        elif not sucesso:
-            sucesso_geral = False
-            self.logger.warning("Falha na busca por nome")
-        
-        # Buscar por cada registro OAB
-        for registro in REGISTROS_OAB:
-            sucesso, dados = self.buscar_por_oab(
-                numero_oab=registro["numero"],
-                uf_oab=registro["uf"],
-                data_inicio=data_inicio,
-                data_fim=data_fim
-            )
-            
-            if sucesso and dados and dados.get('items'):
-                # Adicionar items que ainda não estão na lista (deduplicação básica por ID)
-                ids_existentes = {item['id'] for item in todas_intimacoes}
-                novos_items = [item for item in dados['items'] if item['id'] not in ids_existentes]
-                
-                todas_intimacoes.extend(novos_items)
-                self.logger.info(f"OAB {registro['numero']}/{registro['uf']}: "
-                               f"{len(dados['items'])} total, {len(novos_items)} novos")
-            elif not sucesso:
-                sucesso_geral = False
-                self.logger.warning(f"Falha na busca por OAB {registro['numero']}/{registro['uf']}")
-        
-        self.logger.info(f"Total de intimações únicas encontradas: {len(todas_intimacoes)}")
-        return sucesso_geral, todas_intimacoes
+        sucesso, intimacoes, _ = self.buscar_advogados([advogado_padrao()], data_inicio, data_fim)
+        return sucesso, intimacoes
     
     def buscar_periodo_extendido(
         self,
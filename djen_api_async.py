@@ -0,0 +1,192 @@
+"""
+Cliente assíncrono (httpx + HTTP/2) para a API DJEN
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from config import (
+    DJEN_API_URL, DEFAULT_HEADERS, TIMEOUT_REQUESTS, ITEMS_POR_PAGINA,
+    DIAS_BUSCA, ASYNC_MAX_REQUISICOES_API
+)
+from advogados import Advogado, advogado_padrao, mesclar_resultados, planejar_consultas
+from instrumentacao import registrar_amostra
+from limitador_taxa import limitador_compartilhado
+from metricas import DJEN_REQUISICOES, DJEN_LATENCIA
+
+class AsyncDJENApiClient:
+    """
+    Cliente assíncrono para a API DJEN
+
+    Todas as consultas (nome, OABs e páginas) compartilham uma única conexão
+    HTTP/2 multiplexada, limitada por um semáforo de requisições simultâneas
+    e pelo limitador de taxa do processo.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, max_concorrencia: int = ASYNC_MAX_REQUISICOES_API):
+        self.client = client
+        self.api_url = DJEN_API_URL
+        self.semaforo = asyncio.Semaphore(max_concorrencia)
+        self.limitador = limitador_compartilhado()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def criar_http_client() -> httpx.AsyncClient:
+        """
+        Cria o cliente httpx compartilhado (HTTP/2, keep-alive)
+
+        Returns:
+            httpx.AsyncClient: Cliente pronto para uso em `async with`
+        """
+        return httpx.AsyncClient(
+            http2=True,
+            headers=DEFAULT_HEADERS.copy(),
+            timeout=TIMEOUT_REQUESTS
+        )
+
+    async def _fazer_requisicao(self, params: Dict) -> Tuple[bool, Optional[Dict]]:
+        """
+        Faz uma requisição para a API DJEN
+
+        Args:
+            params: Parâmetros da requisição
+
+        Returns:
+            Tuple[bool, Optional[Dict]]: (sucesso, dados)
+        """
+        try:
+            await self.limitador.aguardar_async()
+            async with self.semaforo:
+                self.logger.debug(f"Requisição assíncrona para API DJEN: {params}")
+                inicio = time.perf_counter()
+                response = await self.client.get(self.api_url, params=params)
+                duracao = time.perf_counter() - inicio
+                registrar_amostra('requisicao_api', duracao, len(response.content))
+                DJEN_LATENCIA.observar(duracao)
+
+            if response.status_code == 200:
+                data = response.json()
+
+                if 'status' in data and data['status'] == 'success':
+                    DJEN_REQUISICOES.inc(resultado='sucesso')
+                    return True, data
+                else:
+                    self.logger.warning(f"Resposta com status não esperado: {data.get('status')}")
+                    DJEN_REQUISICOES.inc(resultado='status_inesperado')
+                    return False, data
+            else:
+                self.logger.error(f"Erro na requisição: {response.status_code} - {response.text}")
+                DJEN_REQUISICOES.inc(resultado=f'http_{response.status_code}')
+                return False, None
+
+        except httpx.TimeoutException:
+            self.logger.error(f"Timeout na requisição após {TIMEOUT_REQUESTS}s")
+            DJEN_REQUISICOES.inc(resultado='timeout')
+            return False, None
+
+        except httpx.HTTPError as e:
+            self.logger.error(f"Erro na requisição: {e}")
+            DJEN_REQUISICOES.inc(resultado='erro_conexao')
+            return False, None
+
+        except Exception as e:
+            self.logger.error(f"Erro inesperado: {e}")
+            DJEN_REQUISICOES.inc(resultado='erro_inesperado')
+            return False, None
+
+    async def _buscar_todas_paginas(self, params: Dict) -> Tuple[bool, List[Dict]]:
+        """
+        Busca a primeira página e, a partir do `count`, as demais em paralelo
+
+        Args:
+            params: Parâmetros da consulta (sem `pagina`)
+
+        Returns:
+            Tuple[bool, List[Dict]]: (sucesso, items de todas as páginas)
+        """
+        sucesso, dados = await self._fazer_requisicao({**params, "pagina": 1})
+        if not sucesso or not dados:
+            return False, []
+
+        items = list(dados.get('items') or [])
+        total = dados.get('count') or 0
+        total_paginas = -(-total // ITEMS_POR_PAGINA) if total else 1
+
+        if total_paginas > 1:
+            resultados = await asyncio.gather(*[
+                self._fazer_requisicao({**params, "pagina": pagina})
+                for pagina in range(2, total_paginas + 1)
+            ])
+            for sucesso_pagina, dados_pagina in resultados:
+                if not sucesso_pagina:
+                    sucesso = False
+                elif dados_pagina:
+                    items.extend(dados_pagina.get('items') or [])
+
+        return sucesso, items
+
+    async def buscar_advogados(
+        self,
+        advogados: List[Advogado],
+        data_inicio: Optional[str] = None,
+        data_fim: Optional[str] = None
+    ) -> Tuple[bool, List[Dict], Dict[str, List[str]]]:
+        """
+        Busca intimações de vários advogados em paralelo (consultas repetidas
+        entre advogados saem uma única vez)
+
+        Args:
+            advogados: Advogados acompanhados
+            data_inicio: Data início (yyyy-mm-dd)
+            data_fim: Data fim (yyyy-mm-dd)
+
+        Returns:
+            Tuple[bool, List[Dict], Dict[str, List[str]]]: (sucesso, intimações únicas,
+                ids dos advogados por id_intimacao)
+        """
+        if not data_inicio or not data_fim:
+            hoje = datetime.now().date()
+            ontem = hoje - timedelta(days=DIAS_BUSCA)
+            data_inicio = ontem.strftime("%Y-%m-%d")
+            data_fim = hoje.strftime("%Y-%m-%d")
+
+        base = {
+            "dataDisponibilizacaoInicio": data_inicio,
+            "dataDisponibilizacaoFim": data_fim,
+            "itensPorPagina": ITEMS_POR_PAGINA,
+            "meio": "D"
+        }
+        consultas = planejar_consultas(advogados)
+
+        self.logger.info(f"Buscando (async) {len(consultas)} consultas de {len(advogados)} advogado(s)")
+        resultados = await asyncio.gather(*[
+            self._buscar_todas_paginas({**base, **consulta}) for consulta, _ in consultas
+        ])
+
+        # Mesclar na ordem das consultas (nome primeiro), deduplicando por ID
+        sucesso_geral, todas_intimacoes, vinculos = mesclar_resultados(consultas, resultados)
+
+        self.logger.info(f"Total de intimações únicas encontradas: {len(todas_intimacoes)}")
+        return sucesso_geral, todas_intimacoes, vinculos
+
+    async def buscar_todas_oabs_eduardo(
+        self,
+        data_inicio: Optional[str] = None,
+        data_fim: Optional[str] = None
+    ) -> Tuple[bool, List[Dict]]:
+        """
+        Busca intimações por nome e em todos os registros OAB do advogado configurado
+
+        Args:
+            data_inicio: Data início (yyyy-mm-dd)
+            data_fim: Data fim (yyyy-mm-dd)
+
+        Returns:
+            Tuple[bool, List[Dict]]: (sucesso, lista de todas as intimações)
+        """
+        sucesso, intimacoes, _ = await self.buscar_advogados([advogado_padrao()], data_inicio, data_fim)
+        return sucesso, intimacoes
@@ -7,28 +7,74 @@ import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
-from djen_api import DJENApiClient
+from advogados import carregar_advogados
+from componentes import componente
 from text_processor import TextProcessor
 from supabase_client import SupabaseClient
-from config import validar_configuracoes
+from armazenamento import criar_armazenamento
+from prazos import CalendarioForense, gerar_prazos
+from config import (
+    validar_configuracoes, MOTOR_EXTRACAO, ARMAZENAMENTO_LOCAL, MOTOR_BUSCA, CALCULAR_PRAZOS, WEBHOOK_URLS
+)
+from instrumentacao import MedidorEtapas, etapa
+from metricas import (
+    EXTRACAO_EXECUCOES, EXTRACAO_DURACAO, EXTRACAO_ULTIMA, INTIMACOES_ENCONTRADAS,
+    INTIMACOES_INSERIDAS, INTIMACOES_DUPLICADAS, INTIMACOES_ALTERADAS, INTIMACOES_ERROS
+)
 
 class DJENExtractor:
     """
     Classe principal que coordena toda a extração DJEN
+    
+    Os componentes (clientes, réplica local, índice, calendário) são criados no
+    primeiro uso; o servidor API os aquece em segundo plano (componentes.aquecer).
     """
     
     def __init__(self):
         # Validar configurações
         validar_configuracoes()
         
-        # Inicializar componentes
-        self.api_client = DJENApiClient()
-        self.text_processor = TextProcessor()
-        self.supabase_client = SupabaseClient()
-        
         self.logger = logging.getLogger(__name__)
         self.logger.info("✅ DJENExtractor inicializado")
     
+    @componente
+    def supabase_client(self) -> SupabaseClient:
+        return SupabaseClient()
+    
+    @componente
+    def armazenamento(self):
+        """
+        Backend de escrita (BACKEND_ARMAZENAMENTO)
+        """
+        return criar_armazenamento(self.supabase_client)
+    
+    @componente
+    def api_client(self):
+        # requests só é importado quando a API DJEN é usada de fato
+        from djen_api import DJENApiClient
+        return DJENApiClient()
+    
+    @componente
+    def text_processor(self) -> TextProcessor:
+        return TextProcessor()
+    
+    @componente
+    def armazenamento_local(self):
+        """
+        Cria a réplica SQLite quando ARMAZENAMENTO_LOCAL está ativo
+        
+        Returns:
+            Optional[ArmazenamentoLocal]: Réplica local ou None
+        """
+        if not ARMAZENAMENTO_LOCAL:
+            return None
+        try:
+            from armazenamento_local import ArmazenamentoLocal
+            return ArmazenamentoLocal()
+        except Exception as e:
+            logging.getLogger(__name__).error(f"❌ Erro ao abrir armazenamento local: {e}")
+            return None
+    
     def testar_componentes(self) -> Dict[str, bool]:
         """
         Testa todos os componentes do sistema
@@ -54,6 +100,14 @@ class DJENExtractor:
             self.logger.error(f"Erro no teste do Supabase: {e}")
             testes['supabase'] = False
         
+        # Teste do backend de escrita, quando não é o próprio Supabase
+        if self.armazenamento is not self.supabase_client:
+            try:
+                testes['armazenamento'] = self.armazenamento.testar_conexao()
+            except Exception as e:
+                self.logger.error(f"Erro no teste do armazenamento: {e}")
+                testes['armazenamento'] = False
+        
         # Teste do processador de texto
         try:
             texto_teste = "<p>Teste de <b>processamento</b><br>com HTML</p>"
@@ -93,12 +147,88 @@ class DJENExtractor:
         
         self.logger.info("🚀 Iniciando extração diária DJEN")
         
-        relatorio = {
+        relatorio = self._novo_relatorio(data_inicio, data_fim)
+        medidor = MedidorEtapas()
+        
+        try:
+            with medidor.ativar():
+                # Passo 1: Buscar intimações na API (todos os advogados do cadastro)
+                advogados = carregar_advogados(supabase_client=self.supabase_client)
+                relatorio["parametros_busca"]["advogados"] = [advogado.id for advogado in advogados]
+                
+                self.logger.info("📡 Buscando intimações na API...")
+                with etapa('busca_api'):
+                    sucesso_api, intimacoes_raw, vinculos = self.api_client.buscar_advogados(
+                        advogados,
+                        data_inicio=data_inicio, 
+                        data_fim=data_fim
+                    )
+                
+                if not sucesso_api:
+                    raise Exception("Falha na consulta da API DJEN")
+                
+                relatorio["total_encontradas"] = len(intimacoes_raw)
+                self.logger.info(f"📋 Total encontrado na API: {len(intimacoes_raw)}")
+                
+                if not intimacoes_raw:
+                    self.logger.info("ℹ️ Nenhuma intimação encontrada para o período")
+                    relatorio["status_execucao"] = "sucesso"
+                    return relatorio
+                
+                # Passo 2: Processar intimações
+                self.logger.info("⚙️ Processando intimações...")
+                with etapa('processamento', self._tamanho_textos(intimacoes_raw)):
+                    intimacoes_processadas = self._processar_intimacoes_raw(intimacoes_raw, relatorio)
+                
+                # Passo 3: Armazenar (com deduplicação automática)
+                # O despachante é criado antes: ele grava os destinos para os quais o trigger enfileira
+                webhooks = self.webhooks
+                self.logger.info("💾 Armazenando intimações...")
+                with etapa('armazenamento'):
+                    estatisticas_armazenamento = self.armazenamento.processar_intimacoes(intimacoes_processadas)
+                
+                self._notificar_novas(webhooks, estatisticas_armazenamento)
+                self._replicar_aceitas(intimacoes_processadas, estatisticas_armazenamento, vinculos, advogados)
+                
+                # Passo 4: Finalizar
+                self._finalizar_relatorio(relatorio, estatisticas_armazenamento, inicio_execucao)
+            
+        except Exception as e:
+            self._registrar_erro_relatorio(relatorio, e, inicio_execucao)
+        
+        finally:
+            relatorio["metricas_etapas"] = medidor.resumo()
+            self._registrar_metricas(relatorio)
+            
+            # Registrar log da execução
+            try:
+                self.armazenamento.registrar_log_execucao(relatorio)
+            except Exception as e:
+                self.logger.error(f"Erro ao registrar log: {e}")
+            
+            if self.armazenamento_local:
+                self.armazenamento_local.registrar_log_execucao(relatorio)
+        
+        return relatorio
+    
+    def _novo_relatorio(self, data_inicio: Optional[str], data_fim: Optional[str]) -> Dict:
+        """
+        Cria o relatório de execução vazio
+        
+        Args:
+            data_inicio: Data de início (opcional)
+            data_fim: Data de fim (opcional)
+            
+        Returns:
+            Dict: Relatório inicial
+        """
+        return {
             "inicio_execucao": datetime.now().isoformat(),
             "status_execucao": "em_andamento",
             "total_encontradas": 0,
             "total_novas": 0,
             "total_duplicadas": 0,
+            "total_alteradas": 0,
             "total_erros": 0,
             "tempo_execucao_segundos": 0,
             "parametros_busca": {
@@ -107,88 +237,267 @@ class DJENExtractor:
             },
             "detalhes_erros": []
         }
+    
+    @componente
+    def indice_busca(self):
+        """
+        Carrega o índice invertido quando MOTOR_BUSCA='memoria'
         
+        Returns:
+            Optional[IndiceInvertido]: Índice ou None
+        """
+        if MOTOR_BUSCA != 'memoria':
+            return None
         try:
-            # Passo 1: Buscar intimações na API
-            self.logger.info("📡 Buscando intimações na API...")
-            sucesso_api, intimacoes_raw = self.api_client.buscar_todas_oabs_eduardo(
-                data_inicio=data_inicio, 
-                data_fim=data_fim
-            )
-            
-            if not sucesso_api:
-                raise Exception("Falha na consulta da API DJEN")
-            
-            relatorio["total_encontradas"] = len(intimacoes_raw)
-            self.logger.info(f"📋 Total encontrado na API: {len(intimacoes_raw)}")
-            
-            if not intimacoes_raw:
-                self.logger.info("ℹ️ Nenhuma intimação encontrada para o período")
-                relatorio["status_execucao"] = "sucesso"
-                return relatorio
-            
-            # Passo 2: Processar intimações
-            self.logger.info("⚙️ Processando intimações...")
-            intimacoes_processadas = []
-            
-            for item_raw in intimacoes_raw:
-                try:
-                    intimacao_processada = self.text_processor.processar_intimacao_completa(item_raw)
-                    
-                    # Validar intimação
-                    if self.text_processor.validar_intimacao(intimacao_processada):
-                        intimacoes_processadas.append(intimacao_processada)
-                    else:
-                        self.logger.warning(f"Intimação {item_raw.get('id')} falhou na validação")
-                        relatorio["total_erros"] += 1
-                
-                except Exception as e:
-                    self.logger.error(f"Erro ao processar intimação {item_raw.get('id')}: {e}")
-                    relatorio["total_erros"] += 1
-                    relatorio["detalhes_erros"].append(str(e))
-            
-            self.logger.info(f"✅ Processadas {len(intimacoes_processadas)} intimações válidas")
-            
-            # Passo 3: Armazenar no Supabase (com deduplicação automática)
-            self.logger.info("💾 Armazenando no Supabase...")
-            estatisticas_armazenamento = self.supabase_client.processar_intimacoes(intimacoes_processadas)
-            
-            # Atualizar relatório
-            relatorio["total_novas"] = estatisticas_armazenamento["novas_inseridas"]
-            relatorio["total_duplicadas"] = estatisticas_armazenamento["duplicatas_encontradas"]
-            relatorio["total_erros"] += estatisticas_armazenamento["erros"]
-            relatorio["detalhes_erros"].extend(estatisticas_armazenamento["detalhes_erros"])
-            
-            # Passo 4: Finalizar
-            tempo_total = time.time() - inicio_execucao
-            relatorio["tempo_execucao_segundos"] = int(tempo_total)
-            relatorio["status_execucao"] = "sucesso"
-            relatorio["fim_execucao"] = datetime.now().isoformat()
-            
-            self.logger.info("🎉 Extração concluída com sucesso!")
-            self.logger.info(f"📊 Resumo: {relatorio['total_encontradas']} encontradas, "
-                           f"{relatorio['total_novas']} novas, "
-                           f"{relatorio['total_duplicadas']} duplicadas, "
-                           f"{relatorio['total_erros']} erros")
-            
+            from indice_invertido import IndiceInvertido
+            indice = IndiceInvertido()
+            if not indice.carregar():
+                logging.getLogger(__name__).warning(
+                    "⚠️ Índice de busca vazio: rode 'python indice_invertido.py --reconstruir'"
+                )
+            return indice
+        except Exception as e:
+            logging.getLogger(__name__).error(f"❌ Erro ao carregar índice de busca: {e}")
+            return None
+    
+    @componente
+    def calendario(self):
+        """
+        Carrega o calendário forense (feriados cadastrados) quando CALCULAR_PRAZOS está ativo
+        
+        Returns:
+            Optional[CalendarioForense]: Calendário ou None
+        """
+        if not CALCULAR_PRAZOS:
+            return None
+        return CalendarioForense(self.supabase_client.obter_feriados())
+    
+    @componente
+    def webhooks(self):
+        """
+        Despachante dos webhooks de saída quando WEBHOOK_URLS está configurada
+        
+        Returns:
+            Optional[DespachanteWebhooks]: Despachante ou None
+        """
+        if not WEBHOOK_URLS:
+            # Desativa os destinos que sobraram: sem isso o trigger seguiria enfileirando
+            # em webhooks_saida entregas que ninguém envia
+            self.supabase_client.sincronizar_destinos_webhooks([])
+            return None
+        from webhooks import DespachanteWebhooks
+        despachante = DespachanteWebhooks(self.supabase_client)
+        # O trigger de enfileiramento só conhece os destinos gravados no banco
+        despachante.sincronizar_destinos()
+        return despachante
+    
+    def _notificar_novas(self, webhooks, estatisticas_armazenamento: Dict):
+        """
+        Dispara em segundo plano o envio das intimações recém-inseridas (o trigger
+        trg_webhooks_saida já as enfileirou na transação da inserção; o que não sair
+        agora fica na fila para o agendador)
+        
+        Args:
+            webhooks: Despachante (None sem WEBHOOK_URLS)
+            estatisticas_armazenamento: Retorno de processar_intimacoes (ids_inseridas)
+        """
+        try:
+            if webhooks and estatisticas_armazenamento.get("ids_inseridas"):
+                webhooks.despachar_em_segundo_plano()
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao disparar webhooks: {e}")
+    
+    def _vincular_advogados(self, aceitas: List[Dict], estatisticas_armazenamento: Dict,
+                            vinculos: Dict[str, List[str]], advogados: Optional[List] = None):
+        """
+        Vincula aos advogados as intimações aceitas que têm linha própria na base:
+        inseridas agora ou já existentes com o mesmo id_intimacao (a duplicata por
+        hash de conteúdo não tem linha e violaria a chave estrangeira do lote inteiro)
+        
+        Args:
+            aceitas: Intimações aceitas pelo armazenamento
+            estatisticas_armazenamento: Retorno de processar_intimacoes (ids_inseridas)
+            vinculos: Ids dos advogados por id_intimacao
+            advogados: Advogados carregados (cadastrados antes, se ainda não estiverem na tabela)
+        """
+        inseridas = set(estatisticas_armazenamento.get("ids_inseridas", []))
+        a_conferir = [i['id_intimacao'] for i in aceitas
+                      if i['id_intimacao'] not in inseridas and vinculos.get(i['id_intimacao'])]
+        try:
+            existentes = set(self.supabase_client.obter_impressoes(a_conferir)) if a_conferir else set()
         except Exception as e:
-            # Erro geral na execução
-            tempo_total = time.time() - inicio_execucao
-            relatorio["tempo_execucao_segundos"] = int(tempo_total)
-            relatorio["status_execucao"] = "erro"
-            relatorio["erro_principal"] = str(e)
-            relatorio["fim_execucao"] = datetime.now().isoformat()
+            self.logger.error(f"❌ Erro ao conferir intimações existentes para os vínculos: {e}")
+            existentes = set()
+        
+        presentes = inseridas | existentes
+        linhas = [
+            {'advogado_id': advogado_id, 'id_intimacao': intimacao['id_intimacao'],
+             'data_publicacao': intimacao.get('data_publicacao')}
+            for intimacao in aceitas if intimacao['id_intimacao'] in presentes
+            for advogado_id in vinculos.get(intimacao['id_intimacao'], ())
+        ]
+        if not linhas:
+            return
+        
+        # ADVOGADOS_FONTE=config/arquivo (ou ADVOGADO_NOME alterado): o advogado pode não estar na tabela
+        if advogados and not self.supabase_client.cadastrar_advogados([a.para_dict() for a in advogados]):
+            return
+        self.supabase_client.vincular_advogados(linhas)
+    
+    def _replicar_aceitas(self, intimacoes_processadas: List[Dict], estatisticas_armazenamento: Dict,
+                          vinculos: Optional[Dict[str, List[str]]] = None, advogados: Optional[List] = None):
+        """
+        Propaga para a réplica local, o índice de busca, os vínculos com advogados
+        e a tabela de prazos as intimações aceitas pelo armazenamento principal
+        (novas e duplicatas já existentes), deixando de fora as que falharam
+        
+        Args:
+            intimacoes_processadas: Intimações enviadas ao armazenamento
+            estatisticas_armazenamento: Retorno de processar_intimacoes
+            vinculos: Ids dos advogados por id_intimacao (retorno de buscar_advogados)
+            advogados: Advogados carregados para a busca
+        """
+        if not self.armazenamento_local and not self.indice_busca and not self.calendario and not vinculos:
+            return
+        
+        ids_erros = set(estatisticas_armazenamento.get("ids_erros", []))
+        aceitas = [i for i in intimacoes_processadas if i["id_intimacao"] not in ids_erros]
+        
+        if self.armazenamento_local:
+            with etapa('armazenamento_local'):
+                resultado = self.armazenamento_local.processar_intimacoes(aceitas)
+            self.logger.info(f"🗂️ Réplica local: {resultado['novas_inseridas']} novas, "
+                             f"{resultado['alteracoes_registradas']} alteradas")
+        
+        if self.indice_busca:
+            try:
+                with etapa('indice_busca'):
+                    # Outro processo pode ter regravado o snapshot desde o último carregamento
+                    self.indice_busca.recarregar_se_alterado()
+                    adicionadas = self.indice_busca.adicionar_varias(aceitas)
+                    if adicionadas:
+                        self.indice_busca.salvar()
+                self.logger.info(f"🔎 Índice de busca: {adicionadas} novas")
+            except Exception as e:
+                self.logger.error(f"❌ Erro ao atualizar índice de busca: {e}")
+        
+        if vinculos:
+            with etapa('vinculos'):
+                self._vincular_advogados(aceitas, estatisticas_armazenamento, vinculos, advogados)
+        
+        if self.calendario:
+            with etapa('prazos'):
+                # Intimações com nova versão: os prazos gravados podem ter mudado ou sumido do texto
+                alteradas = set(estatisticas_armazenamento.get("ids_alteradas", []))
+                prazos = [prazo for intimacao in aceitas if intimacao['id_intimacao'] not in alteradas
+                          for prazo in gerar_prazos(intimacao, self.calendario)]
+                recalculados = [prazo for intimacao in aceitas if intimacao['id_intimacao'] in alteradas
+                                for prazo in gerar_prazos(intimacao, self.calendario)]
+                if prazos and self.supabase_client.gravar_prazos(prazos):
+                    self.logger.info(f"📅 Prazos: {len(prazos)} vencimentos calculados")
+                if alteradas and self.supabase_client.substituir_prazos(sorted(alteradas), recalculados):
+                    self.logger.info(f"📅 Prazos: {len(recalculados)} vencimentos recalculados "
+                                     f"para {len(alteradas)} intimações alteradas")
+    
+    @staticmethod
+    def _tamanho_textos(intimacoes_raw: List[Dict]) -> int:
+        """
+        Total de bytes dos textos brutos (para a instrumentação)
+        """
+        return sum(len((item.get('texto') or '').encode('utf-8')) for item in intimacoes_raw)
+    
+    def _processar_intimacoes_raw(self, intimacoes_raw: List[Dict], relatorio: Dict) -> List[Dict]:
+        """
+        Processa e valida os items brutos da API, contabilizando erros no relatório
+        
+        Args:
+            intimacoes_raw: Items retornados pela API DJEN
+            relatorio: Relatório de execução (atualizado com os erros)
             
-            self.logger.error(f"❌ Erro na extração: {e}")
+        Returns:
+            List[Dict]: Intimações processadas e válidas
+        """
+        intimacoes_processadas = []
         
-        finally:
-            # Registrar log da execução
+        for item_raw in intimacoes_raw:
             try:
-                self.supabase_client.registrar_log_execucao(relatorio)
+                intimacao_processada = self.text_processor.processar_intimacao_completa(item_raw)
+                
+                # Validar intimação
+                if self.text_processor.validar_intimacao(intimacao_processada):
+                    intimacoes_processadas.append(intimacao_processada)
+                else:
+                    self.logger.warning(f"Intimação {item_raw.get('id')} falhou na validação")
+                    relatorio["total_erros"] += 1
+            
             except Exception as e:
-                self.logger.error(f"Erro ao registrar log: {e}")
+                self.logger.error(f"Erro ao processar intimação {item_raw.get('id')}: {e}")
+                relatorio["total_erros"] += 1
+                relatorio["detalhes_erros"].append(str(e))
         
-        return relatorio
+        self.logger.info(f"✅ Processadas {len(intimacoes_processadas)} intimações válidas")
+        return intimacoes_processadas
+    
+    def _finalizar_relatorio(self, relatorio: Dict, estatisticas_armazenamento: Dict, inicio_execucao: float):
+        """
+        Consolida as estatísticas de armazenamento no relatório de sucesso
+        
+        Args:
+            relatorio: Relatório de execução
+            estatisticas_armazenamento: Retorno de processar_intimacoes
+            inicio_execucao: Instante de início (time.time())
+        """
+        relatorio["total_novas"] = estatisticas_armazenamento["novas_inseridas"]
+        relatorio["total_duplicadas"] = estatisticas_armazenamento["duplicatas_encontradas"]
+        relatorio["total_alteradas"] = estatisticas_armazenamento.get("alteracoes_registradas", 0)
+        relatorio["total_erros"] += estatisticas_armazenamento["erros"]
+        relatorio["detalhes_erros"].extend(estatisticas_armazenamento["detalhes_erros"])
+        
+        tempo_total = time.time() - inicio_execucao
+        relatorio["tempo_execucao_segundos"] = round(tempo_total, 3)
+        relatorio["status_execucao"] = "sucesso"
+        relatorio["fim_execucao"] = datetime.now().isoformat()
+        
+        self.logger.info("🎉 Extração concluída com sucesso!")
+        self.logger.info(f"📊 Resumo: {relatorio['total_encontradas']} encontradas, "
+                       f"{relatorio['total_novas']} novas, "
+                       f"{relatorio['total_duplicadas']} duplicadas, "
+                       f"{relatorio['total_alteradas']} alteradas, "
+                       f"{relatorio['total_erros']} erros")
+    
+    def _registrar_metricas(self, relatorio: Dict):
+        """
+        Atualiza as métricas do processo (/metrics) com o resultado da execução
+        
+        Args:
+            relatorio: Relatório de execução
+        """
+        status = relatorio.get("status_execucao", "desconhecido")
+        EXTRACAO_EXECUCOES.inc(status=status)
+        EXTRACAO_DURACAO.observar(float(relatorio.get("tempo_execucao_segundos") or 0))
+        EXTRACAO_ULTIMA.definir(time.time(), status=status)
+        INTIMACOES_ENCONTRADAS.inc(relatorio.get("total_encontradas", 0))
+        INTIMACOES_INSERIDAS.inc(relatorio.get("total_novas", 0))
+        INTIMACOES_DUPLICADAS.inc(relatorio.get("total_duplicadas", 0))
+        INTIMACOES_ALTERADAS.inc(relatorio.get("total_alteradas", 0))
+        INTIMACOES_ERROS.inc(relatorio.get("total_erros", 0))
+    
+    def _registrar_erro_relatorio(self, relatorio: Dict, erro: Exception, inicio_execucao: float):
+        """
+        Marca o relatório como erro geral na execução
+        
+        Args:
+            relatorio: Relatório de execução
+            erro: Exceção ocorrida
+            inicio_execucao: Instante de início (time.time())
+        """
+        tempo_total = time.time() - inicio_execucao
+        relatorio["tempo_execucao_segundos"] = round(tempo_total, 3)
+        relatorio["status_execucao"] = "erro"
+        relatorio["erro_principal"] = str(erro)
+        relatorio["fim_execucao"] = datetime.now().isoformat()
+        
+        self.logger.error(f"❌ Erro na extração: {erro}")
     
     def executar_recuperacao_historica(self, dias: int = 7) -> Dict:
         """
@@ -276,4 +585,17 @@ class DJENExtractor:
             
         except Exception as e:
             self.logger.error(f"❌ Erro no teste completo: {e}")
-            return False
\ No newline at end of file
+            return False
+
+def criar_extractor() -> DJENExtractor:
+    """
+    Cria o extrator conforme o motor configurado (MOTOR_EXTRACAO)
+    
+    Returns:
+        DJENExtractor: Extrator síncrono ou assíncrono
+    """
+    if MOTOR_EXTRACAO == 'async':
+        from djen_extractor_async import AsyncDJENExtractor
+        return AsyncDJENExtractor()
+    
+    return DJENExtractor()
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Motor de extração DJEN assíncrono
+Busca na API, processamento e gravação no Supabase em um único event loop
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+from djen_extractor import DJENExtractor
+from advogados import carregar_advogados
+from djen_api_async import AsyncDJENApiClient
+from supabase_client_async import AsyncSupabaseClient
+from instrumentacao import MedidorEtapas, etapa
+from config import BACKEND_ARMAZENAMENTO
+
+class AsyncDJENExtractor(DJENExtractor):
+    """
+    Extrator assíncrono com o mesmo relatório do DJENExtractor
+
+    Os componentes síncronos herdados continuam atendendo as leituras
+    (status, estatísticas, testes); apenas a extração usa o motor assíncrono.
+    Com BACKEND_ARMAZENAMENTO=postgres a gravação usa o backend em lote
+    (síncrono) num executor.
+    """
+
+    def executar_extracao_diaria(
+        self,
+        data_inicio: Optional[str] = None,
+        data_fim: Optional[str] = None
+    ) -> Dict:
+        """
+        Executa a extração diária completa no motor assíncrono
+
+        Args:
+            data_inicio: Data de início (opcional)
+            data_fim: Data de fim (opcional)
+
+        Returns:
+            Dict: Relatório de execução
+        """
+        return asyncio.run(self.executar_extracao_diaria_async(data_inicio, data_fim))
+
+    async def executar_extracao_diaria_async(
+        self,
+        data_inicio: Optional[str] = None,
+        data_fim: Optional[str] = None
+    ) -> Dict:
+        """
+        Executa a extração diária completa (corrotina)
+
+        Args:
+            data_inicio: Data de início (opcional)
+            data_fim: Data de fim (opcional)
+
+        Returns:
+            Dict: Relatório de execução
+        """
+        inicio_execucao = time.time()
+
+        self.logger.info("🚀 Iniciando extração diária DJEN (motor assíncrono)")
+
+        relatorio = self._novo_relatorio(data_inicio, data_fim)
+        medidor = MedidorEtapas()
+        supabase_async = AsyncSupabaseClient() if BACKEND_ARMAZENAMENTO == 'supabase' else None
+
+        try:
+            with medidor.ativar():
+                advogados = carregar_advogados(supabase_client=self.supabase_client)
+                relatorio["parametros_busca"]["advogados"] = [advogado.id for advogado in advogados]
+
+                async with AsyncDJENApiClient.criar_http_client() as http_client:
+                    api_client = AsyncDJENApiClient(http_client)
+
+                    # Conexão com o Supabase em paralelo com a busca na API
+                    self.logger.info("📡 Buscando intimações na API...")
+                    with etapa('busca_api'):
+                        tarefas = [api_client.buscar_advogados(advogados, data_inicio=data_inicio, data_fim=data_fim)]
+                        if supabase_async:
+                            tarefas.append(supabase_async.conectar())
+                        (sucesso_api, intimacoes_raw, vinculos), *_ = await asyncio.gather(*tarefas)
+
+                if not sucesso_api:
+                    raise Exception("Falha na consulta da API DJEN")
+
+                relatorio["total_encontradas"] = len(intimacoes_raw)
+                self.logger.info(f"📋 Total encontrado na API: {len(intimacoes_raw)}")
+
+                if not intimacoes_raw:
+                    self.logger.info("ℹ️ Nenhuma intimação encontrada para o período")
+                    relatorio["status_execucao"] = "sucesso"
+                    return relatorio
+
+                # Processamento (CPU) fora do event loop; to_thread copia o contexto, então
+                # as etapas medidas nas threads (insercao, prazos...) entram no MedidorEtapas
+                self.logger.info("⚙️ Processando intimações...")
+                with etapa('processamento', self._tamanho_textos(intimacoes_raw)):
+                    intimacoes_processadas = await asyncio.to_thread(
+                        self._processar_intimacoes_raw, intimacoes_raw, relatorio
+                    )
+
+                # O despachante é criado antes: ele grava os destinos para os quais o trigger enfileira
+                webhooks = await asyncio.to_thread(lambda: self.webhooks)
+                self.logger.info("💾 Armazenando intimações...")
+                with etapa('armazenamento'):
+                    if supabase_async:
+                        estatisticas_armazenamento = await supabase_async.processar_intimacoes(intimacoes_processadas)
+                    else:
+                        estatisticas_armazenamento = await asyncio.to_thread(
+                            self.armazenamento.processar_intimacoes, intimacoes_processadas
+                        )
+
+                await asyncio.to_thread(self._notificar_novas, webhooks, estatisticas_armazenamento)
+                await asyncio.to_thread(
+                    self._replicar_aceitas, intimacoes_processadas, estatisticas_armazenamento, vinculos, advogados
+                )
+
+                self._finalizar_relatorio(relatorio, estatisticas_armazenamento, inicio_execucao)
+
+        except Exception as e:
+            self._registrar_erro_relatorio(relatorio, e, inicio_execucao)
+
+        finally:
+            relatorio["metricas_etapas"] = medidor.resumo()
+            self._registrar_metricas(relatorio)
+
+            try:
+                if supabase_async and supabase_async.client:
+                    await supabase_async.registrar_log_execucao(relatorio)
+                else:
+                    self.armazenamento.registrar_log_execucao(relatorio)
+            except Exception as e:
+                self.logger.error(f"Erro ao registrar log: {e}")
+
+            if self.armazenamento_local:
+                self.armazenamento_local.registrar_log_execucao(relatorio)
+
+            if supabase_async:
+                await supabase_async.fechar()
+
+        return relatorio
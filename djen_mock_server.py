@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Servidor DJEN local para testes de carga e ponta a ponta
+Implementa o contrato de /api/v1/comunicacao sobre um corpus sintético:
+
+    python djen_mock_server.py --itens 5000 --latencia-ms 80 --taxa-429 0.05
+    DJEN_API_URL=http://localhost:8089/api/v1/comunicacao python api_server.py
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional
+
+from flask import Flask, jsonify, request
+
+from corpus_sintetico import gerar_corpus
+
+
+class ConfiguracaoMock:
+    """
+    Parâmetros de injeção de latência e falhas
+    """
+
+    def __init__(self, latencia_ms: float = 0.0, jitter_ms: float = 0.0,
+                 taxa_erro: float = 0.0, taxa_429: float = 0.0,
+                 retry_after: int = 1, semente: int = 42):
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.rng = random.Random(semente)
+        self.lock = threading.Lock()
+
+    def sortear(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+    def atraso(self) -> float:
+        with self.lock:
+            variacao = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latencia_ms + variacao) / 1000
+
+
+class IndiceCorpus:
+    """
+    Índices do corpus por advogado (nome e OAB/UF) ordenados por data
+    """
+
+    def __init__(self, corpus: List[Dict]):
+        self.corpus = sorted(corpus, key=lambda i: (i["data_disponibilizacao"], i["id"]), reverse=True)
+        self.por_oab: Dict[tuple, List[Dict]] = {}
+        self.por_nome: Dict[str, List[Dict]] = {}
+
+        for item in self.corpus:
+            for destinatario in item.get("destinatarioadvogados", []):
+                advogado = destinatario.get("advogado", {})
+                chave_oab = (advogado.get("numero_oab"), advogado.get("uf_oab"))
+                self._adicionar(self.por_oab.setdefault(chave_oab, []), item)
+                self._adicionar(self.por_nome.setdefault((advogado.get("nome") or '').upper(), []), item)
+
+    @staticmethod
+    def _adicionar(lista: List[Dict], item: Dict):
+        if not lista or lista[-1] is not item:
+            lista.append(item)
+
+    @staticmethod
+    def _unir(listas) -> List[Dict]:
+        """
+        Une listas de items sem repetição, mantendo a ordem por data
+        """
+        unidos = {}
+        for itens in listas:
+            for item in itens:
+                unidos[item["id"]] = item
+        return sorted(unidos.values(), key=lambda i: (i["data_disponibilizacao"], i["id"]), reverse=True)
+
+    def filtrar(self, nome: Optional[str], numero_oab: Optional[str], uf_oab: Optional[str],
+                data_inicio: Optional[str], data_fim: Optional[str]) -> List[Dict]:
+        """
+        Aplica os filtros da API DJEN
+
+        Returns:
+            List[Dict]: Items que atendem aos filtros, mais recentes primeiro
+        """
+        if numero_oab:
+            if uf_oab:
+                candidatos = self.por_oab.get((numero_oab, uf_oab), [])
+            else:
+                candidatos = self._unir(itens for (numero, _), itens in self.por_oab.items() if numero == numero_oab)
+        elif nome:
+            candidatos = self._unir(itens for chave, itens in self.por_nome.items() if nome.upper() in chave)
+        else:
+            candidatos = self.corpus
+
+        if nome and numero_oab:
+            candidatos = [
+                i for i in candidatos
+                if any(nome.upper() in (d.get("advogado", {}).get("nome") or '').upper()
+                       for d in i.get("destinatarioadvogados", []))
+            ]
+
+        return [
+            i for i in candidatos
+            if (not data_inicio or i["data_disponibilizacao"] >= data_inicio)
+            and (not data_fim or i["data_disponibilizacao"] <= data_fim)
+        ]
+
+
+def criar_app(corpus: List[Dict], configuracao: Optional[ConfiguracaoMock] = None) -> Flask:
+    """
+    Cria o app Flask do servidor DJEN local
+
+    Args:
+        corpus: Items DJEN servidos
+        configuracao: Latência e injeção de falhas
+
+    Returns:
+        Flask: Aplicação pronta para app.run() ou test_client()
+    """
+    app = Flask(__name__)
+    configuracao = configuracao or ConfiguracaoMock()
+    indice = IndiceCorpus(corpus)
+    contadores = {"requisicoes": 0, "sucesso": 0, "erro": 0, "limite": 0}
+    lock_contadores = threading.Lock()
+
+    def contar(chave: str):
+        with lock_contadores:
+            contadores["requisicoes"] += 1
+            contadores[chave] += 1
+
+    @app.route('/api/v1/comunicacao', methods=['GET'])
+    def comunicacao():
+        atraso = configuracao.atraso()
+        if atraso:
+            time.sleep(atraso)
+
+        sorteio = configuracao.sortear()
+        if sorteio < configuracao.taxa_429:
+            contar("limite")
+            resposta = jsonify({"status": "error", "message": "Too Many Requests"})
+            resposta.headers['Retry-After'] = str(configuracao.retry_after)
+            return resposta, 429
+        if sorteio < configuracao.taxa_429 + configuracao.taxa_erro:
+            contar("erro")
+            return jsonify({"status": "error", "message": "Erro interno simulado"}), 503
+
+        pagina = max(1, request.args.get('pagina', 1, type=int))
+        itens_por_pagina = max(1, min(1000, request.args.get('itensPorPagina', 100, type=int)))
+
+        itens = indice.filtrar(
+            nome=request.args.get('nomeAdvogado'),
+            numero_oab=request.args.get('numeroOab'),
+            uf_oab=request.args.get('ufOab'),
+            data_inicio=request.args.get('dataDisponibilizacaoInicio'),
+            data_fim=request.args.get('dataDisponibilizacaoFim')
+        )
+
+        inicio = (pagina - 1) * itens_por_pagina
+        contar("sucesso")
+        return jsonify({
+            "status": "success",
+            "message": "Sucesso",
+            "count": len(itens),
+            "items": itens[inicio:inicio + itens_por_pagina]
+        })
+
+    @app.route('/_mock/estatisticas', methods=['GET'])
+    def estatisticas():
+        with lock_contadores:
+            return jsonify({**contadores, "itens_corpus": len(corpus)})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor DJEN local (corpus sintético)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8089)
+    parser.add_argument('--itens', type=int, default=5000, help="Tamanho do corpus")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--data-base', default=None, help="Data final do corpus (YYYY-MM-DD, padrão hoje)")
+    parser.add_argument('--dias', type=int, default=30, help="Dias cobertos pelo corpus")
+    parser.add_argument('--latencia-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help="Fração de respostas 503")
+    parser.add_argument('--taxa-429', type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Segundos no header Retry-After")
+    args = parser.parse_args()
+
+    data_base = date.fromisoformat(args.data_base) if args.data_base else date.today()
+    print(f"📦 Gerando corpus: {args.itens} items até {data_base} (semente {args.semente})")
+    corpus = gerar_corpus(args.itens, semente=args.semente, data_base=data_base, dias_periodo=args.dias)
+
+    configuracao = ConfiguracaoMock(
+        latencia_ms=args.latencia_ms, jitter_ms=args.jitter_ms, taxa_erro=args.taxa_erro,
+        taxa_429=args.taxa_429, retry_after=args.retry_after, semente=args.semente
+    )
+    app = criar_app(corpus, configuracao)
+
+    url = f"http://{args.host}:{args.porta}/api/v1/comunicacao"
+    print(f"🧪 DJEN local em {url}")
+    print(f"   Use: DJEN_API_URL={url}")
+    app.run(host=args.host, port=args.porta, threaded=True, debug=False, use_reloader=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Exportação das intimações em fluxo (GET /exportar)
+Percorre a base por keyset e emite NDJSON, CSV ou Parquet em blocos, sem montar
+o resultado em memória: o primeiro byte sai com a primeira página.
+"""
+import csv
+import importlib.util
+import io
+import json
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Colunas que podem ser pedidas em ?colunas= (nomes reais da tabela)
+COLUNAS_EXPORTAVEIS = (
+    "id", "id_intimacao", "numero_processo", "tribunal", "orgao_julgador", "data_publicacao",
+    "tipo_comunicacao", "data_extracao", "conteudo_texto", "conteudo_original", "hash_conteudo",
+    "impressao_digital", "versao", "data_atualizacao", "metadados", "status_processamento"
+)
+# Sem conteudo_original (o item bruto pesa mais que o resto da linha)
+COLUNAS_PADRAO = (
+    "id_intimacao", "numero_processo", "tribunal", "orgao_julgador", "data_publicacao",
+    "tipo_comunicacao", "data_extracao", "conteudo_texto", "metadados", "status_processamento"
+)
+# id é UUID: vai como texto
+COLUNAS_INTEIRAS = frozenset(("versao",))
+
+FORMATOS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Linhas por bloco enviado (NDJSON/CSV) e por row group (Parquet)
+LINHAS_POR_BLOCO = 500
+LINHAS_POR_GRUPO = 5000
+
+
+def parquet_disponivel() -> bool:
+    """
+    Returns:
+        bool: True se o pacote opcional pyarrow estiver instalado (sem importá-lo)
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def validar_colunas(colunas: Optional[str]) -> List[str]:
+    """
+    Interpreta ?colunas=
+
+    Args:
+        colunas: Nomes separados por vírgula (None ou vazio = COLUNAS_PADRAO)
+
+    Returns:
+        List[str]: Colunas na ordem pedida, sem repetição
+
+    Raises:
+        ValueError: Se alguma coluna não puder ser exportada
+    """
+    if not colunas:
+        return list(COLUNAS_PADRAO)
+
+    pedidas = list(dict.fromkeys(c.strip() for c in colunas.split(',') if c.strip()))
+    invalidas = [c for c in pedidas if c not in COLUNAS_EXPORTAVEIS]
+    if invalidas or not pedidas:
+        raise ValueError(f"Colunas inválidas: {', '.join(invalidas) or '(nenhuma)'}; "
+                         f"disponíveis: {', '.join(COLUNAS_EXPORTAVEIS)}")
+    return pedidas
+
+
+def _texto(valor) -> Optional[str]:
+    """
+    Célula de CSV/Parquet: objetos JSON viram texto JSON
+    """
+    if valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False)
+    return str(valor)
+
+
+def gerar_ndjson(linhas: Iterable[Dict], colunas: List[str]) -> Iterator[bytes]:
+    """
+    Yields:
+        bytes: Blocos de até LINHAS_POR_BLOCO linhas JSON
+    """
+    bloco = []
+    for linha in linhas:
+        bloco.append(json.dumps({c: linha.get(c) for c in colunas}, ensure_ascii=False, default=str))
+        if len(bloco) >= LINHAS_POR_BLOCO:
+            yield ("\n".join(bloco) + "\n").encode("utf-8")
+            bloco = []
+    if bloco:
+        yield ("\n".join(bloco) + "\n").encode("utf-8")
+
+
+def gerar_csv(linhas: Iterable[Dict], colunas: List[str]) -> Iterator[bytes]:
+    """
+    Yields:
+        bytes: Cabeçalho e blocos de até LINHAS_POR_BLOCO linhas CSV
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def drenar() -> bytes:
+        conteudo = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return conteudo
+
+    escritor.writerow(colunas)
+    yield drenar()
+
+    pendentes = 0
+    for linha in linhas:
+        escritor.writerow([_texto(linha.get(c)) for c in colunas])
+        pendentes += 1
+        if pendentes >= LINHAS_POR_BLOCO:
+            yield drenar()
+            pendentes = 0
+    if pendentes:
+        yield drenar()
+
+
+class _SaidaParquet(io.RawIOBase):
+    """
+    Destino do ParquetWriter que acumula os bytes escritos até serem drenados
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._partes: List[bytes] = []
+        self._posicao = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def drenar(self) -> bytes:
+        conteudo = b"".join(self._partes)
+        self._partes = []
+        return conteudo
+
+
+def gerar_parquet(linhas: Iterable[Dict], colunas: List[str]) -> Iterator[bytes]:
+    """
+    Parquet escrito um row group por vez (LINHAS_POR_GRUPO linhas); JSON vai como texto
+
+    Yields:
+        bytes: Partes do arquivo, na ordem
+
+    Raises:
+        RuntimeError: Se o pacote pyarrow não estiver instalado
+    """
+    if not parquet_disponivel():
+        raise RuntimeError("Exportação Parquet requer o pacote 'pyarrow'")
+    # Importado só aqui: pyarrow pesa na inicialização do servidor
+    import pyarrow
+    import pyarrow.parquet
+
+    esquema = pyarrow.schema([
+        (c, pyarrow.int64() if c in COLUNAS_INTEIRAS else pyarrow.string()) for c in colunas
+    ])
+    saida = _SaidaParquet()
+    escritor = pyarrow.parquet.ParquetWriter(saida, esquema, compression="zstd")
+
+    def gravar(grupo: List[Dict]):
+        dados = {
+            c: [linha.get(c) if c in COLUNAS_INTEIRAS else _texto(linha.get(c)) for linha in grupo]
+            for c in colunas
+        }
+        escritor.write_table(pyarrow.Table.from_pydict(dados, schema=esquema))
+
+    grupo = []
+    for linha in linhas:
+        grupo.append(linha)
+        if len(grupo) >= LINHAS_POR_GRUPO:
+            gravar(grupo)
+            grupo = []
+            yield saida.drenar()
+    if grupo:
+        gravar(grupo)
+    escritor.close()
+    yield saida.drenar()
+
+
+GERADORES = {"ndjson": gerar_ndjson, "csv": gerar_csv, "parquet": gerar_parquet}
+
+
+def exportar(cliente, formato: str, colunas: List[str], data_inicio: str = None, data_fim: str = None,
+             tribunal: str = None, tamanho_pagina: int = 1000) -> Iterator[bytes]:
+    """
+    Exportação completa em fluxo
+
+    Args:
+        cliente: SupabaseClient (iterar_intimacoes)
+        formato: 'ndjson', 'csv' ou 'parquet'
+        colunas: Colunas validadas por validar_colunas
+        data_inicio: Data de publicação mínima (opcional)
+        data_fim: Data de publicação máxima (opcional)
+        tribunal: Sigla do tribunal (opcional)
+        tamanho_pagina: Linhas por consulta ao banco
+
+    Yields:
+        bytes: Blocos do arquivo exportado
+    """
+    linhas = cliente.iterar_intimacoes(
+        ", ".join(colunas), tamanho_pagina=tamanho_pagina,
+        data_inicio=data_inicio, data_fim=data_fim, tribunal=tribunal
+    )
+
+    total = 0
+
+    def contar(origem: Iterable[Dict]) -> Iterator[Dict]:
+        nonlocal total
+        for linha in origem:
+            total += 1
+            yield linha
+
+    yield from GERADORES[formato](contar(linhas), colunas)
+    logger.info(f"📤 Exportação {formato}: {total} intimações")
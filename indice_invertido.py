@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Índice invertido em memória para busca textual sem Postgres FTS
+Tokens em português sem acentos, listas de postagem em array('I') e
+snapshot binário em disco carregado via mmap:
+
+    python indice_invertido.py --reconstruir
+    python indice_invertido.py --buscar "auxílio doença"
+"""
+import argparse
+import html
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import INDICE_BUSCA_ARQUIVO
+
+MAGICO = b'DJENIDX1'
+CABECALHO = struct.Struct('<8sQ')
+
+CAMPOS_DOCUMENTO = ("id_intimacao", "numero_processo", "tribunal", "data_publicacao", "tipo_comunicacao")
+
+STOPWORDS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para pela pelas pelo pelos por que se sem
+sob sobre um uma umas uns foi ser sao esta este esse essa isso ja nao mais como ate lhe seu sua
+""".split())
+
+PADRAO_TOKEN = re.compile(r'[a-z0-9]+')
+
+# BM25
+K1 = 1.2
+B = 0.75
+
+
+def _tabela_sem_acentos() -> Dict[int, str]:
+    tabela = {}
+    for codigo in range(0xC0, 0x250):
+        base = ''.join(c for c in unicodedata.normalize('NFKD', chr(codigo)) if not unicodedata.combining(c))
+        if len(base) == 1 and base != chr(codigo):
+            tabela[codigo] = base
+    return tabela
+
+
+SEM_ACENTOS = _tabela_sem_acentos()
+
+
+def normalizar(texto: str) -> str:
+    """
+    Minúsculas e sem acentos ("Previdência" -> "previdencia")
+    Preserva o número de caracteres para letras latinas (usado em gerar_trecho).
+    """
+    convertido = texto.lower().translate(SEM_ACENTOS)
+    if convertido.isascii():
+        return convertido
+    decomposto = unicodedata.normalize('NFKD', convertido)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    """
+    Tokens normalizados, sem stopwords e sem tokens de 1 caractere
+
+    Args:
+        texto: Texto livre
+
+    Returns:
+        List[str]: Tokens na ordem em que aparecem
+    """
+    if not texto:
+        return []
+    return [t for t in PADRAO_TOKEN.findall(normalizar(texto)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def gerar_trecho(texto: str, termos: Iterable[str], janela: int = 120) -> str:
+    """
+    Trecho em torno da primeira ocorrência de um dos termos, destacado com <mark>
+
+    Args:
+        texto: Texto da intimação
+        termos: Tokens normalizados da consulta
+        janela: Caracteres antes/depois da ocorrência
+
+    Returns:
+        str: Trecho (escapado) com os termos em <mark>
+    """
+    termos = set(termos)
+    normalizado = normalizar(texto)
+    alinhado = len(normalizado) == len(texto)
+
+    ocorrencias = [(m.start(), m.end()) for m in PADRAO_TOKEN.finditer(normalizado) if m.group() in termos]
+    if not ocorrencias or not alinhado:
+        return html.escape(texto[:janela * 2])
+
+    inicio = max(0, ocorrencias[0][0] - janela)
+    fim = min(len(texto), ocorrencias[0][1] + janela)
+
+    partes, cursor = [], inicio
+    for a, b in ocorrencias:
+        if a < inicio or b > fim:
+            continue
+        partes.append(html.escape(texto[cursor:a]))
+        partes.append(f"<mark>{html.escape(texto[a:b])}</mark>")
+        cursor = b
+    partes.append(html.escape(texto[cursor:fim]))
+
+    return ('…' if inicio > 0 else '') + ''.join(partes) + ('…' if fim < len(texto) else '')
+
+
+class IndiceInvertido:
+    """
+    Índice invertido com atualização incremental
+
+    Cada termo aponta para dois arrays paralelos (documentos, frequências).
+    Após carregar um snapshot, as listas do arquivo são lidas direto do mmap
+    e as adições posteriores ficam num delta em memória até o próximo salvar().
+    """
+
+    def __init__(self, caminho: str = INDICE_BUSCA_ARQUIVO):
+        self.caminho = caminho
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._limpar()
+
+    def _limpar(self):
+        self.documentos: List[Tuple] = []          # CAMPOS_DOCUMENTO por número de documento
+        self.comprimentos = array('I')             # tokens por documento
+        self.por_id: Dict[str, int] = {}
+        self._base: Dict[str, Tuple[int, int]] = {}  # termo -> (offset, quantidade) no mmap
+        self._delta: Dict[str, Tuple[array, array]] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._dados: Optional[memoryview] = None
+        self._mtime: Optional[float] = None
+        self.total_tokens = 0
+
+    # ------------------------------------------------------------------ escrita
+
+    def adicionar(self, intimacao: Dict) -> bool:
+        """
+        Indexa uma intimação (ignora IDs já indexados)
+
+        Args:
+            intimacao: Dict com id_intimacao, conteudo_texto e os CAMPOS_DOCUMENTO
+
+        Returns:
+            bool: True se a intimação foi adicionada
+        """
+        id_intimacao = str(intimacao.get("id_intimacao") or '')
+        if not id_intimacao:
+            return False
+
+        tokens = tokenizar(intimacao.get("numero_processo")) + tokenizar(intimacao.get("conteudo_texto"))
+        frequencias = Counter(tokens)
+
+        with self._lock:
+            if id_intimacao in self.por_id:
+                return False
+
+            numero = len(self.documentos)
+            self.documentos.append(tuple(
+                str(intimacao.get(campo)) if intimacao.get(campo) is not None else None
+                for campo in CAMPOS_DOCUMENTO
+            ))
+            self.comprimentos.append(len(tokens))
+            self.por_id[id_intimacao] = numero
+            self.total_tokens += len(tokens)
+
+            for termo, frequencia in frequencias.items():
+                documentos, freqs = self._delta.setdefault(termo, (array('I'), array('I')))
+                documentos.append(numero)
+                freqs.append(frequencia)
+        return True
+
+    def adicionar_varias(self, intimacoes: Iterable[Dict]) -> int:
+        """
+        Returns:
+            int: Quantidade de intimações adicionadas
+        """
+        return sum(1 for intimacao in intimacoes if self.adicionar(intimacao))
+
+    # ------------------------------------------------------------------ leitura
+
+    def _postagens(self, termo: str) -> Tuple[Iterable[int], Iterable[int], int]:
+        """
+        Returns:
+            Tuple: (documentos, frequências, quantidade) do termo, base + delta
+        """
+        documentos, freqs, total = [], [], 0
+        if termo in self._base:
+            offset, quantidade = self._base[termo]
+            documentos.append(self._dados[offset:offset + quantidade])
+            freqs.append(self._dados[offset + quantidade:offset + 2 * quantidade])
+            total += quantidade
+        if termo in self._delta:
+            docs_delta, freqs_delta = self._delta[termo]
+            documentos.append(docs_delta)
+            freqs.append(freqs_delta)
+            total += len(docs_delta)
+        return documentos, freqs, total
+
+    def buscar(self, consulta: str, limite: int = 20, deslocamento: int = 0,
+               data_inicio: str = None, data_fim: str = None) -> List[Dict]:
+        """
+        Busca com semântica AND entre os termos e ranking BM25
+
+        Args:
+            consulta: Termos livres (acentos e maiúsculas são ignorados)
+            limite: Número máximo de resultados
+            deslocamento: Resultados a pular (paginação)
+            data_inicio: Data de publicação mínima (YYYY-MM-DD)
+            data_fim: Data de publicação máxima (YYYY-MM-DD)
+
+        Returns:
+            List[Dict]: CAMPOS_DOCUMENTO + relevancia, mais relevantes primeiro
+        """
+        termos = list(dict.fromkeys(tokenizar(consulta)))
+        if not termos:
+            return []
+
+        with self._lock:
+            total_documentos = len(self.documentos)
+            if not total_documentos:
+                return []
+            media = self.total_tokens / total_documentos
+
+            postagens = sorted((self._postagens(t) for t in termos), key=lambda p: p[2])
+            if postagens[0][2] == 0:
+                return []
+
+            # Interseção a partir da lista mais curta
+            pontuacoes: Dict[int, float] = {}
+            for indice, (listas_docs, listas_freqs, quantidade) in enumerate(postagens):
+                idf = math.log(1 + (total_documentos - quantidade + 0.5) / (quantidade + 0.5))
+                proximas: Dict[int, float] = {}
+                for documentos, freqs in zip(listas_docs, listas_freqs):
+                    for documento, frequencia in zip(documentos, freqs):
+                        if indice and documento not in pontuacoes:
+                            continue
+                        norma = K1 * (1 - B + B * self.comprimentos[documento] / media)
+                        proximas[documento] = (pontuacoes.get(documento, 0.0)
+                                               + idf * frequencia * (K1 + 1) / (frequencia + norma))
+                pontuacoes = proximas
+                if not pontuacoes:
+                    return []
+
+            if data_inicio or data_fim:
+                posicao_data = CAMPOS_DOCUMENTO.index("data_publicacao")
+                pontuacoes = {
+                    d: p for d, p in pontuacoes.items()
+                    if (not data_inicio or (self.documentos[d][posicao_data] or '') >= data_inicio)
+                    and (not data_fim or (self.documentos[d][posicao_data] or '') <= data_fim)
+                }
+
+            ordenados = sorted(pontuacoes.items(), key=lambda x: (-x[1], -x[0]))
+            pagina = ordenados[deslocamento:deslocamento + limite]
+
+            return [
+                {**dict(zip(CAMPOS_DOCUMENTO, self.documentos[d])), "relevancia": round(p, 4)}
+                for d, p in pagina
+            ]
+
+    # ------------------------------------------------------------------ snapshot
+
+    def salvar(self, caminho: Optional[str] = None):
+        """
+        Grava o snapshot (base + delta) de forma atômica
+
+        Formato: MAGICO, tamanho do cabeçalho JSON, cabeçalho, alinhamento e
+        uint32 little-endian com [documentos..., frequências...] de cada termo.
+        """
+        caminho = caminho or self.caminho
+
+        with self._lock:
+            termos = {}
+            dados = array('I')
+            for termo in sorted(set(self._base) | set(self._delta)):
+                listas_docs, listas_freqs, quantidade = self._postagens(termo)
+                termos[termo] = [len(dados), quantidade]
+                for documentos in listas_docs:
+                    dados.extend(documentos)
+                for freqs in listas_freqs:
+                    dados.extend(freqs)
+
+            cabecalho = json.dumps({
+                "versao": 1,
+                "documentos": self.documentos,
+                "comprimentos": self.comprimentos.tolist(),
+                "termos": termos
+            }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            cabecalho += b' ' * (-(CABECALHO.size + len(cabecalho)) % 4)
+
+            if dados.itemsize != 4:
+                raise RuntimeError("array('I') precisa ter 4 bytes nesta plataforma")
+            if struct.pack('=I', 1) != struct.pack('<I', 1):
+                dados.byteswap()
+
+            temporario = f"{caminho}.tmp"
+            with open(temporario, 'wb') as arquivo:
+                arquivo.write(CABECALHO.pack(MAGICO, len(cabecalho)))
+                arquivo.write(cabecalho)
+                dados.tofile(arquivo)
+            os.replace(temporario, caminho)
+
+            self.logger.info(f"💾 Índice de busca salvo: {len(self.documentos)} documentos, {len(termos)} termos")
+
+            # Recarrega do arquivo: o delta passa para o mmap
+            if caminho == self.caminho:
+                self.carregar()
+
+    def carregar(self, caminho: Optional[str] = None) -> bool:
+        """
+        Carrega um snapshot; as listas de postagem ficam no mmap
+
+        Returns:
+            bool: True se o snapshot foi carregado
+        """
+        caminho = caminho or self.caminho
+        if not os.path.exists(caminho):
+            return False
+
+        with open(caminho, 'rb') as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, tamanho = CABECALHO.unpack_from(mapa, 0)
+        if magico != MAGICO:
+            mapa.close()
+            raise ValueError(f"Arquivo de índice inválido: {caminho}")
+
+        cabecalho = json.loads(mapa[CABECALHO.size:CABECALHO.size + tamanho])
+        dados = memoryview(mapa)[CABECALHO.size + tamanho:].cast('I')
+
+        with self._lock:
+            self._limpar()
+            self.documentos = [tuple(d) for d in cabecalho["documentos"]]
+            self.comprimentos = array('I', cabecalho["comprimentos"])
+            self.por_id = {d[0]: i for i, d in enumerate(self.documentos)}
+            self.total_tokens = sum(self.comprimentos)
+            self._base = {termo: tuple(posicao) for termo, posicao in cabecalho["termos"].items()}
+            self._mmap, self._dados = mapa, dados
+            self._mtime = os.path.getmtime(caminho)
+
+        self.logger.info(f"📂 Índice de busca carregado: {len(self.documentos)} documentos")
+        return True
+
+    def recarregar_se_alterado(self) -> bool:
+        """
+        Recarrega o snapshot se outro processo (ex.: agendador) o regravou
+
+        Returns:
+            bool: True se recarregou
+        """
+        try:
+            mtime = os.path.getmtime(self.caminho)
+        except OSError:
+            return False
+        if self._mtime is not None and mtime <= self._mtime:
+            return False
+        if self._delta and self._mtime is not None:
+            # Há adições locais ainda não salvas: mantém o estado em memória
+            return False
+        return self.carregar()
+
+
+def reconstruir(indice: IndiceInvertido, fonte: Callable[[], Iterable[Dict]]) -> int:
+    """
+    Reconstrói o índice do zero a partir de uma fonte de intimações
+
+    Args:
+        indice: Índice a reconstruir
+        fonte: Função que devolve um iterável de intimações
+
+    Returns:
+        int: Documentos indexados
+    """
+    with indice._lock:
+        indice._limpar()
+        total = indice.adicionar_varias(fonte())
+        indice.salvar()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice invertido de busca das intimações")
+    parser.add_argument('--arquivo', default=INDICE_BUSCA_ARQUIVO)
+    parser.add_argument('--reconstruir', action='store_true', help="Reindexa todas as intimações do Supabase")
+    parser.add_argument('--buscar', help="Consulta de teste")
+    parser.add_argument('--limite', type=int, default=10)
+    args = parser.parse_args()
+
+    indice = IndiceInvertido(args.arquivo)
+
+    if args.reconstruir:
+        from supabase_client import SupabaseClient
+        cliente = SupabaseClient()
+        colunas = ', '.join(CAMPOS_DOCUMENTO + ("conteudo_texto",))
+        total = reconstruir(indice, lambda: cliente.iterar_intimacoes(colunas))
+        print(f"✅ {total} intimações indexadas em {args.arquivo}")
+    else:
+        indice.carregar()
+
+    if args.buscar:
+        for resultado in indice.buscar(args.buscar, limite=args.limite):
+            print(f"{resultado['relevancia']:8.3f}  {resultado['data_publicacao']}  "
+                  f"{resultado['tribunal']:6}  {resultado['numero_processo']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Instrumentação de tempo por etapa da extração DJEN
+Mede tempo, número de chamadas, bytes e latências (p50/p95) de cada etapa
+"""
+import functools
+import inspect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Medidor da execução corrente (isolado por thread e por task asyncio)
+_medidor_atual: ContextVar[Optional['MedidorEtapas']] = ContextVar('medidor_etapas', default=None)
+
+
+def _percentil(amostras: List[float], percentil: float) -> float:
+    """
+    Percentil pelo método nearest-rank
+
+    Args:
+        amostras: Amostras ordenadas
+        percentil: Percentil desejado (0-100)
+
+    Returns:
+        float: Valor do percentil (0 se não houver amostras)
+    """
+    if not amostras:
+        return 0.0
+    indice = max(0, min(len(amostras) - 1, math.ceil(percentil / 100 * len(amostras)) - 1))
+    return amostras[indice]
+
+
+class MedidorEtapas:
+    """
+    Acumula as medições das etapas de uma execução
+    """
+
+    def __init__(self):
+        self._amostras: Dict[str, List[float]] = {}
+        self._bytes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, segundos: float, bytes_processados: int = 0):
+        """
+        Registra uma chamada de uma etapa
+
+        Args:
+            nome: Nome da etapa
+            segundos: Duração da chamada
+            bytes_processados: Bytes lidos/gerados pela chamada
+        """
+        with self._lock:
+            self._amostras.setdefault(nome, []).append(segundos)
+            self._bytes[nome] = self._bytes.get(nome, 0) + bytes_processados
+
+    @contextmanager
+    def etapa(self, nome: str, bytes_processados: int = 0):
+        """
+        Context manager que mede o bloco como uma chamada da etapa
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio, bytes_processados)
+
+    @contextmanager
+    def ativar(self):
+        """
+        Torna este medidor o medidor corrente para as funções instrumentadas
+        """
+        token = _medidor_atual.set(self)
+        try:
+            yield self
+        finally:
+            _medidor_atual.reset(token)
+
+    def resumo(self) -> Dict[str, Dict]:
+        """
+        Consolida as medições por etapa
+
+        `tempo_total_segundos` é a soma das durações: em etapas executadas
+        concorrentemente (motor assíncrono) pode exceder o tempo de parede.
+
+        Returns:
+            Dict[str, Dict]: Estatísticas por etapa
+        """
+        with self._lock:
+            resumo = {}
+            for nome, amostras in self._amostras.items():
+                ordenadas = sorted(amostras)
+                resumo[nome] = {
+                    "tempo_total_segundos": round(sum(ordenadas), 4),
+                    "chamadas": len(ordenadas),
+                    "bytes": self._bytes.get(nome, 0),
+                    "latencia_p50_ms": round(_percentil(ordenadas, 50) * 1000, 2),
+                    "latencia_p95_ms": round(_percentil(ordenadas, 95) * 1000, 2),
+                    "latencia_max_ms": round(ordenadas[-1] * 1000, 2)
+                }
+            return resumo
+
+
+def medidor_atual() -> Optional[MedidorEtapas]:
+    """
+    Returns:
+        Optional[MedidorEtapas]: Medidor da execução corrente, se houver
+    """
+    return _medidor_atual.get()
+
+
+def registrar_amostra(nome: str, segundos: float, bytes_processados: int = 0):
+    """
+    Registra uma amostra no medidor corrente (sem efeito fora de uma execução)
+    """
+    medidor = _medidor_atual.get()
+    if medidor is not None:
+        medidor.registrar(nome, segundos, bytes_processados)
+
+
+@contextmanager
+def etapa(nome: str, bytes_processados: int = 0):
+    """
+    Mede o bloco no medidor corrente (sem efeito fora de uma execução)
+    """
+    medidor = _medidor_atual.get()
+    if medidor is None:
+        yield
+        return
+    with medidor.etapa(nome, bytes_processados):
+        yield
+
+
+def cronometrar(nome: str):
+    """
+    Decorator que mede cada chamada da função como uma chamada da etapa
+    Funciona com funções síncronas e corrotinas
+
+    Args:
+        nome: Nome da etapa
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper_async(*args, **kwargs):
+                with etapa(nome):
+                    return await func(*args, **kwargs)
+            return wrapper_async
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with etapa(nome):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
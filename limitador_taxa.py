@@ -0,0 +1,83 @@
+"""
+Limitador de taxa (token bucket) das requisições à API DJEN
+Uma instância por processo, compartilhada pelas threads do cliente síncrono
+e pelas corrotinas do cliente assíncrono
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from config import DJEN_REQUISICOES_POR_SEGUNDO, DJEN_RAJADA
+from metricas import DJEN_ESPERA_LIMITADOR
+
+
+class LimitadorTaxa:
+    """
+    Token bucket com reserva: cada chamada consome um token e recebe o tempo
+    que deve esperar, de modo que as requisições saem espaçadas mesmo quando
+    muitas consultas pedem ao mesmo tempo
+    """
+
+    def __init__(self, taxa_por_segundo: float = DJEN_REQUISICOES_POR_SEGUNDO, rajada: int = DJEN_RAJADA):
+        """
+        Args:
+            taxa_por_segundo: Requisições por segundo (0 desativa o limite)
+            rajada: Requisições liberadas de imediato com o balde cheio
+        """
+        self.taxa = taxa_por_segundo
+        self.capacidade = max(1, rajada)
+        self._tokens = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reservar(self) -> float:
+        """
+        Returns:
+            float: Segundos a esperar antes de usar o token reservado
+        """
+        if self.taxa <= 0:
+            return 0.0
+
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            self._tokens -= 1
+            espera = -self._tokens / self.taxa if self._tokens < 0 else 0.0
+
+        if espera:
+            DJEN_ESPERA_LIMITADOR.observar(espera)
+        return espera
+
+    def aguardar(self):
+        """
+        Bloqueia a thread até a requisição poder sair
+        """
+        espera = self._reservar()
+        if espera:
+            time.sleep(espera)
+
+    async def aguardar_async(self):
+        """
+        Suspende a corrotina até a requisição poder sair
+        """
+        espera = self._reservar()
+        if espera:
+            await asyncio.sleep(espera)
+
+
+_limitador: Optional[LimitadorTaxa] = None
+_lock_limitador = threading.Lock()
+
+
+def limitador_compartilhado() -> LimitadorTaxa:
+    """
+    Returns:
+        LimitadorTaxa: Limitador único do processo
+    """
+    global _limitador
+    with _lock_limitador:
+        if _limitador is None:
+            _limitador = LimitadorTaxa()
+        return _limitador
@@ -1,31 +1,153 @@
 """
 Configuração do sistema de logging
 """
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import random
 from datetime import datetime
+from typing import Dict, Optional
 
-from config import LOG_LEVEL, LOG_FILE
+from config import (
+    LOG_LEVEL, LOG_FILE, LOG_FORMATO, LOG_ASSINCRONO, LOG_NIVEIS, LOG_AMOSTRAGEM_REQUISICOES
+)
 
-def setup_logging():
+# Atributos padrão do LogRecord; o que vier além disso (extra=...) vai como campo no JSON
+ATRIBUTOS_PADRAO = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'amostrar'}
+
+# Thread de escrita do modo assíncrono (recriada nos processos filhos após fork)
+_fila_handler: Optional['FilaLogs'] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_ganchos_registrados = False
+
+
+class FormatadorJSON(logging.Formatter):
+    """
+    Uma linha JSON por registro: timestamp, nível, logger, mensagem e os campos de `extra`
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        linha = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+            'processo': record.process,
+            'thread': record.threadName
+        }
+        linha.update({chave: valor for chave, valor in vars(record).items() if chave not in ATRIBUTOS_PADRAO})
+        if record.exc_info:
+            linha['excecao'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            linha['excecao'] = record.exc_text
+        return json.dumps(linha, ensure_ascii=False, default=str)
+
+
+class FilaLogs(logging.handlers.QueueHandler):
+    """
+    QueueHandler que só resolve a mensagem e o traceback antes de enfileirar
+    (a formatação final, texto ou JSON, fica com a thread de escrita)
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class FiltroAmostragem(logging.Filter):
+    """
+    Deixa passar só uma fração dos registros marcados com extra={'amostrar': True}
+    (logs de alto volume, como o de cada requisição HTTP); WARNING ou acima sempre passam
+    """
+
+    def __init__(self, taxa: float):
+        super().__init__()
+        self.taxa = taxa
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'amostrar', False) or record.levelno >= logging.WARNING:
+            return True
+        return self.taxa >= 1 or random.random() < self.taxa
+
+
+def niveis_por_logger(especificacao: str) -> Dict[str, int]:
+    """
+    Interpreta LOG_NIVEIS
+
+    Args:
+        especificacao: 'logger=NIVEL' separados por vírgula
+
+    Returns:
+        Dict[str, int]: Nível por nome de logger (entradas inválidas são ignoradas)
+    """
+    niveis = {}
+    for item in especificacao.split(','):
+        nome, _, nivel = item.partition('=')
+        nivel = logging.getLevelName(nivel.strip().upper())
+        if nome.strip() and isinstance(nivel, int):
+            niveis[nome.strip()] = nivel
+    return niveis
+
+
+def _reiniciar_listener():
+    """
+    A thread de escrita não sobrevive ao fork (workers do gunicorn): o filho
+    recebe fila e thread novas
+    """
+    global _listener
+    if _listener is None or _fila_handler is None:
+        return
+    fila = queue.SimpleQueue()
+    _fila_handler.queue = fila
+    _listener = logging.handlers.QueueListener(fila, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def parar_logging():
+    """
+    Esvazia a fila do modo assíncrono (chamada na saída do processo)
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(nivel_console: Optional[int] = None):
     """
     Configura o sistema de logging
+
+    Args:
+        nivel_console: Nível mínimo no terminal, se maior que LOG_LEVEL (ex.: CLI só com avisos)
     """
+    global _fila_handler, _listener, _ganchos_registrados
+
     # Criar diretório de logs se não existir
     log_dir = os.path.dirname(LOG_FILE) if os.path.dirname(LOG_FILE) else 'logs'
     if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
+
     # Configurar nível
     level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
-    
+
     # Formato das mensagens
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+    if LOG_FORMATO == 'json':
+        formatter = FormatadorJSON()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
     # Handler para arquivo (com rotação)
     file_handler = logging.handlers.RotatingFileHandler(
         LOG_FILE,
@@ -34,32 +156,57 @@ def setup_logging():
     )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(level)
-    
+
     # Handler para console
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    console_handler.setLevel(level)
-    
+    console_handler.setLevel(max(level, nivel_console or level))
+
     # Configurar logger raiz
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
-    
+
+    amostragem = FiltroAmostragem(LOG_AMOSTRAGEM_REQUISICOES)
+    if LOG_ASSINCRONO:
+        # Quem loga só enfileira o registro; formatação e disco ficam na thread do listener
+        parar_logging()
+        if _fila_handler is not None:
+            root_logger.removeHandler(_fila_handler)
+        _fila_handler = FilaLogs(queue.SimpleQueue())
+        _fila_handler.addFilter(amostragem)
+        _listener = logging.handlers.QueueListener(
+            _fila_handler.queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        root_logger.addHandler(_fila_handler)
+        if not _ganchos_registrados:
+            atexit.register(parar_logging)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=_reiniciar_listener)
+            _ganchos_registrados = True
+    else:
+        for handler in (file_handler, console_handler):
+            handler.addFilter(amostragem)
+            root_logger.addHandler(handler)
+
+    for nome, nivel in niveis_por_logger(LOG_NIVEIS).items():
+        logging.getLogger(nome).setLevel(nivel)
+
     # Configurar logger específico do projeto
     logger = logging.getLogger('djen_extractor')
-    logger.info(f"✅ Sistema de logging configurado - Nível: {LOG_LEVEL}")
-    
+    logger.info(f"✅ Sistema de logging configurado - Nível: {LOG_LEVEL}, formato: {LOG_FORMATO}"
+                f"{', assíncrono' if LOG_ASSINCRONO else ''}")
+
     return logger
 
 def get_logger(name: str):
     """
     Obtém um logger específico
-    
+
     Args:
         name: Nome do logger
-        
+
     Returns:
         Logger configurado
     """
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
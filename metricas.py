@@ -0,0 +1,241 @@
+"""
+Registro de métricas no formato texto do Prometheus
+Contadores, indicadores (gauges) e histogramas com rótulos, sem dependências externas
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extras: Optional[Dict] = None) -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extras:
+        pares += [f'{nome}="{_escapar(str(valor))}"' for nome, valor in extras.items()]
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica:
+    """
+    Base das métricas: guarda valores por combinação de rótulos
+    """
+    tipo = 'untyped'
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._valores: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict) -> Tuple[str, ...]:
+        return tuple(str(rotulos.get(nome, '')) for nome in self.rotulos)
+
+    def _linhas(self) -> List[str]:
+        raise NotImplementedError
+
+    def exportar(self) -> str:
+        """
+        Returns:
+            str: Bloco da métrica no formato texto do Prometheus
+        """
+        cabecalho = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._lock:
+            linhas = self._linhas()
+        return '\n'.join(cabecalho + linhas)
+
+
+class Contador(_Metrica):
+    """
+    Valor monotonicamente crescente
+    """
+    tipo = 'counter'
+
+    def inc(self, valor: float = 1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def _linhas(self) -> List[str]:
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+                for chave, valor in self._valores.items()]
+
+
+class Indicador(_Metrica):
+    """
+    Valor que sobe e desce (gauge)
+    """
+    tipo = 'gauge'
+
+    def definir(self, valor: float, **rotulos):
+        with self._lock:
+            self._valores[self._chave(rotulos)] = valor
+
+    def inc(self, valor: float = 1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def _linhas(self) -> List[str]:
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+                for chave, valor in self._valores.items()]
+
+
+class Histograma(_Metrica):
+    """
+    Distribuição de valores em buckets cumulativos
+    """
+    tipo = 'histogram'
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_LATENCIA):
+        super().__init__(nome, descricao, rotulos)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            estado = self._valores.get(chave)
+            if estado is None:
+                estado = {'contagens': [0] * len(self.buckets), 'soma': 0.0, 'total': 0}
+                self._valores[chave] = estado
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    estado['contagens'][i] += 1
+                    break
+            estado['soma'] += valor
+            estado['total'] += 1
+
+    @contextmanager
+    def cronometrar(self, **rotulos):
+        """
+        Observa a duração do bloco em segundos
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def _linhas(self) -> List[str]:
+        linhas = []
+        for chave, estado in self._valores.items():
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, estado['contagens']):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(self.rotulos, chave, {'le': _formatar_numero(limite)})
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(estado['soma'])}")
+            linhas.append(f"{self.nome}_count{rotulos} {estado['total']}")
+        return linhas
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas do processo
+    Com gunicorn cada worker mantém seu próprio registro.
+    """
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, classe, nome: str, descricao: str, rotulos: Sequence[str], **kwargs):
+        with self._lock:
+            if nome not in self._metricas:
+                self._metricas[nome] = classe(nome, descricao, rotulos, **kwargs)
+            return self._metricas[nome]
+
+    def contador(self, nome: str, descricao: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador, nome, descricao, rotulos)
+
+    def indicador(self, nome: str, descricao: str, rotulos: Sequence[str] = ()) -> Indicador:
+        return self._registrar(Indicador, nome, descricao, rotulos)
+
+    def histograma(self, nome: str, descricao: str, rotulos: Sequence[str] = (),
+                   buckets: Sequence[float] = BUCKETS_LATENCIA) -> Histograma:
+        return self._registrar(Histograma, nome, descricao, rotulos, buckets=buckets)
+
+    def exportar(self) -> str:
+        """
+        Returns:
+            str: Todas as métricas no formato texto do Prometheus (0.0.4)
+        """
+        with self._lock:
+            metricas = list(self._metricas.values())
+        return '\n'.join(metrica.exportar() for metrica in metricas) + '\n'
+
+
+REGISTRO = RegistroMetricas()
+
+# Servidor HTTP
+LEITURAS = REGISTRO.contador(
+    'djen_leituras_total', 'Leituras do dashboard por fonte (local, supabase, fallback)', ('fonte',))
+HTTP_REQUISICOES = REGISTRO.contador(
+    'djen_http_requisicoes_total', 'Requisições atendidas pela API', ('rota', 'metodo', 'status'))
+HTTP_LATENCIA = REGISTRO.histograma(
+    'djen_http_latencia_segundos', 'Latência das requisições da API por rota', ('rota', 'metodo'))
+
+# API DJEN
+DJEN_REQUISICOES = REGISTRO.contador(
+    'djen_api_requisicoes_total', 'Requisições à API DJEN por resultado', ('resultado',))
+DJEN_LATENCIA = REGISTRO.histograma(
+    'djen_api_latencia_segundos', 'Latência das requisições à API DJEN')
+DJEN_ESPERA_LIMITADOR = REGISTRO.histograma(
+    'djen_api_espera_limitador_segundos', 'Espera imposta pelo limitador de taxa antes das requisições')
+
+# Supabase
+SUPABASE_OPERACOES = REGISTRO.contador(
+    'djen_supabase_operacoes_total', 'Operações no Supabase por resultado', ('operacao', 'resultado'))
+SUPABASE_LATENCIA = REGISTRO.histograma(
+    'djen_supabase_latencia_segundos', 'Latência das operações no Supabase', ('operacao',))
+
+# PostgreSQL direto
+POSTGRES_OPERACOES = REGISTRO.contador(
+    'djen_postgres_operacoes_total', 'Operações no PostgreSQL por resultado', ('operacao', 'resultado'))
+POSTGRES_LATENCIA = REGISTRO.histograma(
+    'djen_postgres_latencia_segundos', 'Latência das operações no PostgreSQL', ('operacao',))
+
+# Extração
+EXTRACAO_EXECUCOES = REGISTRO.contador(
+    'djen_extracao_execucoes_total', 'Execuções de extração por status', ('status',))
+EXTRACAO_DURACAO = REGISTRO.histograma(
+    'djen_extracao_duracao_segundos', 'Duração das execuções de extração',
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600))
+INTIMACOES_ENCONTRADAS = REGISTRO.contador(
+    'djen_intimacoes_encontradas_total', 'Intimações retornadas pela API DJEN')
+INTIMACOES_INSERIDAS = REGISTRO.contador(
+    'djen_intimacoes_inseridas_total', 'Intimações novas gravadas')
+INTIMACOES_DUPLICADAS = REGISTRO.contador(
+    'djen_intimacoes_duplicadas_total', 'Intimações descartadas como duplicatas')
+INTIMACOES_ALTERADAS = REGISTRO.contador(
+    'djen_intimacoes_alteradas_total', 'Intimações já gravadas alteradas na origem (nova versão)')
+INTIMACOES_ERROS = REGISTRO.contador(
+    'djen_intimacoes_erros_total', 'Intimações com erro de processamento ou gravação')
+EXTRACAO_ULTIMA = REGISTRO.indicador(
+    'djen_extracao_ultima_execucao_timestamp', 'Instante (epoch) da última extração concluída', ('status',))
+
+# Agendador
+AGENDADOR_ATRASO = REGISTRO.indicador(
+    'djen_agendador_atraso_segundos', 'Atraso da última extração agendada em relação ao horário previsto')
+AGENDADOR_ULTIMA = REGISTRO.indicador(
+    'djen_agendador_ultima_execucao_timestamp', 'Instante (epoch) da última extração agendada')
+
+# Webhooks de saída
+WEBHOOK_ENTREGAS = REGISTRO.contador(
+    'djen_webhook_entregas_total', 'Intimações entregues aos webhooks por resultado', ('resultado',))
+WEBHOOK_LATENCIA = REGISTRO.histograma(
+    'djen_webhook_latencia_segundos', 'Latência de cada lote enviado a um webhook')
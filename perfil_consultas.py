@@ -0,0 +1,272 @@
+"""
+Perfil das consultas ao PostgREST (GET /debug/queries)
+Cada execute() do SupabaseClient entra num buffer circular com método, alvo, filtros,
+linhas, bytes e latência; as que passam de PERFIL_LENTA_MS ou PERFIL_GRANDE_BYTES vão
+também para o log de consultas lentas. As consultas feitas durante uma requisição da
+API levam o id da requisição, o que expõe padrões N+1 (a mesma operação repetida).
+"""
+import logging
+import os
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import (
+    PERFIL_CONSULTAS, PERFIL_TAMANHO_BUFFER, PERFIL_LENTA_MS, PERFIL_GRANDE_BYTES, PERFIL_VALORES_FILTROS
+)
+
+# Logger próprio: LOG_NIVEIS=consultas_lentas=ERROR silencia só este log
+logger = logging.getLogger('consultas_lentas')
+
+# Requisição da API em andamento: {'id', 'rota', 'consultas'} (definida pelo api_server)
+requisicao_atual: ContextVar[Optional[Dict]] = ContextVar('requisicao_atual', default=None)
+
+# Parâmetros do PostgREST que não são filtros de coluna
+PARAMETROS_CONSULTA = frozenset(('select', 'order', 'limit', 'offset', 'on_conflict', 'columns'))
+
+
+def _percentil(valores: List[float], percentil: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * percentil))]
+
+
+def _tamanho(resposta) -> Optional[int]:
+    """
+    Bytes do corpo da resposta httpx (None se ela não chegou a ser lida)
+    """
+    try:
+        return len(resposta.content) if resposta is not None else None
+    except Exception:
+        return None
+
+
+def _mascarar(nome: str, valor: str) -> str:
+    """
+    Filtro sem o valor ('eq.12345' -> 'eq.?'); operador e nulos continuam visíveis
+    """
+    if nome in ('or', 'and'):
+        return '(?)'
+    partes = valor.split('.', 2)
+    if partes[0] == 'not' and len(partes) > 2:
+        return f"not.{partes[1]}.?"
+    if partes[0] == 'is':
+        return valor
+    return f"{partes[0]}.?"
+
+
+def descrever(query) -> Dict:
+    """
+    Método, alvo e filtros de uma query do postgrest-py
+
+    Args:
+        query: Query montada com client.table(...) ou client.rpc(...)
+
+    Returns:
+        Dict: metodo, alvo ('tabela' ou 'rpc/funcao'), select e filtros
+    """
+    requisicao = getattr(query, 'request', None)
+    if requisicao is None:
+        return {'metodo': None, 'alvo': None, 'select': None, 'filtros': {}}
+
+    metodo = getattr(requisicao, 'http_method', None)
+    alvo = str(getattr(requisicao, 'path', '')).rsplit('/rest/v1/', 1)[-1]
+    parametros = getattr(requisicao, 'params', None) or {}
+    filtros = {}
+    for nome, valor in parametros.items():
+        if nome == 'select':
+            continue
+        if nome in PARAMETROS_CONSULTA or PERFIL_VALORES_FILTROS:
+            filtros[nome] = valor
+        else:
+            filtros[nome] = _mascarar(nome, valor)
+
+    # RPC: nomes dos argumentos (listas com o tamanho, que revela o tamanho dos lotes)
+    corpo = getattr(requisicao, 'json', None)
+    if isinstance(corpo, dict) and alvo.startswith('rpc/'):
+        for nome, valor in corpo.items():
+            if isinstance(valor, list):
+                filtros[nome] = f"[{len(valor)}]"
+            else:
+                filtros[nome] = valor if PERFIL_VALORES_FILTROS else '?'
+
+    return {
+        'metodo': getattr(metodo, 'value', metodo),
+        'alvo': alvo,
+        'select': parametros.get('select'),
+        'filtros': filtros
+    }
+
+
+class PerfilConsultas:
+    """
+    Buffer circular das últimas consultas deste processo e log das lentas
+    """
+
+    def __init__(self, ativo: bool = PERFIL_CONSULTAS, tamanho: int = PERFIL_TAMANHO_BUFFER,
+                 lenta_ms: float = PERFIL_LENTA_MS, grande_bytes: int = PERFIL_GRANDE_BYTES):
+        """
+        Args:
+            ativo: False desliga o registro (execute() segue sem custo extra)
+            tamanho: Consultas guardadas (as mais antigas saem primeiro)
+            lenta_ms: Latência a partir da qual a consulta vai para o log de lentas
+            grande_bytes: Tamanho de resposta a partir do qual ela vai para o log
+        """
+        self.ativo = ativo
+        self.lenta_ms = lenta_ms
+        self.grande_bytes = grande_bytes
+        self._consultas: deque = deque(maxlen=tamanho)
+        self._lock = threading.Lock()
+        # Última resposta HTTP de cada thread (bytes da resposta, via hook do httpx)
+        self._local = threading.local()
+
+    def _guardar_resposta(self, resposta):
+        self._local.resposta = resposta
+
+    def instrumentar(self, query):
+        """
+        Instala na sessão httpx da query o hook que guarda a resposta (uma vez por sessão)
+
+        Args:
+            query: Query prestes a ser executada
+        """
+        sessao = getattr(getattr(query, 'request', None), 'session', None)
+        ganchos = getattr(sessao, 'event_hooks', None)
+        if ganchos is not None and self._guardar_resposta not in ganchos.get('response', []):
+            ganchos.setdefault('response', []).append(self._guardar_resposta)
+            sessao.event_hooks = ganchos
+        self._local.resposta = None
+
+    def registrar(self, operacao: str, query, segundos: float, resultado=None, erro: Optional[Exception] = None):
+        """
+        Registra uma consulta executada
+
+        Args:
+            operacao: Nome da operação no SupabaseClient
+            query: Query executada
+            segundos: Latência
+            resultado: Resposta do execute() (None se falhou)
+            erro: Exceção levantada pelo execute()
+        """
+        resposta = getattr(self._local, 'resposta', None)
+        self._local.resposta = None
+        dados = getattr(resultado, 'data', None)
+        requisicao = requisicao_atual.get()
+
+        consulta = {
+            'instante': datetime.now().isoformat(timespec='milliseconds'),
+            'operacao': operacao,
+            **descrever(query),
+            'linhas': len(dados) if isinstance(dados, list) else int(dados is not None),
+            'bytes': _tamanho(resposta),
+            'latencia_ms': round(segundos * 1000, 2),
+            'erro': f"{type(erro).__name__}: {erro}"[:300] if erro is not None else None,
+            'requisicao': requisicao['id'] if requisicao else None,
+            'rota': requisicao['rota'] if requisicao else None
+        }
+        consulta['lenta'] = (consulta['latencia_ms'] >= self.lenta_ms
+                             or (consulta['bytes'] or 0) >= self.grande_bytes)
+
+        with self._lock:
+            self._consultas.append(consulta)
+        if requisicao:
+            requisicao['consultas'] += 1
+
+        if consulta['lenta']:
+            logger.warning(
+                "🐢 Consulta lenta %s (%s %s): %.0f ms, %d linhas, %s bytes",
+                operacao, consulta['metodo'], consulta['alvo'], consulta['latencia_ms'],
+                consulta['linhas'], consulta['bytes'], extra={'consulta': consulta}
+            )
+
+    def consultas(self, limite: int = 100, operacao: Optional[str] = None, somente_lentas: bool = False) -> List[Dict]:
+        """
+        Args:
+            limite: Máximo de consultas devolvidas
+            operacao: Filtra por operação
+            somente_lentas: Só as que passaram dos limites
+
+        Returns:
+            List[Dict]: Consultas mais recentes primeiro
+        """
+        with self._lock:
+            todas = list(self._consultas)
+        selecionadas = [c for c in reversed(todas)
+                        if (operacao is None or c['operacao'] == operacao) and (not somente_lentas or c['lenta'])]
+        return selecionadas[:limite]
+
+    def resumo(self) -> List[Dict]:
+        """
+        Agregado por operação e alvo das consultas no buffer
+
+        Returns:
+            List[Dict]: chamadas, erros, linhas, bytes, latência (p50, p95, máx, total) e
+            quantas usaram select=* — as de maior tempo total primeiro
+        """
+        with self._lock:
+            todas = list(self._consultas)
+
+        grupos: Dict[tuple, List[Dict]] = {}
+        for consulta in todas:
+            grupos.setdefault((consulta['operacao'], consulta['alvo']), []).append(consulta)
+
+        resumo = []
+        for (operacao, alvo), consultas in grupos.items():
+            latencias = [c['latencia_ms'] for c in consultas]
+            resumo.append({
+                'operacao': operacao,
+                'alvo': alvo,
+                'chamadas': len(consultas),
+                'erros': sum(c['erro'] is not None for c in consultas),
+                'linhas': sum(c['linhas'] for c in consultas),
+                'bytes': sum(c['bytes'] or 0 for c in consultas),
+                'select_asterisco': sum(c['select'] == '*' for c in consultas),
+                'latencia_p50_ms': _percentil(latencias, 0.5),
+                'latencia_p95_ms': _percentil(latencias, 0.95),
+                'latencia_max_ms': max(latencias),
+                'latencia_total_ms': round(sum(latencias), 2)
+            })
+        return sorted(resumo, key=lambda g: g['latencia_total_ms'], reverse=True)
+
+    def repeticoes(self, minimo: int = 5) -> List[Dict]:
+        """
+        Operações repetidas dentro de uma mesma requisição da API (suspeitas de N+1)
+
+        Args:
+            minimo: Repetições a partir das quais a operação é listada
+
+        Returns:
+            List[Dict]: requisicao, rota, operacao e chamadas — as mais repetidas primeiro
+        """
+        with self._lock:
+            todas = list(self._consultas)
+
+        contagem = Counter((c['requisicao'], c['rota'], c['operacao']) for c in todas if c['requisicao'])
+        return [
+            {'requisicao': requisicao, 'rota': rota, 'operacao': operacao, 'chamadas': chamadas}
+            for (requisicao, rota, operacao), chamadas in contagem.most_common() if chamadas >= minimo
+        ]
+
+    def limpar(self):
+        with self._lock:
+            self._consultas.clear()
+
+    def relatorio(self, limite: int = 100, operacao: Optional[str] = None, somente_lentas: bool = False) -> Dict:
+        """
+        Returns:
+            Dict: Configuração, resumo por operação, repetições por requisição e as consultas
+            mais recentes (apenas deste processo)
+        """
+        return {
+            'ativo': self.ativo,
+            'processo': os.getpid(),
+            'limites': {'lenta_ms': self.lenta_ms, 'grande_bytes': self.grande_bytes,
+                        'buffer': self._consultas.maxlen},
+            'resumo': self.resumo(),
+            'repeticoes': self.repeticoes(),
+            'consultas': self.consultas(limite, operacao, somente_lentas)
+        }
+
+
+PERFIL = PerfilConsultas()
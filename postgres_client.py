@@ -0,0 +1,257 @@
+"""
+Backend PostgreSQL direto (psycopg2) para armazenamento das intimações
+Inserções em lote com execute_values e ON CONFLICT DO NOTHING, sem passar pelo PostgREST
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+import psycopg2
+from psycopg2 import pool
+from psycopg2.extras import Json, execute_values
+
+from armazenamento import ArmazenamentoIntimacoes
+from config import (
+    DATABASE_URL, POSTGRES_POOL_MIN, POSTGRES_POOL_MAX, POSTGRES_TAMANHO_LOTE,
+    TABELA_INTIMACOES, TABELA_LOGS, TABELA_PAYLOADS, COMPRIMIR_PAYLOADS, DETECTAR_ALTERACOES
+)
+from instrumentacao import cronometrar
+from metricas import POSTGRES_OPERACOES, POSTGRES_LATENCIA
+from supabase_client import (
+    preparar_dados_intimacao, preparar_dados_log, preparar_payload_intimacao,
+    preparar_alteracao, selecionar_alteradas
+)
+
+COLUNAS_INTIMACAO = (
+    "id_intimacao", "numero_processo", "tribunal", "orgao_julgador", "data_publicacao",
+    "tipo_comunicacao", "conteudo_texto", "conteudo_original", "hash_conteudo",
+    "impressao_digital", "metadados", "status_processamento", "data_extracao"
+)
+
+
+def _adaptar(valor):
+    """
+    Dicts e listas vão como JSONB
+    """
+    if isinstance(valor, (dict, list)):
+        return Json(valor)
+    return valor
+
+
+class PostgresClient(ArmazenamentoIntimacoes):
+    """
+    Cliente PostgreSQL com pool de conexões
+    """
+
+    def __init__(self, dsn: str = DATABASE_URL):
+        self.logger = logging.getLogger(__name__)
+
+        if not dsn:
+            raise ValueError("DATABASE_URL não configurada")
+
+        try:
+            self.pool = pool.ThreadedConnectionPool(POSTGRES_POOL_MIN, POSTGRES_POOL_MAX, dsn)
+            # getconn() levanta PoolError com o pool esgotado: quem passar do limite espera a vez
+            self._vagas = threading.BoundedSemaphore(POSTGRES_POOL_MAX)
+            self.logger.info("✅ Conexão com PostgreSQL estabelecida")
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao conectar com PostgreSQL: {e}")
+            raise
+
+    @contextmanager
+    def _conexao(self, operacao: str):
+        """
+        Empresta uma conexão do pool numa transação, registrando latência e resultado
+        (bloqueia enquanto as POSTGRES_POOL_MAX conexões estiverem em uso)
+
+        Args:
+            operacao: Nome da operação (rótulo das métricas)
+        """
+        self._vagas.acquire()
+        try:
+            conexao = self.pool.getconn()
+        except Exception:
+            self._vagas.release()
+            raise
+
+        inicio = time.perf_counter()
+        try:
+            with conexao:
+                with conexao.cursor() as cursor:
+                    yield cursor
+        except Exception:
+            POSTGRES_OPERACOES.inc(operacao=operacao, resultado='erro')
+            raise
+        else:
+            POSTGRES_OPERACOES.inc(operacao=operacao, resultado='sucesso')
+        finally:
+            POSTGRES_LATENCIA.observar(time.perf_counter() - inicio, operacao=operacao)
+            self.pool.putconn(conexao)
+            self._vagas.release()
+
+    def testar_conexao(self) -> bool:
+        """
+        Testa a conexão com o PostgreSQL
+
+        Returns:
+            bool: True se conexão estiver funcionando
+        """
+        try:
+            with self._conexao("testar_conexao") as cursor:
+                cursor.execute(f"SELECT 1 FROM {TABELA_LOGS} LIMIT 1")
+            self.logger.info("✅ Teste de conexão PostgreSQL: SUCESSO")
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Teste de conexão PostgreSQL falhou: {e}")
+            return False
+
+    @staticmethod
+    def _gravar_payloads(cursor, intimacoes: List[Dict], substituir: bool = False):
+        """
+        Grava os itens brutos comprimidos na tabela fria, na transação do cursor
+
+        Args:
+            cursor: Cursor da transação em andamento
+            intimacoes: Intimações processadas
+            substituir: Se True, sobrescreve os já gravados (senão os ignora)
+        """
+        if not intimacoes:
+            return
+        conflito = "(id_intimacao) DO UPDATE SET payload = EXCLUDED.payload" if substituir else "DO NOTHING"
+        payloads = [preparar_payload_intimacao(i) for i in intimacoes]
+        execute_values(
+            cursor,
+            f"INSERT INTO {TABELA_PAYLOADS} (id_intimacao, payload) VALUES %s ON CONFLICT {conflito}",
+            [(p["id_intimacao"], p["payload"]) for p in payloads],
+            page_size=len(payloads)
+        )
+
+    @cronometrar('insercao')
+    def _inserir_lote(self, intimacoes: List[Dict]) -> Tuple[List[str], List[str]]:
+        """
+        Insere um lote ignorando conflitos de id_intimacao e hash_conteudo
+        Com COMPRIMIR_PAYLOADS os itens brutos das linhas inseridas vão para a
+        tabela fria na mesma transação; com DETECTAR_ALTERACOES as já existentes
+        cuja impressão digital mudou ganham nova versão (djen_registrar_alteracoes).
+
+        Args:
+            intimacoes: Intimações processadas
+
+        Returns:
+            Tuple[List[str], List[str]]: id_intimacao das linhas inseridas e das versionadas
+        """
+        sql = (
+            f"INSERT INTO {TABELA_INTIMACOES} ({', '.join(COLUNAS_INTIMACAO)}) VALUES %s "
+            f"ON CONFLICT DO NOTHING RETURNING id_intimacao"
+        )
+        linhas = [preparar_dados_intimacao(intimacao) for intimacao in intimacoes]
+        valores = [tuple(_adaptar(linha[coluna]) for coluna in COLUNAS_INTIMACAO) for linha in linhas]
+
+        with self._conexao("inserir_lote") as cursor:
+            inseridos = [row[0] for row in execute_values(cursor, sql, valores, page_size=len(valores), fetch=True)]
+            ids = set(inseridos)
+
+            versionados = []
+            if DETECTAR_ALTERACOES and len(ids) < len(intimacoes):
+                existentes = [i for i in intimacoes if i["id_intimacao"] not in ids]
+                cursor.execute(
+                    f"SELECT id_intimacao, impressao_digital FROM {TABELA_INTIMACOES} WHERE id_intimacao = ANY(%s)",
+                    ([i["id_intimacao"] for i in existentes],)
+                )
+                alteradas = selecionar_alteradas(existentes, dict(cursor.fetchall()))
+                if alteradas:
+                    cursor.execute(
+                        "SELECT alterada FROM djen_registrar_alteracoes(%s)",
+                        (Json([preparar_alteracao(i) for i in alteradas]),)
+                    )
+                    versionados = [row[0] for row in cursor.fetchall()]
+
+            if COMPRIMIR_PAYLOADS:
+                self._gravar_payloads(cursor, [i for i in intimacoes if i["id_intimacao"] in ids])
+                versionados_set = set(versionados)
+                self._gravar_payloads(cursor, [i for i in intimacoes if i["id_intimacao"] in versionados_set],
+                                      substituir=True)
+        return inseridos, versionados
+
+    def processar_intimacoes(self, intimacoes: List[Dict]) -> Dict:
+        """
+        Grava as intimações em lotes de POSTGRES_TAMANHO_LOTE
+
+        Args:
+            intimacoes: Lista de intimações processadas
+
+        Returns:
+            Dict: Estatísticas do processamento
+        """
+        estatisticas = {
+            "total_processadas": len(intimacoes),
+            "novas_inseridas": 0,
+            "duplicatas_encontradas": 0,
+            "erros": 0,
+            "alteracoes_registradas": 0,
+            "detalhes_erros": [],
+            "ids_erros": [],
+            "ids_inseridas": [],
+            "ids_alteradas": []
+        }
+
+        self.logger.info(f"Processando {len(intimacoes)} intimações (PostgreSQL)")
+
+        for inicio in range(0, len(intimacoes), POSTGRES_TAMANHO_LOTE):
+            lote = intimacoes[inicio:inicio + POSTGRES_TAMANHO_LOTE]
+            try:
+                inseridos, versionados = self._inserir_lote(lote)
+                estatisticas["novas_inseridas"] += len(inseridos)
+                estatisticas["ids_inseridas"].extend(inseridos)
+                estatisticas["alteracoes_registradas"] += len(versionados)
+                estatisticas["ids_alteradas"].extend(versionados)
+                estatisticas["duplicatas_encontradas"] += len(lote) - len(inseridos)
+            except (psycopg2.Error, KeyError) as e:
+                estatisticas["erros"] += len(lote)
+                erro_msg = f"Erro ao inserir lote de {len(lote)} intimações: {e}"
+                estatisticas["detalhes_erros"].append(erro_msg)
+                estatisticas["ids_erros"].extend(i.get("id_intimacao") for i in lote)
+                self.logger.error(erro_msg)
+
+        self.logger.info(f"Processamento concluído: {estatisticas['novas_inseridas']} inseridas, "
+                        f"{estatisticas['duplicatas_encontradas']} duplicatas, "
+                        f"{estatisticas['alteracoes_registradas']} alteradas, "
+                        f"{estatisticas['erros']} erros")
+
+        return estatisticas
+
+    def registrar_log_execucao(self, log_dados: Dict) -> bool:
+        """
+        Registra um log de execução
+
+        Args:
+            log_dados: Dados do log de execução
+
+        Returns:
+            bool: True se inserido com sucesso
+        """
+        try:
+            dados_log = preparar_dados_log(log_dados)
+            colunas = list(dados_log)
+            sql = (
+                f"INSERT INTO {TABELA_LOGS} ({', '.join(colunas)}) "
+                f"VALUES ({', '.join(['%s'] * len(colunas))})"
+            )
+
+            with self._conexao("registrar_log") as cursor:
+                cursor.execute(sql, [_adaptar(dados_log[c]) for c in colunas])
+
+            self.logger.info("✅ Log de execução registrado")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar log: {e}")
+            return False
+
+    def fechar(self):
+        """
+        Fecha todas as conexões do pool
+        """
+        self.pool.closeall()
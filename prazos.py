@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Cálculo dos vencimentos de prazo das intimações (dias úteis, CPC arts. 219, 220 e 224)
+Feriados nacionais calculados aqui; feriados locais e de tribunal vêm da tabela de feriados:
+
+    python prazos.py --recalcular
+    python prazos.py --vencimento 2025-03-10 15
+"""
+import argparse
+import logging
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+FERIADOS_FIXOS = (
+    (1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (12, 25)
+)
+# Dia Nacional de Zumbi e da Consciência Negra (Lei 14.759/2023)
+FERIADO_CONSCIENCIA_NEGRA = (11, 20)
+ANO_CONSCIENCIA_NEGRA = 2024
+
+# Recesso forense: prazos suspensos de 20/12 a 20/01, inclusive (CPC art. 220)
+INICIO_RECESSO = (12, 20)
+FIM_RECESSO = (1, 20)
+
+COLUNAS_PRAZO = "id_intimacao, numero_processo, tribunal, data_publicacao, metadados"
+
+
+def pascoa(ano: int) -> date:
+    """
+    Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)
+
+    Args:
+        ano: Ano
+
+    Returns:
+        date: Data da Páscoa
+    """
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+@lru_cache(maxsize=64)
+def feriados_nacionais(ano: int) -> FrozenSet[date]:
+    """
+    Feriados nacionais e forenses móveis de um ano
+    (Carnaval, Sexta-feira Santa e Corpus Christi)
+
+    Args:
+        ano: Ano
+
+    Returns:
+        FrozenSet[date]: Datas sem expediente forense
+    """
+    fixos = list(FERIADOS_FIXOS)
+    if ano >= ANO_CONSCIENCIA_NEGRA:
+        fixos.append(FERIADO_CONSCIENCIA_NEGRA)
+
+    domingo_pascoa = pascoa(ano)
+    moveis = [domingo_pascoa + timedelta(days=delta) for delta in (-48, -47, -2, 60)]
+
+    return frozenset([date(ano, mes, dia) for mes, dia in fixos] + moveis)
+
+
+def em_recesso(dia: date) -> bool:
+    """
+    Returns:
+        bool: True se o dia estiver no recesso forense (20/12 a 20/01)
+    """
+    return (dia.month, dia.day) >= INICIO_RECESSO or (dia.month, dia.day) <= FIM_RECESSO
+
+
+class CalendarioForense:
+    """
+    Dias úteis forenses: sem fins de semana, feriados nacionais, feriados
+    cadastrados (gerais ou do tribunal) e recesso
+    """
+
+    def __init__(self, feriados: Optional[Iterable[Dict]] = None):
+        """
+        Args:
+            feriados: Linhas da tabela de feriados ({'data', 'tribunal'}; tribunal '' vale para todos)
+        """
+        self._feriados_locais: Dict[str, set] = {}
+        for feriado in feriados or []:
+            dia = feriado['data']
+            if isinstance(dia, str):
+                dia = date.fromisoformat(dia[:10])
+            self._feriados_locais.setdefault(feriado.get('tribunal') or '', set()).add(dia)
+
+    def dia_util(self, dia: date, tribunal: str = '') -> bool:
+        """
+        Args:
+            dia: Data
+            tribunal: Sigla do tribunal (considera também os feriados dele)
+
+        Returns:
+            bool: True se houver expediente forense e o prazo correr
+        """
+        if dia.weekday() >= 5 or em_recesso(dia) or dia in feriados_nacionais(dia.year):
+            return False
+        if dia in self._feriados_locais.get('', ()):
+            return False
+        return not (tribunal and dia in self._feriados_locais.get(tribunal, ()))
+
+    def proximo_dia_util(self, dia: date, tribunal: str = '') -> date:
+        """
+        Returns:
+            date: Primeiro dia útil estritamente posterior a `dia`
+        """
+        dia += timedelta(days=1)
+        while not self.dia_util(dia, tribunal):
+            dia += timedelta(days=1)
+        return dia
+
+    def calcular_vencimento(self, data_disponibilizacao: date, dias: int, tribunal: str = '') -> Dict:
+        """
+        Vencimento de um prazo em dias úteis contado de uma disponibilização no DJEN
+        (publicação no primeiro dia útil seguinte; contagem a partir do dia útil
+        seguinte à publicação, incluindo o dia do vencimento)
+
+        Args:
+            data_disponibilizacao: Data de disponibilização (data_publicacao da intimação)
+            dias: Prazo em dias úteis
+            tribunal: Sigla do tribunal
+
+        Returns:
+            Dict: data_publicacao_efetiva, data_inicio_contagem e data_vencimento
+        """
+        publicacao = self.proximo_dia_util(data_disponibilizacao, tribunal)
+        inicio = self.proximo_dia_util(publicacao, tribunal)
+
+        vencimento = inicio
+        for _ in range(dias - 1):
+            vencimento = self.proximo_dia_util(vencimento, tribunal)
+
+        return {
+            'data_publicacao_efetiva': publicacao,
+            'data_inicio_contagem': inicio,
+            'data_vencimento': vencimento
+        }
+
+
+def extrair_prazos(metadados: Optional[Dict]) -> List[int]:
+    """
+    Prazos em dias capturados por extrair_metadados_texto (prazos_encontrados)
+
+    Args:
+        metadados: Metadados da intimação
+
+    Returns:
+        List[int]: Prazos distintos, em ordem crescente
+    """
+    encontrados = ((metadados or {}).get('metadados_texto') or {}).get('prazos_encontrados') or []
+    prazos = set()
+    for prazo in encontrados:
+        numero = prazo[0] if isinstance(prazo, (list, tuple)) else prazo
+        if re.fullmatch(r'\d{1,3}', str(numero)) and int(numero) > 0:
+            prazos.add(int(numero))
+    return sorted(prazos)
+
+
+def gerar_prazos(intimacao: Dict, calendario: CalendarioForense) -> List[Dict]:
+    """
+    Linhas de prazo de uma intimação (uma por prazo distinto encontrado no texto)
+
+    Args:
+        intimacao: Intimação processada ou lida do banco
+        calendario: Calendário forense
+
+    Returns:
+        List[Dict]: Linhas para a tabela de prazos (datas em ISO)
+    """
+    data_publicacao = intimacao.get('data_publicacao')
+    if not data_publicacao:
+        return []
+    if isinstance(data_publicacao, datetime):
+        data_publicacao = data_publicacao.date()
+    elif isinstance(data_publicacao, str):
+        data_publicacao = date.fromisoformat(data_publicacao[:10])
+
+    tribunal = intimacao.get('tribunal') or ''
+    linhas = []
+    for dias in extrair_prazos(intimacao.get('metadados')):
+        datas = calendario.calcular_vencimento(data_publicacao, dias, tribunal)
+        linhas.append({
+            'id_intimacao': intimacao['id_intimacao'],
+            'numero_processo': intimacao.get('numero_processo'),
+            'tribunal': tribunal,
+            'dias_prazo': dias,
+            'data_publicacao': data_publicacao.isoformat(),
+            **{chave: valor.isoformat() for chave, valor in datas.items()}
+        })
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vencimentos de prazo das intimações")
+    parser.add_argument('--recalcular', action='store_true', help="Recalcula os prazos de todas as intimações do Supabase")
+    parser.add_argument('--vencimento', nargs=2, metavar=('DATA', 'DIAS'), help="Calcula um vencimento avulso")
+    parser.add_argument('--tribunal', default='')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from supabase_client import SupabaseClient
+    cliente = SupabaseClient()
+    calendario = CalendarioForense(cliente.obter_feriados())
+
+    if args.vencimento:
+        data, dias = args.vencimento
+        datas = calendario.calcular_vencimento(date.fromisoformat(data), int(dias), args.tribunal)
+        for chave, valor in datas.items():
+            print(f"{chave:24} {valor.isoformat()}")
+
+    if args.recalcular:
+        total, lote = 0, []
+        for intimacao in cliente.iterar_intimacoes(COLUNAS_PRAZO):
+            lote.extend(gerar_prazos(intimacao, calendario))
+            if len(lote) >= 500:
+                total += len(lote) if cliente.gravar_prazos(lote, substituir=True) else 0
+                lote = []
+        if lote:
+            total += len(lote) if cliente.gravar_prazos(lote, substituir=True) else 0
+        print(f"✅ {total} prazos recalculados")
+
+
+if __name__ == '__main__':
+    main()
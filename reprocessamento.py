@@ -0,0 +1,198 @@
+"""
+Reprocessamento das intimações gravadas a partir do item bruto armazenado
+Refaz texto limpo, número do processo e metadados com o TextProcessor atual,
+sem consultar a API DJEN, e grava só as linhas em que algo mudou.
+
+Fluxo: páginas por keyset em `id` → payloads da tabela fria em lote → processamento
+em vários processos → atualização em lote (djen_atualizar_derivados).
+"""
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from compressao_payload import descomprimir_payload
+from config import REPROCESSAMENTO_PROCESSOS, REPROCESSAMENTO_TAMANHO_LOTE
+from text_processor import TextProcessor
+
+logger = logging.getLogger(__name__)
+
+# Colunas recalculadas a partir do item bruto
+CAMPOS_DERIVADOS = ("numero_processo", "conteudo_texto", "metadados")
+COLUNAS_REPROCESSAMENTO = "id, id_intimacao, conteudo_original, " + ", ".join(CAMPOS_DERIVADOS)
+
+# Processador de cada processo do pool (criado no primeiro lote)
+_processor: Optional[TextProcessor] = None
+
+
+def _como_json(valor):
+    """
+    Valor como voltaria do banco (tuplas viram listas, datas viram texto)
+    """
+    return json.loads(json.dumps(valor, ensure_ascii=False, default=str))
+
+
+def campos_alterados(linha: Dict, item_api: Dict, processor: TextProcessor) -> Dict:
+    """
+    Reprocessa o item bruto e compara com os campos derivados gravados
+
+    Args:
+        linha: Linha gravada (com CAMPOS_DERIVADOS)
+        item_api: Item bruto da API (com 'texto')
+        processor: Processador de texto
+
+    Returns:
+        Dict: Apenas os campos cujo valor mudou
+
+    Raises:
+        ValueError: Se o processamento do item falhar
+    """
+    nova = processor.processar_intimacao_completa(item_api)
+    if nova.get('status_processamento') == 'erro_processamento':
+        raise ValueError(nova.get('erro_processamento'))
+
+    alterados = {}
+    for campo in CAMPOS_DERIVADOS:
+        valor = _como_json(nova.get(campo))
+        if valor != linha.get(campo):
+            alterados[campo] = valor
+    return alterados
+
+
+def reprocessar_lote(tarefas: List[Tuple[Dict, Dict]]) -> Tuple[List[Dict], int, List[str]]:
+    """
+    Reprocessa um lote de linhas (executado nos processos do pool)
+
+    Args:
+        tarefas: (linha gravada, item bruto) de cada intimação
+
+    Returns:
+        Tuple[List[Dict], int, List[str]]: Linhas alteradas (id_intimacao e todos os
+        CAMPOS_DERIVADOS), quantas mudaram de número de processo e mensagens de erro
+    """
+    global _processor
+    if _processor is None:
+        _processor = TextProcessor()
+
+    alteradas, processos_alterados, erros = [], 0, []
+    for linha, item_api in tarefas:
+        try:
+            alterados = campos_alterados(linha, item_api, _processor)
+            if alterados:
+                processos_alterados += "numero_processo" in alterados
+                atual = {campo: linha.get(campo) for campo in CAMPOS_DERIVADOS}
+                alteradas.append({"id_intimacao": linha["id_intimacao"], **atual, **alterados})
+        except Exception as e:
+            erros.append(f"{linha.get('id_intimacao')}: {e}")
+    return alteradas, processos_alterados, erros
+
+
+def _lotes(cliente, limite: Optional[int], tamanho_lote: int,
+           estatisticas: Dict) -> Iterator[List[Tuple[Dict, Dict]]]:
+    """
+    Lê as intimações por keyset e monta os lotes com o item bruto de cada uma
+    (itens sem 'texto' no conteudo_original vêm da tabela fria, numa consulta por lote)
+    """
+    pagina: List[Dict] = []
+
+    def montar(linhas: List[Dict]) -> List[Tuple[Dict, Dict]]:
+        sem_texto = [l["id_intimacao"] for l in linhas
+                     if not isinstance(l.get("conteudo_original"), dict) or not l["conteudo_original"].get("texto")]
+        payloads = cliente.obter_payloads(sem_texto) if sem_texto else {}
+
+        tarefas = []
+        for linha in linhas:
+            item_api = linha.pop("conteudo_original", None)
+            if linha["id_intimacao"] in payloads:
+                item_api = payloads[linha["id_intimacao"]]
+            elif not isinstance(item_api, dict):
+                try:
+                    item_api = descomprimir_payload(item_api)
+                except Exception:
+                    item_api = None
+            if not isinstance(item_api, dict) or not item_api.get("texto"):
+                estatisticas["sem_original"] += 1
+                continue
+            tarefas.append((linha, item_api))
+        return tarefas
+
+    for linha in cliente.iterar_intimacoes(COLUNAS_REPROCESSAMENTO, tamanho_pagina=max(tamanho_lote, 100)):
+        if limite is not None and estatisticas["lidas"] >= limite:
+            break
+        estatisticas["lidas"] += 1
+        pagina.append(linha)
+        if len(pagina) >= tamanho_lote:
+            yield montar(pagina)
+            pagina = []
+
+    if pagina:
+        yield montar(pagina)
+
+
+def reprocessar(cliente, limite: Optional[int] = None,
+                progresso: Optional[Callable[[Dict], None]] = None,
+                processos: int = REPROCESSAMENTO_PROCESSOS,
+                tamanho_lote: int = REPROCESSAMENTO_TAMANHO_LOTE) -> Dict:
+    """
+    Reprocessa as intimações gravadas em lotes, distribuídos entre processos
+
+    Args:
+        cliente: SupabaseClient
+        limite: Máximo de intimações lidas (None = todas)
+        progresso: Chamado com as estatísticas parciais a cada lote concluído
+        processos: Processos de trabalho (1 = no próprio processo)
+        tamanho_lote: Linhas por lote de leitura, processamento e gravação
+
+    Returns:
+        Dict: lidas, processadas, alteradas, processos_alterados, sem_original e erros
+    """
+    estatisticas = {"lidas": 0, "processadas": 0, "alteradas": 0, "processos_alterados": 0,
+                    "sem_original": 0, "erros": 0}
+    pendentes: List[Dict] = []
+
+    def gravar():
+        atualizadas = cliente.atualizar_campos_derivados(pendentes)
+        if atualizadas is None:
+            estatisticas["erros"] += len(pendentes)
+        else:
+            estatisticas["alteradas"] += atualizadas
+        pendentes.clear()
+
+    def consumir(tarefas: int, resultado: Tuple[List[Dict], int, List[str]]):
+        alteradas, processos_alterados, erros = resultado
+        estatisticas["processadas"] += tarefas - len(erros)
+        estatisticas["erros"] += len(erros)
+        for erro in erros:
+            logger.error(f"❌ Erro ao reprocessar {erro}")
+
+        estatisticas["processos_alterados"] += processos_alterados
+        pendentes.extend(alteradas)
+        if len(pendentes) >= tamanho_lote:
+            gravar()
+        if progresso:
+            progresso(dict(estatisticas))
+
+    lotes = _lotes(cliente, limite, tamanho_lote, estatisticas)
+    if processos <= 1:
+        for tarefas in lotes:
+            consumir(len(tarefas), reprocessar_lote(tarefas))
+    else:
+        # Poucos lotes em voo: a leitura acompanha o processamento sem acumular a base na memória
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            em_voo = deque()
+            for tarefas in lotes:
+                em_voo.append((len(tarefas), executor.submit(reprocessar_lote, tarefas)))
+                if len(em_voo) >= processos * 2:
+                    quantidade, futuro = em_voo.popleft()
+                    consumir(quantidade, futuro.result())
+            while em_voo:
+                quantidade, futuro = em_voo.popleft()
+                consumir(quantidade, futuro.result())
+
+    if pendentes:
+        gravar()
+
+    logger.info(f"♻️ Reprocessamento: {estatisticas['lidas']} lidas, {estatisticas['alteradas']} alteradas "
+                f"({processos} processos, lotes de {tamanho_lote})")
+    return estatisticas
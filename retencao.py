@@ -0,0 +1,309 @@
+"""
+Retenção e arquivamento dos dados frios (agendamento diário 'retencao' ou python -m djen retencao)
+
+- Logs de execução: a tabela é particionada por mês de data_extracao; cada mês inteiro
+  mais antigo que RETENCAO_LOGS_DIAS vai para ARQUIVO_DIR/logs/<tabela>_AAAA_MM.ndjson.gz
+  e a partição é descartada (DROP, sem DELETE nem VACUUM). A mesma execução cria as
+  partições dos próximos PARTICOES_MESES_A_FRENTE meses.
+- Itens brutos das intimações publicadas antes de RETENCAO_PAYLOADS_DIAS: gravados em
+  ARQUIVO_DIR/payloads/<tabela>_AAAA_MM.ndjson.gz (mês de publicação) e removidos da tabela
+  fria e do conteudo_original; texto limpo, metadados e busca continuam na base.
+  restaurar_payloads devolve um arquivo à tabela fria (detalhe e reprocessamento).
+
+Cada lote só sai da base depois de gravado e sincronizado no disco.
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from compressao_payload import descomprimir_payload
+from config import (
+    RETENCAO_LOGS_DIAS, RETENCAO_PAYLOADS_DIAS, ARQUIVO_DIR, PARTICOES_MESES_A_FRENTE,
+    TABELA_LOGS, TABELA_PAYLOADS
+)
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+
+
+def _inicio_mes(valor) -> date:
+    """
+    Primeiro dia do mês de uma data ou timestamp ISO
+    """
+    dia = valor if isinstance(valor, date) else date.fromisoformat(str(valor)[:10])
+    return dia.replace(day=1)
+
+
+def _proximo_mes(mes: date) -> date:
+    return (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _linha(dados: Dict) -> bytes:
+    return (json.dumps(dados, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _sincronizar(arquivo: gzip.GzipFile):
+    """
+    Descarrega o gzip aberto até o disco (o lote pode sair da base em seguida)
+    """
+    arquivo.flush()
+    arquivo.fileobj.flush()
+    os.fsync(arquivo.fileobj.fileno())
+
+
+def _caminho_livre(caminho: str) -> str:
+    """
+    Caminho sem sobrescrever um arquivo anterior (sufixo _2, _3...)
+    """
+    base, extensao = caminho[:-len(".ndjson.gz")], ".ndjson.gz"
+    numero = 1
+    while os.path.exists(caminho):
+        numero += 1
+        caminho = f"{base}_{numero}{extensao}"
+    return caminho
+
+
+def ler_arquivo(caminho: str) -> Iterator[Dict]:
+    """
+    Lê um arquivo .ndjson.gz do arquivamento
+
+    Args:
+        caminho: Arquivo gerado por arquivar_logs ou arquivar_payloads
+
+    Yields:
+        Dict: Uma linha por vez (um final truncado por queda no meio da escrita é ignorado)
+    """
+    try:
+        with gzip.open(caminho, "rt", encoding="utf-8") as entrada:
+            for linha in entrada:
+                if linha.strip():
+                    yield json.loads(linha)
+    except (EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+        logger.warning(f"⚠️ Final incompleto em {caminho}: {e}")
+
+
+def arquivar_logs(cliente, dias: int = RETENCAO_LOGS_DIAS, diretorio: str = ARQUIVO_DIR) -> Dict:
+    """
+    Arquiva e descarta os meses de log inteiramente anteriores a hoje - dias
+
+    Args:
+        cliente: SupabaseClient
+        dias: Dias de logs mantidos na base (0 = não arquiva)
+        diretorio: Raiz do arquivamento
+
+    Returns:
+        Dict: meses, arquivados, removidos e erros
+    """
+    estatisticas = {"meses": 0, "arquivados": 0, "removidos": 0, "erros": 0}
+    if dias <= 0:
+        return estatisticas
+
+    inicio = cliente.obter_inicio_logs()
+    if not inicio:
+        return estatisticas
+
+    limite = _inicio_mes(date.today() - timedelta(days=dias))
+    pasta = os.path.join(diretorio, "logs")
+    os.makedirs(pasta, exist_ok=True)
+
+    mes = _inicio_mes(inicio)
+    while mes < limite:
+        caminho = _caminho_livre(os.path.join(pasta, f"{TABELA_LOGS}_{mes:%Y_%m}.ndjson.gz"))
+        temporario = caminho + ".tmp"
+        total = 0
+        try:
+            with gzip.open(temporario, "wb") as saida:
+                for log in cliente.iterar_logs(mes.isoformat(), _proximo_mes(mes).isoformat()):
+                    saida.write(_linha(log))
+                    total += 1
+                _sincronizar(saida)
+            if total:
+                os.replace(temporario, caminho)
+            else:
+                os.remove(temporario)
+        except Exception as e:
+            logger.error(f"❌ Erro ao arquivar os logs de {mes:%Y-%m}: {e}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            estatisticas["erros"] += 1
+            break
+
+        removidos = cliente.descartar_mes_logs(mes.isoformat())
+        if removidos is None:
+            estatisticas["erros"] += 1
+            break
+        if removidos != total:
+            logger.warning(f"⚠️ Logs de {mes:%Y-%m}: {total} arquivados, {removidos} removidos")
+
+        estatisticas["meses"] += 1
+        estatisticas["arquivados"] += total
+        estatisticas["removidos"] += removidos
+        if total:
+            logger.info(f"🗄️ Logs de {mes:%Y-%m} arquivados em {caminho} ({total})")
+        mes = _proximo_mes(mes)
+
+    return estatisticas
+
+
+def _item_bruto(linha: Dict, payloads: Dict[str, Dict]) -> Optional[Dict]:
+    """
+    Item bruto completo (com 'texto'), da tabela fria ou do conteudo_original
+
+    Returns:
+        Optional[Dict]: None se nenhuma das fontes tiver o item completo (a linha
+        não é arquivada: o conteudo_original sem 'texto' não substitui o payload)
+    """
+    item = payloads.get(linha["id_intimacao"])
+    if item is None:
+        item = linha.get("conteudo_original")
+        if item is not None and not isinstance(item, dict):
+            try:
+                item = descomprimir_payload(item)
+            except Exception:
+                return None
+    return item if isinstance(item, dict) and item.get("texto") else None
+
+
+def arquivar_payloads(cliente, dias: int = RETENCAO_PAYLOADS_DIAS, diretorio: str = ARQUIVO_DIR,
+                      tamanho_lote: int = TAMANHO_LOTE) -> Dict:
+    """
+    Move para arquivo o item bruto das intimações publicadas antes de hoje - dias
+
+    Args:
+        cliente: SupabaseClient
+        dias: Dias de itens brutos mantidos na base (0 = não arquiva)
+        diretorio: Raiz do arquivamento
+        tamanho_lote: Intimações por leitura e por chamada de arquivamento
+
+    Returns:
+        Dict: lidas, arquivadas, sem_payload (sem item completo, mantidas na base) e erros
+    """
+    estatisticas = {"lidas": 0, "arquivadas": 0, "sem_payload": 0, "erros": 0}
+    if dias <= 0:
+        return estatisticas
+
+    corte = (date.today() - timedelta(days=dias)).isoformat()
+    pasta = os.path.join(diretorio, "payloads")
+    os.makedirs(pasta, exist_ok=True)
+    # Um arquivo por mês de publicação, aberto em modo append (cada execução é um membro gzip)
+    saidas: Dict[str, gzip.GzipFile] = {}
+
+    def arquivar(linhas: List[Dict]) -> bool:
+        sem_texto = [l["id_intimacao"] for l in linhas
+                     if not isinstance(l.get("conteudo_original"), dict) or not l["conteudo_original"].get("texto")]
+        # Falha na leitura da tabela fria interrompe o lote (não pode virar "sem payload")
+        payloads = cliente.obter_payloads(sem_texto, falhar=True) if sem_texto else {}
+
+        gravadas, tocados = [], set()
+        for linha in linhas:
+            item = _item_bruto(linha, payloads)
+            if item is None:
+                estatisticas["sem_payload"] += 1
+                continue
+            mes = f"{_inicio_mes(linha['data_publicacao']):%Y_%m}" if linha.get("data_publicacao") else "sem_data"
+            if mes not in saidas:
+                saidas[mes] = gzip.open(os.path.join(pasta, f"{TABELA_PAYLOADS}_{mes}.ndjson.gz"), "ab")
+            saidas[mes].write(_linha({
+                "id_intimacao": linha["id_intimacao"],
+                "data_publicacao": linha.get("data_publicacao"),
+                "payload": item
+            }))
+            gravadas.append(linha["id_intimacao"])
+            tocados.add(mes)
+        for mes in tocados:
+            _sincronizar(saidas[mes])
+
+        # Só sai da base o que foi gravado completo e sincronizado no disco
+        if not gravadas:
+            return True
+        arquivadas = cliente.arquivar_payloads(gravadas)
+        if arquivadas is None:
+            estatisticas["erros"] += len(gravadas)
+            return False
+        estatisticas["arquivadas"] += arquivadas
+        return True
+
+    try:
+        lote: List[Dict] = []
+        for linha in cliente.iterar_payloads_a_arquivar(corte, tamanho_pagina=tamanho_lote):
+            estatisticas["lidas"] += 1
+            lote.append(linha)
+            if len(lote) >= tamanho_lote:
+                if not arquivar(lote):
+                    return estatisticas
+                lote = []
+        if lote:
+            arquivar(lote)
+    except Exception as e:
+        logger.error(f"❌ Erro ao arquivar payloads: {e}")
+        estatisticas["erros"] += 1
+    finally:
+        for saida in saidas.values():
+            saida.close()
+
+    if estatisticas["sem_payload"]:
+        logger.warning(f"⚠️ {estatisticas['sem_payload']} intimações anteriores a {corte} sem item bruto completo "
+                       f"ficaram na base")
+    if estatisticas["lidas"]:
+        logger.info(f"🗄️ Payloads anteriores a {corte}: {estatisticas['arquivadas']} arquivados em {pasta}")
+    return estatisticas
+
+
+def restaurar_payloads(cliente, caminho: str, tamanho_lote: int = TAMANHO_LOTE) -> Dict:
+    """
+    Devolve à tabela fria os itens brutos de um arquivo de payloads
+    (as intimações continuam marcadas como arquivadas)
+
+    Args:
+        cliente: SupabaseClient
+        caminho: Arquivo gerado por arquivar_payloads
+        tamanho_lote: Itens por gravação
+
+    Returns:
+        Dict: lidas, restauradas e erros
+    """
+    # A mesma intimação pode aparecer mais de uma vez após uma execução interrompida
+    itens = {linha["id_intimacao"]: linha["payload"] for linha in ler_arquivo(caminho)}
+    estatisticas = {"lidas": len(itens), "restauradas": 0, "erros": 0}
+
+    ids = list(itens)
+    for inicio in range(0, len(ids), tamanho_lote):
+        lote = [{"id_intimacao": i, "conteudo_original": itens[i]} for i in ids[inicio:inicio + tamanho_lote]]
+        if cliente.gravar_payloads(lote, substituir=True):
+            estatisticas["restauradas"] += len(lote)
+        else:
+            estatisticas["erros"] += len(lote)
+
+    logger.info(f"📦 {estatisticas['restauradas']} payloads restaurados de {caminho}")
+    return estatisticas
+
+
+def executar_retencao(cliente, logs_dias: int = RETENCAO_LOGS_DIAS, payloads_dias: int = RETENCAO_PAYLOADS_DIAS,
+                      diretorio: str = ARQUIVO_DIR) -> Dict:
+    """
+    Manutenção diária: partições futuras dos logs, arquivamento dos logs e dos payloads antigos
+
+    Args:
+        cliente: SupabaseClient
+        logs_dias: Dias de logs mantidos na base (0 = todos)
+        payloads_dias: Dias de itens brutos mantidos na base (0 = todos)
+        diretorio: Raiz do arquivamento
+
+    Returns:
+        Dict: status_execucao, particoes_criadas, logs e payloads
+    """
+    particoes = cliente.criar_particoes_logs(PARTICOES_MESES_A_FRENTE)
+    logs = arquivar_logs(cliente, logs_dias, diretorio)
+    payloads = arquivar_payloads(cliente, payloads_dias, diretorio)
+
+    falhou = particoes is None or logs["erros"] or payloads["erros"]
+    return {
+        "status_execucao": "parcial" if falhou else "sucesso",
+        "particoes_criadas": particoes,
+        "logs": logs,
+        "payloads": payloads
+    }
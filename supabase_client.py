@@ -1,15 +1,145 @@
 """
 Cliente Supabase para armazenamento das intimações do DJEN
 """
-import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-from config import SUPABASE_URL, SUPABASE_KEY, TABELA_INTIMACOES, TABELA_LOGS
+from armazenamento import ArmazenamentoIntimacoes
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, TABELA_INTIMACOES, TABELA_LOGS, TABELA_PAYLOADS, TABELA_PROCESSOS,
+    TABELA_PRAZOS, TABELA_FERIADOS, TABELA_ADVOGADOS, TABELA_INTIMACOES_ADVOGADOS,
+    TABELA_AGENDAMENTOS, TABELA_VERSOES, TABELA_WEBHOOKS, TABELA_WEBHOOKS_DESTINOS, COMPRIMIR_PAYLOADS, DETECTAR_ALTERACOES
+)
+from compressao_payload import comprimir_payload, descomprimir_payload, payload_sem_texto
+from instrumentacao import cronometrar
+from indice_invertido import normalizar
+from text_processor import normalizar_numero_processo
+from metricas import SUPABASE_OPERACOES, SUPABASE_LATENCIA
+from perfil_consultas import PERFIL
 
-class SupabaseClient:
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Colunas lidas da tabela de intimações (sem busca_tsv, gerada para a busca textual)
+COLUNAS_INTIMACAO = (
+    "id, id_intimacao, numero_processo, tribunal, orgao_julgador, data_publicacao, tipo_comunicacao, "
+    "data_extracao, conteudo_texto, conteudo_original, hash_conteudo, metadados, status_processamento"
+)
+
+# Linha do tempo do processo: só o necessário para listar as movimentações
+COLUNAS_LINHA_DO_TEMPO = (
+    "id_intimacao, data_publicacao, tipo_comunicacao, tribunal, orgao_julgador, metadados->classe"
+)
+
+def preparar_dados_intimacao(intimacao: Dict) -> Dict:
+    """
+    Monta a linha da tabela de intimações a partir de uma intimação processada
+    
+    Args:
+        intimacao: Dados da intimação processada
+        
+    Returns:
+        Dict: Linha pronta para inserção
+    """
+    conteudo_original = intimacao.get("conteudo_original", {})
+    if COMPRIMIR_PAYLOADS:
+        # O item completo vai comprimido para TABELA_PAYLOADS
+        conteudo_original = payload_sem_texto(conteudo_original)
+    
+    return {
+        "id_intimacao": intimacao["id_intimacao"],
+        "numero_processo": intimacao.get("numero_processo"),
+        "tribunal": intimacao.get("tribunal"),
+        "orgao_julgador": intimacao.get("orgao_julgador"),
+        "data_publicacao": intimacao.get("data_publicacao"),
+        "tipo_comunicacao": intimacao.get("tipo_comunicacao"),
+        "conteudo_texto": intimacao["conteudo_texto"],
+        "conteudo_original": conteudo_original,
+        "hash_conteudo": intimacao.get("hash_conteudo"),
+        "impressao_digital": intimacao.get("impressao_digital"),
+        "metadados": intimacao.get("metadados", {}),
+        "status_processamento": intimacao.get("status_processamento", "extraido"),
+        "data_extracao": datetime.now().isoformat()
+    }
+
+# Colunas regravadas quando uma intimação existente muda (djen_registrar_alteracoes)
+COLUNAS_ALTERACAO = (
+    "id_intimacao", "impressao_digital", "tipo_comunicacao", "conteudo_texto", "conteudo_original", "metadados"
+)
+
+def preparar_alteracao(intimacao: Dict) -> Dict:
+    """
+    Monta a linha enviada a djen_registrar_alteracoes (nova versão de uma intimação)
+    
+    Args:
+        intimacao: Dados da intimação processada
+        
+    Returns:
+        Dict: Colunas de COLUNAS_ALTERACAO
+    """
+    linha = preparar_dados_intimacao(intimacao)
+    return {coluna: linha[coluna] for coluna in COLUNAS_ALTERACAO}
+
+def selecionar_alteradas(intimacoes: List[Dict], impressoes: Dict[str, Optional[str]]) -> List[Dict]:
+    """
+    Intimações já gravadas cuja impressão digital difere da armazenada
+    (inclui as gravadas antes da impressão digital, que só a recebem)
+    
+    Args:
+        intimacoes: Intimações processadas reconhecidas como duplicatas
+        impressoes: impressao_digital armazenada por id_intimacao
+        
+    Returns:
+        List[Dict]: Intimações a enviar para djen_registrar_alteracoes
+    """
+    return [
+        intimacao for intimacao in intimacoes
+        if intimacao.get("impressao_digital")
+        and intimacao["id_intimacao"] in impressoes
+        and impressoes[intimacao["id_intimacao"]] != intimacao["impressao_digital"]
+    ]
+
+def preparar_payload_intimacao(intimacao: Dict) -> Dict:
+    """
+    Monta a linha da tabela fria de payloads (item bruto da API comprimido)
+    
+    Args:
+        intimacao: Dados da intimação processada
+        
+    Returns:
+        Dict: Linha pronta para inserção
+    """
+    return {
+        "id_intimacao": intimacao["id_intimacao"],
+        "payload": comprimir_payload(intimacao.get("conteudo_original", {}))
+    }
+
+def preparar_dados_log(log_dados: Dict) -> Dict:
+    """
+    Monta a linha da tabela de logs a partir do relatório de execução
+    
+    Args:
+        log_dados: Dados do log de execução
+        
+    Returns:
+        Dict: Linha pronta para inserção
+    """
+    return {
+        "total_encontradas": log_dados.get("total_encontradas", 0),
+        "total_novas": log_dados.get("total_novas", 0),
+        "total_duplicadas": log_dados.get("total_duplicadas", 0),
+        "status_execucao": log_dados.get("status_execucao", "sucesso"),
+        "erro_detalhes": log_dados.get("erro_detalhes"),
+        "tempo_execucao_segundos": log_dados.get("tempo_execucao_segundos", 0),
+        "metricas_etapas": log_dados.get("metricas_etapas", {}),
+        "parametros_busca": log_dados.get("parametros_busca", {}),
+        "response_api": log_dados.get("response_api", {}),
+        "data_extracao": datetime.now().isoformat()
+    }
+
+class SupabaseClient(ArmazenamentoIntimacoes):
     """
     Cliente para interagir com o Supabase
     """
@@ -17,7 +147,7 @@ class SupabaseClient:
     def __init__(self):
         self.url = SUPABASE_URL
         self.key = SUPABASE_KEY
-        self.client: Optional[Client] = None
+        self.client: Optional["Client"] = None
         self.logger = logging.getLogger(__name__)
         
         if not self.url or not self.key:
@@ -30,12 +160,46 @@ class SupabaseClient:
         Estabelece conexão com o Supabase
         """
         try:
+            # Importado aqui: o pacote supabase (httpx, postgrest, auth) é a parte mais lenta do import
+            from supabase import create_client
             self.client = create_client(self.url, self.key)
             self.logger.info("✅ Conexão com Supabase estabelecida")
         except Exception as e:
             self.logger.error(f"❌ Erro ao conectar com Supabase: {e}")
             raise
     
+    def _executar(self, operacao: str, query):
+        """
+        Executa uma query do PostgREST registrando latência e resultado
+        (métricas e perfil das consultas, GET /debug/queries)
+        
+        Args:
+            operacao: Nome da operação (rótulo das métricas)
+            query: Query montada com self.client.table(...)
+            
+        Returns:
+            Resposta do execute()
+        """
+        perfilar = PERFIL.ativo
+        if perfilar:
+            PERFIL.instrumentar(query)
+        
+        inicio = time.perf_counter()
+        try:
+            result = query.execute()
+        except Exception as e:
+            SUPABASE_OPERACOES.inc(operacao=operacao, resultado='erro')
+            if perfilar:
+                PERFIL.registrar(operacao, query, time.perf_counter() - inicio, erro=e)
+            raise
+        finally:
+            SUPABASE_LATENCIA.observar(time.perf_counter() - inicio, operacao=operacao)
+        
+        SUPABASE_OPERACOES.inc(operacao=operacao, resultado='sucesso')
+        if perfilar:
+            PERFIL.registrar(operacao, query, time.perf_counter() - inicio, resultado=result)
+        return result
+    
     def testar_conexao(self) -> bool:
         """
         Testa a conexão com o Supabase
@@ -45,7 +209,7 @@ class SupabaseClient:
         """
         try:
             # Testar fazendo uma query simples na tabela de logs
-            result = self.client.table(TABELA_LOGS).select("id").limit(1).execute()
+            result = self._executar("testar_conexao", self.client.table(TABELA_LOGS).select("id").limit(1))
             self.logger.info("✅ Teste de conexão Supabase: SUCESSO")
             return True
         except Exception as e:
@@ -67,7 +231,7 @@ class SupabaseClient:
             List[Dict]: Lista de intimações
         """
         try:
-            query = self.client.table(TABELA_INTIMACOES).select("*")
+            query = self.client.table(TABELA_INTIMACOES).select(COLUNAS_INTIMACAO)
             
             if data_especifica:
                 query = query.eq("data_publicacao", data_especifica)
@@ -78,13 +242,240 @@ class SupabaseClient:
             elif data_fim:
                 query = query.lte("data_publicacao", data_fim)
             
-            result = query.order("data_extracao", desc=True).limit(limite).execute()
+            result = self._executar("buscar_intimacoes", query.order("data_extracao", desc=True).limit(limite))
             return result.data
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao buscar intimações: {e}")
             return []
     
+    def buscar_por_processo(self, numero_processo: str, limite: int = 500,
+                            colunas: str = COLUNAS_INTIMACAO) -> List[Dict]:
+        """
+        Todas as intimações de um processo (índice em numero_processo_normalizado)
+        
+        Args:
+            numero_processo: Número CNJ com ou sem máscara
+            limite: Número máximo de intimações
+            colunas: Colunas selecionadas
+            
+        Returns:
+            List[Dict]: Intimações ordenadas por data de publicação
+        """
+        numero = normalizar_numero_processo(numero_processo)
+        if not numero:
+            return []
+        
+        try:
+            result = self._executar(
+                "buscar_por_processo",
+                self.client.table(TABELA_INTIMACOES).select(colunas)
+                .eq("numero_processo_normalizado", numero)
+                .order("data_publicacao").limit(limite)
+            )
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar intimações do processo {numero_processo}: {e}")
+            return []
+    
+    def obter_linha_do_tempo(self, numero_processo: str, limite: int = 500) -> Optional[Dict]:
+        """
+        Resumo do processo (mantido pelo trigger de processos_resumo) e suas
+        intimações em ordem cronológica
+        
+        Args:
+            numero_processo: Número CNJ com ou sem máscara
+            limite: Número máximo de intimações
+            
+        Returns:
+            Optional[Dict]: {'processo': resumo, 'intimacoes': [...]}, ou None se o processo não existir
+        """
+        numero = normalizar_numero_processo(numero_processo)
+        if not numero:
+            return None
+        
+        try:
+            result = self._executar(
+                "obter_linha_do_tempo",
+                self.client.table(TABELA_PROCESSOS).select("*").eq("numero_processo_normalizado", numero).limit(1)
+            )
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar resumo do processo {numero_processo}: {e}")
+            return None
+        
+        if not result.data:
+            return None
+        
+        return {
+            'processo': result.data[0],
+            'intimacoes': self.buscar_por_processo(numero, limite=limite, colunas=COLUNAS_LINHA_DO_TEMPO)
+        }
+    
+    def listar_processos(self, limite: int = 50, deslocamento: int = 0,
+                         tribunal: Optional[str] = None) -> List[Dict]:
+        """
+        Processos acompanhados, movimentação mais recente primeiro
+        
+        Args:
+            limite: Número máximo de processos
+            deslocamento: Quantos processos pular (paginação)
+            tribunal: Sigla do tribunal (opcional)
+            
+        Returns:
+            List[Dict]: Resumos de processos_resumo
+        """
+        try:
+            query = self.client.table(TABELA_PROCESSOS).select("*")
+            if tribunal:
+                query = query.contains("tribunais", [tribunal.upper()])
+            result = self._executar(
+                "listar_processos",
+                query.order("ultima_publicacao", desc=True, nullsfirst=False)
+                .range(deslocamento, deslocamento + limite - 1)
+            )
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao listar processos: {e}")
+            return []
+    
+    def reconstruir_resumo_processos(self) -> Optional[int]:
+        """
+        Recalcula processos_resumo inteiro a partir das intimações (djen_reconstruir_processos_resumo)
+        
+        Returns:
+            Optional[int]: Processos no resumo, ou None em caso de erro
+        """
+        try:
+            result = self._executar("reconstruir_resumo_processos", self.client.rpc("djen_reconstruir_processos_resumo", {}))
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao reconstruir resumo dos processos: {e}")
+            return None
+    
+    def buscar_por_oab(self, numero_oab: str, uf_oab: Optional[str] = None, limite: int = 100) -> List[Dict]:
+        """
+        Intimações em que um advogado (OAB/UF) é destinatário
+        (containment no índice GIN de metadados->advogados_destinatarios)
+        
+        Args:
+            numero_oab: Número da OAB
+            uf_oab: UF da OAB (opcional)
+            limite: Número máximo de intimações
+            
+        Returns:
+            List[Dict]: Intimações, publicações mais recentes primeiro
+        """
+        advogado = {"numero_oab": str(numero_oab)}
+        if uf_oab:
+            advogado["uf_oab"] = uf_oab.upper()
+        
+        try:
+            result = self._executar(
+                "buscar_por_oab",
+                self.client.table(TABELA_INTIMACOES).select(COLUNAS_INTIMACAO)
+                .contains("metadados->advogados_destinatarios", [{"advogado": advogado}])
+                .order("data_publicacao", desc=True).limit(limite)
+            )
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar intimações da OAB {numero_oab}/{uf_oab}: {e}")
+            return []
+    
+    def buscar_por_destinatario(self, nome: str, limite: int = 100) -> List[Dict]:
+        """
+        Intimações por nome (parcial) de destinatário, sem diferenciar acentos
+        e maiúsculas (índice trigram em destinatarios_nomes)
+        
+        Args:
+            nome: Nome ou parte do nome
+            limite: Número máximo de intimações
+            
+        Returns:
+            List[Dict]: Intimações, publicações mais recentes primeiro
+        """
+        termo = normalizar(nome).strip()
+        if len(termo) < 3:
+            return []
+        
+        try:
+            result = self._executar(
+                "buscar_por_destinatario",
+                self.client.table(TABELA_INTIMACOES).select(COLUNAS_INTIMACAO)
+                .ilike("destinatarios_nomes", f"*{termo}*")
+                .order("data_publicacao", desc=True).limit(limite)
+            )
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar intimações do destinatário '{nome}': {e}")
+            return []
+    
+    def iterar_intimacoes(self, colunas: str = COLUNAS_INTIMACAO, tamanho_pagina: int = 1000,
+                          data_inicio: str = None, data_fim: str = None, tribunal: str = None):
+        """
+        Percorre todas as intimações em páginas, por keyset em `id`
+        (sem OFFSET, custo constante por página)
+        
+        Args:
+            colunas: Colunas selecionadas (sempre inclui id)
+            tamanho_pagina: Linhas por consulta
+            data_inicio: Data de publicação mínima (YYYY-MM-DD, opcional)
+            data_fim: Data de publicação máxima (YYYY-MM-DD, opcional)
+            tribunal: Sigla do tribunal (opcional)
+            
+        Yields:
+            Dict: Uma intimação por vez
+        """
+        if 'id' not in [c.strip() for c in colunas.split(',')]:
+            colunas = f"id, {colunas}"
+        
+        ultimo_id = None
+        while True:
+            query = self.client.table(TABELA_INTIMACOES).select(colunas).order("id").limit(tamanho_pagina)
+            if data_inicio:
+                query = query.gte("data_publicacao", data_inicio)
+            if data_fim:
+                query = query.lte("data_publicacao", data_fim)
+            if tribunal:
+                query = query.eq("tribunal", tribunal)
+            if ultimo_id is not None:
+                query = query.gt("id", ultimo_id)
+            
+            pagina = self._executar("iterar_intimacoes", query).data or []
+            yield from pagina
+            
+            if len(pagina) < tamanho_pagina:
+                return
+            ultimo_id = pagina[-1]["id"]
+    
+    def buscar_texto(self, consulta: str, limite: int = 20, deslocamento: int = 0,
+                     data_inicio: str = None, data_fim: str = None) -> List[Dict]:
+        """
+        Busca textual ranqueada (função buscar_intimacoes_texto, índice GIN em busca_tsv)
+        
+        Args:
+            consulta: Termos no formato websearch ("aspas", OR, -exclusão)
+            limite: Número máximo de resultados
+            deslocamento: Resultados a pular (paginação)
+            data_inicio: Data de publicação mínima (YYYY-MM-DD)
+            data_fim: Data de publicação máxima (YYYY-MM-DD)
+            
+        Returns:
+            List[Dict]: Resultados com relevancia e trecho destacado (<mark>)
+        """
+        try:
+            result = self._executar("buscar_texto", self.client.rpc("buscar_intimacoes_texto", {
+                "consulta": consulta,
+                "limite": limite,
+                "deslocamento": deslocamento,
+                "data_inicio": data_inicio,
+                "data_fim": data_fim
+            }))
+            return result.data or []
+            
+        except Exception as e:
+            self.logger.error(f"❌ Erro na busca textual: {e}")
+            return []
+    
     def obter_estatisticas_tribunal(self) -> List[Dict]:
         """
         Obtém estatísticas agrupadas por tribunal
@@ -94,7 +485,7 @@ class SupabaseClient:
         """
         try:
             # Buscar todos os tribunais
-            result = self.client.table(TABELA_INTIMACOES).select("tribunal").execute()
+            result = self._executar("estatisticas_tribunal", self.client.table(TABELA_INTIMACOES).select("tribunal"))
             
             # Contar por tribunal
             tribunais = {}
@@ -123,11 +514,11 @@ class SupabaseClient:
         """
         try:
             # Total de intimações
-            result_total = self.client.table(TABELA_INTIMACOES).select("id").execute()
+            result_total = self._executar("estatisticas_total", self.client.table(TABELA_INTIMACOES).select("id"))
             total_intimacoes = len(result_total.data)
             
             # Tribunais únicos
-            result_tribunais = self.client.table(TABELA_INTIMACOES).select("tribunal").execute()
+            result_tribunais = self._executar("estatisticas_tribunais", self.client.table(TABELA_INTIMACOES).select("tribunal"))
             tribunais_unicos = len(set(row.get('tribunal', 'N/A') for row in result_tribunais.data))
             
             return {
@@ -153,13 +544,14 @@ class SupabaseClient:
             List[Dict]: Lista de logs
         """
         try:
-            result = self.client.table(TABELA_LOGS).select("*").order("data_extracao", desc=True).limit(limite).execute()
+            result = self._executar("obter_logs", self.client.table(TABELA_LOGS).select("*").order("data_extracao", desc=True).limit(limite))
             return result.data
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao obter logs de execução: {e}")
             return []
     
+    @cronometrar('deduplicacao')
     def verificar_duplicata(self, id_intimacao: str, hash_conteudo: Optional[str] = None) -> Tuple[bool, Optional[Dict]]:
         """
         Verifica se uma intimação já existe na base
@@ -172,16 +564,15 @@ class SupabaseClient:
             Tuple[bool, Optional[Dict]]: (existe, dados_existentes)
         """
         try:
-            query = self.client.table(TABELA_INTIMACOES).select("*")
-            
-            # Buscar por ID
-            query = query.eq("id_intimacao", id_intimacao)
+            query = self.client.table(TABELA_INTIMACOES).select(COLUNAS_INTIMACAO)
             
-            # Se tiver hash, buscar também por hash
+            # Buscar por ID ou, se tiver hash, também por hash
             if hash_conteudo:
-                query = query.or_(f"hash_conteudo.eq.{hash_conteudo}")
+                query = query.or_(f"id_intimacao.eq.{id_intimacao},hash_conteudo.eq.{hash_conteudo}")
+            else:
+                query = query.eq("id_intimacao", id_intimacao)
             
-            result = query.limit(1).execute()
+            result = self._executar("verificar_duplicata", query.limit(1))
             
             if result.data:
                 self.logger.info(f"Duplicata encontrada para intimação {id_intimacao}")
@@ -193,6 +584,7 @@ class SupabaseClient:
             self.logger.error(f"Erro ao verificar duplicata: {e}")
             return False, None
     
+    @cronometrar('insercao')
     def inserir_intimacao(self, intimacao: Dict) -> Tuple[bool, Optional[Dict]]:
         """
         Insere uma nova intimação na base
@@ -205,23 +597,10 @@ class SupabaseClient:
         """
         try:
             # Preparar dados para inserção
-            dados_insercao = {
-                "id_intimacao": intimacao["id_intimacao"],
-                "numero_processo": intimacao.get("numero_processo"),
-                "tribunal": intimacao.get("tribunal"),
-                "orgao_julgador": intimacao.get("orgao_julgador"),
-                "data_publicacao": intimacao.get("data_publicacao"),
-                "tipo_comunicacao": intimacao.get("tipo_comunicacao"),
-                "conteudo_texto": intimacao["conteudo_texto"],
-                "conteudo_original": json.dumps(intimacao.get("conteudo_original", {}), ensure_ascii=False),
-                "hash_conteudo": intimacao.get("hash_conteudo"),
-                "metadados": json.dumps(intimacao.get("metadados", {}), ensure_ascii=False),
-                "status_processamento": intimacao.get("status_processamento", "extraido"),
-                "data_extracao": datetime.now().isoformat()
-            }
+            dados_insercao = preparar_dados_intimacao(intimacao)
             
             # Inserir na base
-            result = self.client.table(TABELA_INTIMACOES).insert(dados_insercao).execute()
+            result = self._executar("inserir_intimacao", self.client.table(TABELA_INTIMACOES).insert(dados_insercao))
             
             if result.data:
                 self.logger.info(f"✅ Intimação {intimacao['id_intimacao']} inserida com sucesso")
@@ -234,6 +613,30 @@ class SupabaseClient:
             self.logger.error(f"Erro ao inserir intimação: {e}")
             return False, None
     
+    def atualizar_campos_derivados(self, linhas: List[Dict]) -> Optional[int]:
+        """
+        Regrava em lote os campos derivados reprocessados (função djen_atualizar_derivados)
+        O banco só reescreve as linhas em que algum valor de fato difere.
+        
+        Args:
+            linhas: id_intimacao, numero_processo, conteudo_texto e metadados de cada intimação
+            
+        Returns:
+            Optional[int]: Linhas atualizadas, ou None em caso de erro
+        """
+        if not linhas:
+            return 0
+        
+        try:
+            result = self._executar(
+                "atualizar_campos_derivados",
+                self.client.rpc("djen_atualizar_derivados", {"p_linhas": linhas})
+            )
+            return int(result.data or 0)
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao atualizar {len(linhas)} intimações reprocessadas: {e}")
+            return None
+    
     def processar_intimacoes(self, intimacoes: List[Dict]) -> Dict:
         """
         Processa uma lista de intimações, verificando duplicatas e inserindo novas
@@ -249,10 +652,16 @@ class SupabaseClient:
             "novas_inseridas": 0,
             "duplicatas_encontradas": 0,
             "erros": 0,
-            "detalhes_erros": []
+            "alteracoes_registradas": 0,
+            "detalhes_erros": [],
+            "ids_erros": [],
+            "ids_inseridas": [],
+            "ids_alteradas": []
         }
         
         self.logger.info(f"Processando {len(intimacoes)} intimações")
+        inseridas = []
+        existentes = []
         
         for intimacao in intimacoes:
             try:
@@ -265,28 +674,752 @@ class SupabaseClient:
                 if existe:
                     estatisticas["duplicatas_encontradas"] += 1
                     self.logger.info(f"Duplicata: {id_intimacao}")
+                    if dados_existentes.get("id_intimacao") == id_intimacao:
+                        existentes.append(intimacao)
                 else:
                     # Inserir nova intimação
                     sucesso, dados_inseridos = self.inserir_intimacao(intimacao)
                     
                     if sucesso:
                         estatisticas["novas_inseridas"] += 1
+                        estatisticas["ids_inseridas"].append(id_intimacao)
+                        inseridas.append(intimacao)
                     else:
                         estatisticas["erros"] += 1
                         estatisticas["detalhes_erros"].append(f"Erro ao inserir {id_intimacao}")
+                        estatisticas["ids_erros"].append(id_intimacao)
                 
             except Exception as e:
                 estatisticas["erros"] += 1
                 erro_msg = f"Erro ao processar intimação: {e}"
                 estatisticas["detalhes_erros"].append(erro_msg)
+                estatisticas["ids_erros"].append(intimacao.get("id_intimacao"))
                 self.logger.error(erro_msg)
         
+        if COMPRIMIR_PAYLOADS and inseridas and not self.gravar_payloads(inseridas):
+            estatisticas["detalhes_erros"].append(f"Erro ao gravar payloads de {len(inseridas)} intimações")
+        
+        if DETECTAR_ALTERACOES and existentes:
+            estatisticas["ids_alteradas"] = self.registrar_alteracoes(existentes)
+            estatisticas["alteracoes_registradas"] = len(estatisticas["ids_alteradas"])
+        
         self.logger.info(f"Processamento concluído: {estatisticas['novas_inseridas']} inseridas, "
                         f"{estatisticas['duplicatas_encontradas']} duplicatas, "
+                        f"{estatisticas['alteracoes_registradas']} alteradas, "
                         f"{estatisticas['erros']} erros")
         
         return estatisticas
     
+    def obter_impressoes(self, ids_intimacao: List[str], tamanho_lote: int = 200) -> Dict[str, Optional[str]]:
+        """
+        Impressões digitais armazenadas (consulta só as colunas de controle)
+        
+        Args:
+            ids_intimacao: IDs das intimações
+            tamanho_lote: IDs por consulta
+            
+        Returns:
+            Dict[str, Optional[str]]: impressao_digital por id_intimacao (apenas as existentes)
+        """
+        impressoes = {}
+        for inicio in range(0, len(ids_intimacao), tamanho_lote):
+            result = self._executar(
+                "obter_impressoes",
+                self.client.table(TABELA_INTIMACOES).select("id_intimacao, impressao_digital")
+                .in_("id_intimacao", ids_intimacao[inicio:inicio + tamanho_lote])
+            )
+            impressoes.update({row["id_intimacao"]: row["impressao_digital"] for row in result.data})
+        return impressoes
+    
+    @cronometrar('alteracoes')
+    def registrar_alteracoes(self, intimacoes: List[Dict]) -> List[str]:
+        """
+        Grava como nova versão as intimações existentes cujos campos mutáveis mudaram
+        A versão anterior vai para TABELA_VERSOES (função djen_registrar_alteracoes);
+        as que não mudaram não são reescritas.
+        
+        Args:
+            intimacoes: Intimações processadas que já existem na base
+            
+        Returns:
+            List[str]: id_intimacao das que ganharam nova versão
+        """
+        try:
+            impressoes = self.obter_impressoes([i["id_intimacao"] for i in intimacoes])
+            alteradas = selecionar_alteradas(intimacoes, impressoes)
+            if not alteradas:
+                return []
+            
+            result = self._executar("registrar_alteracoes", self.client.rpc("djen_registrar_alteracoes", {
+                "p_linhas": [preparar_alteracao(intimacao) for intimacao in alteradas]
+            }))
+            versionadas = [row["alterada"] for row in result.data or []]
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao registrar alterações: {e}")
+            return []
+        
+        if versionadas:
+            self.logger.info(f"✏️ {len(versionadas)} intimações alteradas na origem (nova versão gravada)")
+            if COMPRIMIR_PAYLOADS:
+                ids = set(versionadas)
+                self.gravar_payloads([i for i in alteradas if i["id_intimacao"] in ids], substituir=True)
+        return versionadas
+    
+    def listar_versoes(self, id_intimacao: str) -> List[Dict]:
+        """
+        Histórico de versões de uma intimação (a vigente fica na tabela principal)
+        
+        Args:
+            id_intimacao: ID da intimação
+            
+        Returns:
+            List[Dict]: Versões anteriores, mais recente primeiro
+        """
+        result = self._executar(
+            "listar_versoes",
+            self.client.table(TABELA_VERSOES)
+            .select("versao, impressao_digital, tipo_comunicacao, conteudo_texto, metadados, vigente_desde, substituida_em")
+            .eq("id_intimacao", id_intimacao)
+            .order("versao", desc=True)
+        )
+        return result.data
+    
+    @cronometrar('payloads')
+    def gravar_payloads(self, intimacoes: List[Dict], substituir: bool = False) -> bool:
+        """
+        Grava os itens brutos comprimidos na tabela fria
+        
+        Args:
+            intimacoes: Intimações processadas recém-inseridas (ou alteradas)
+            substituir: Se True, sobrescreve os já gravados (senão os ignora)
+            
+        Returns:
+            bool: True se gravado com sucesso
+        """
+        try:
+            linhas = [preparar_payload_intimacao(intimacao) for intimacao in intimacoes]
+            self._executar(
+                "gravar_payloads",
+                self.client.table(TABELA_PAYLOADS).upsert(linhas, on_conflict="id_intimacao", ignore_duplicates=not substituir)
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao gravar payloads: {e}")
+            return False
+    
+    def obter_advogados(self) -> List[Dict]:
+        """
+        Cadastro de advogados acompanhados (ADVOGADOS_FONTE=tabela)
+        
+        Returns:
+            List[Dict]: Advogados ativos com seus registros OAB
+        """
+        result = self._executar(
+            "obter_advogados",
+            self.client.table(TABELA_ADVOGADOS).select("id, nome, registros_oab, ativo").eq("ativo", True).order("id")
+        )
+        return result.data
+    
+    def cadastrar_advogados(self, advogados: List[Dict]) -> bool:
+        """
+        Garante na tabela de advogados os advogados carregados de outra fonte
+        (ADVOGADOS_FONTE=config/arquivo), referenciados pelos vínculos; os já
+        cadastrados não são alterados
+        
+        Args:
+            advogados: Linhas {'id', 'nome', 'registros_oab', 'ativo'}
+            
+        Returns:
+            bool: True se gravado com sucesso
+        """
+        if not advogados:
+            return True
+        
+        try:
+            self._executar(
+                "cadastrar_advogados",
+                self.client.table(TABELA_ADVOGADOS).upsert(advogados, on_conflict="id", ignore_duplicates=True)
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao cadastrar advogados: {e}")
+            return False
+    
+    def vincular_advogados(self, vinculos: List[Dict]) -> bool:
+        """
+        Vincula intimações aos advogados cujas consultas as retornaram
+        
+        Args:
+            vinculos: Linhas {'advogado_id', 'id_intimacao', 'data_publicacao'}
+            
+        Returns:
+            bool: True se gravado com sucesso
+        """
+        if not vinculos:
+            return True
+        
+        try:
+            self._executar(
+                "vincular_advogados",
+                self.client.table(TABELA_INTIMACOES_ADVOGADOS).upsert(
+                    vinculos, on_conflict="advogado_id,id_intimacao", ignore_duplicates=True
+                )
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao vincular intimações aos advogados: {e}")
+            return False
+    
+    def buscar_por_advogado(self, advogado_id: str, limite: int = 50, deslocamento: int = 0) -> List[Dict]:
+        """
+        Intimações de um advogado do cadastro (índice advogado_id, data_publicacao
+        na tabela de vínculos; a intimação vem embutida na mesma requisição)
+        
+        Args:
+            advogado_id: Identificador do advogado
+            limite: Número máximo de intimações
+            deslocamento: Quantas intimações pular (paginação)
+            
+        Returns:
+            List[Dict]: Intimações, publicações mais recentes primeiro
+        """
+        try:
+            result = self._executar(
+                "buscar_por_advogado",
+                self.client.table(TABELA_INTIMACOES_ADVOGADOS)
+                .select(f"intimacao:{TABELA_INTIMACOES}({COLUNAS_INTIMACAO})")
+                .eq("advogado_id", advogado_id)
+                .order("data_publicacao", desc=True, nullsfirst=False)
+                .range(deslocamento, deslocamento + limite - 1)
+            )
+            return [linha["intimacao"] for linha in result.data if linha.get("intimacao")]
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar intimações do advogado {advogado_id}: {e}")
+            return []
+    
+    def listar_agendamentos(self) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: Agendamentos do agendador (ativos e inativos)
+        """
+        try:
+            result = self._executar(
+                "listar_agendamentos", self.client.table(TABELA_AGENDAMENTOS).select("*").order("nome")
+            )
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao listar agendamentos: {e}")
+            return []
+    
+    def registrar_agendamentos(self, agendamentos: List[Dict]) -> bool:
+        """
+        Cria os agendamentos ausentes (os existentes não são alterados)
+        
+        Args:
+            agendamentos: Linhas {'nome', 'tipo', 'cron', 'parametros', ...}
+            
+        Returns:
+            bool: True se gravado com sucesso
+        """
+        try:
+            self._executar(
+                "registrar_agendamentos",
+                self.client.table(TABELA_AGENDAMENTOS).upsert(agendamentos, on_conflict="nome", ignore_duplicates=True)
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao registrar agendamentos: {e}")
+            return False
+    
+    def atualizar_agendamento(self, nome: str, dados: Dict, somente_sem_proxima: bool = False) -> bool:
+        """
+        Args:
+            nome: Nome do agendamento
+            dados: Colunas a atualizar
+            somente_sem_proxima: Só atualiza se proxima_execucao ainda estiver vazia
+            
+        Returns:
+            bool: True se atualizado com sucesso
+        """
+        try:
+            query = self.client.table(TABELA_AGENDAMENTOS).update(dados).eq("nome", nome)
+            if somente_sem_proxima:
+                query = query.is_("proxima_execucao", "null")
+            self._executar("atualizar_agendamento", query)
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao atualizar agendamento {nome}: {e}")
+            return False
+    
+    def adquirir_agendamento(self, nome: str, dono: str, lease_segundos: int) -> Optional[Dict]:
+        """
+        Toma o lease de um agendamento vencido (função djen_adquirir_agendamento,
+        atômica no banco: só uma instância consegue)
+        
+        Args:
+            nome: Nome do agendamento
+            dono: Identificação da instância
+            lease_segundos: Validade do lease
+            
+        Returns:
+            Optional[Dict]: Agendamento travado, ou None se não estiver vencido ou já estiver travado
+        """
+        try:
+            result = self._executar("adquirir_agendamento", self.client.rpc("djen_adquirir_agendamento", {
+                "p_nome": nome,
+                "p_dono": dono,
+                "p_lease_segundos": lease_segundos
+            }))
+            return result.data[0] if result.data else None
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao adquirir agendamento {nome}: {e}")
+            return None
+    
+    def liberar_agendamento(self, nome: str, dono: str, dados: Dict) -> bool:
+        """
+        Libera o lease gravando o resultado e a próxima execução
+        
+        Args:
+            nome: Nome do agendamento
+            dono: Identificação da instância que detém o lease
+            dados: Colunas a atualizar (proxima_execucao, ultima_execucao, ultimo_status)
+            
+        Returns:
+            bool: True se atualizado com sucesso
+        """
+        try:
+            self._executar(
+                "liberar_agendamento",
+                self.client.table(TABELA_AGENDAMENTOS)
+                .update({**dados, "bloqueado_por": None, "bloqueado_ate": None})
+                .eq("nome", nome).eq("bloqueado_por", dono)
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao liberar agendamento {nome}: {e}")
+            return False
+    
+    def sincronizar_destinos_webhooks(self, urls: List[str]) -> bool:
+        """
+        Espelha WEBHOOK_URLS na tabela de destinos lida pelo trigger de enfileiramento
+        (as URLs que saíram da configuração ficam inativas)
+        
+        Args:
+            urls: Destinos configurados
+            
+        Returns:
+            bool: True se sincronizado com sucesso
+        """
+        try:
+            agora = datetime.now().astimezone().isoformat()
+            if urls:
+                self._executar(
+                    "sincronizar_destinos_webhooks",
+                    self.client.table(TABELA_WEBHOOKS_DESTINOS).upsert(
+                        [{"destino": url, "ativo": True, "atualizado_em": agora} for url in urls],
+                        on_conflict="destino"
+                    )
+                )
+            query = self.client.table(TABELA_WEBHOOKS_DESTINOS).update({"ativo": False, "atualizado_em": agora}).eq("ativo", True)
+            if urls:
+                query = query.not_.in_("destino", urls)
+            self._executar("sincronizar_destinos_webhooks", query)
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao sincronizar destinos dos webhooks: {e}")
+            return False
+    
+    def reservar_webhooks(self, limite: int, lease_segundos: int) -> List[Dict]:
+        """
+        Reserva as entregas pendentes vencidas (função djen_reservar_webhooks, SKIP LOCKED)
+        
+        Args:
+            limite: Máximo de entregas
+            lease_segundos: Tempo até a reserva expirar se o envio não for concluído
+            
+        Returns:
+            List[Dict]: Entregas reservadas por esta instância
+        """
+        try:
+            result = self._executar(
+                "reservar_webhooks",
+                self.client.rpc("djen_reservar_webhooks", {"p_limite": limite, "p_lease_segundos": lease_segundos})
+            )
+            return result.data or []
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao reservar webhooks: {e}")
+            return []
+    
+    def concluir_webhooks(self, ids: List[int]) -> bool:
+        """
+        Marca entregas como enviadas
+        
+        Args:
+            ids: IDs das linhas da fila
+            
+        Returns:
+            bool: True se atualizado com sucesso
+        """
+        try:
+            self._executar(
+                "concluir_webhooks",
+                self.client.table(TABELA_WEBHOOKS)
+                .update({"status": "enviado", "enviado_em": datetime.now().astimezone().isoformat(),
+                         "bloqueado_ate": None, "ultimo_erro": None})
+                .in_("id", ids)
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao concluir {len(ids)} webhooks: {e}")
+            return False
+    
+    def reagendar_webhooks(self, ids: List[int], erro: str, backoff_segundos: int, max_tentativas: int) -> bool:
+        """
+        Devolve entregas que falharam à fila com backoff exponencial (djen_reagendar_webhooks)
+        
+        Args:
+            ids: IDs das linhas da fila
+            erro: Motivo da falha
+            backoff_segundos: Atraso base da próxima tentativa
+            max_tentativas: Tentativas até a entrega ficar como 'falhou'
+            
+        Returns:
+            bool: True se atualizado com sucesso
+        """
+        try:
+            self._executar(
+                "reagendar_webhooks",
+                self.client.rpc("djen_reagendar_webhooks", {
+                    "p_ids": ids, "p_erro": erro[:1000],
+                    "p_backoff_segundos": backoff_segundos, "p_max_tentativas": max_tentativas
+                })
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao reagendar {len(ids)} webhooks: {e}")
+            return False
+    
+    def resumo_webhooks(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Entregas por status (pendente, enviado, falhou)
+        """
+        resumo = {}
+        for status in ("pendente", "enviado", "falhou"):
+            try:
+                result = self._executar(
+                    "resumo_webhooks",
+                    self.client.table(TABELA_WEBHOOKS).select("id", count="exact").eq("status", status).limit(1)
+                )
+                resumo[status] = result.count or 0
+            except Exception as e:
+                self.logger.error(f"❌ Erro ao contar webhooks '{status}': {e}")
+        return resumo
+    
+    def criar_particoes_logs(self, meses_a_frente: int) -> Optional[int]:
+        """
+        Cria as partições mensais dos logs até meses_a_frente meses adiante
+        (djen_criar_particoes_mensais)
+        
+        Args:
+            meses_a_frente: Meses futuros com partição pronta
+            
+        Returns:
+            Optional[int]: Partições criadas (None em caso de erro)
+        """
+        try:
+            result = self._executar(
+                "criar_particoes",
+                self.client.rpc("djen_criar_particoes_mensais", {
+                    "p_tabela": TABELA_LOGS, "p_coluna": "data_extracao",
+                    "p_inicio": datetime.now().date().isoformat(), "p_meses_a_frente": meses_a_frente
+                })
+            )
+            return result.data or 0
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao criar partições dos logs: {e}")
+            return None
+    
+    def obter_inicio_logs(self) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: data_extracao do log mais antigo (None se não houver logs)
+        """
+        try:
+            result = self._executar(
+                "obter_inicio_logs",
+                self.client.table(TABELA_LOGS).select("data_extracao").order("data_extracao").limit(1)
+            )
+            return result.data[0]["data_extracao"] if result.data else None
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao obter o log mais antigo: {e}")
+            return None
+    
+    def iterar_logs(self, data_inicio: str, data_fim: str, tamanho_pagina: int = 1000):
+        """
+        Percorre os logs de um período por keyset em `id` (arquivamento)
+        
+        Args:
+            data_inicio: data_extracao mínima (inclusive)
+            data_fim: data_extracao máxima (exclusive)
+            tamanho_pagina: Linhas por consulta
+            
+        Yields:
+            Dict: Um log por vez
+        """
+        ultimo_id = None
+        while True:
+            query = (self.client.table(TABELA_LOGS).select("*")
+                     .gte("data_extracao", data_inicio).lt("data_extracao", data_fim)
+                     .order("id").limit(tamanho_pagina))
+            if ultimo_id is not None:
+                query = query.gt("id", ultimo_id)
+            
+            pagina = self._executar("iterar_logs", query).data or []
+            yield from pagina
+            
+            if len(pagina) < tamanho_pagina:
+                return
+            ultimo_id = pagina[-1]["id"]
+    
+    def descartar_mes_logs(self, mes: str) -> Optional[int]:
+        """
+        Remove os logs de um mês já arquivado (djen_descartar_mes: DROP da partição)
+        
+        Args:
+            mes: Qualquer dia do mês (YYYY-MM-DD)
+            
+        Returns:
+            Optional[int]: Logs removidos (None em caso de erro)
+        """
+        try:
+            result = self._executar(
+                "descartar_mes_logs",
+                self.client.rpc("djen_descartar_mes", {
+                    "p_tabela": TABELA_LOGS, "p_coluna": "data_extracao", "p_mes": mes
+                })
+            )
+            return result.data or 0
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao descartar os logs de {mes[:7]}: {e}")
+            return None
+    
+    def iterar_payloads_a_arquivar(self, data_corte: str, tamanho_pagina: int = 500):
+        """
+        Intimações publicadas antes de data_corte ainda não arquivadas, por keyset em `id`
+        
+        Args:
+            data_corte: Data de publicação limite (exclusive, YYYY-MM-DD)
+            tamanho_pagina: Linhas por consulta
+            
+        Yields:
+            Dict: id, id_intimacao, data_publicacao e conteudo_original
+        """
+        ultimo_id = None
+        while True:
+            query = (self.client.table(TABELA_INTIMACOES)
+                     .select("id, id_intimacao, data_publicacao, conteudo_original")
+                     .lt("data_publicacao", data_corte).is_("arquivado_em", "null")
+                     .order("id").limit(tamanho_pagina))
+            if ultimo_id is not None:
+                query = query.gt("id", ultimo_id)
+            
+            pagina = self._executar("iterar_a_arquivar", query).data or []
+            yield from pagina
+            
+            if len(pagina) < tamanho_pagina:
+                return
+            ultimo_id = pagina[-1]["id"]
+    
+    def arquivar_payloads(self, ids_intimacao: List[str]) -> Optional[int]:
+        """
+        Remove da base o item bruto das intimações já gravadas no arquivo local
+        (djen_arquivar_payloads: tabela fria e 'texto' do conteudo_original)
+        
+        Args:
+            ids_intimacao: IDs das intimações arquivadas
+            
+        Returns:
+            Optional[int]: Intimações marcadas como arquivadas (None em caso de erro)
+        """
+        try:
+            result = self._executar(
+                "arquivar_payloads",
+                self.client.rpc("djen_arquivar_payloads", {"p_ids": ids_intimacao})
+            )
+            return result.data or 0
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao arquivar {len(ids_intimacao)} payloads: {e}")
+            return None
+    
+    def obter_feriados(self) -> List[Dict]:
+        """
+        Feriados cadastrados (locais e de tribunal) para o calendário forense
+        
+        Returns:
+            List[Dict]: Linhas com data, tribunal e descricao
+        """
+        try:
+            result = self._executar(
+                "obter_feriados",
+                self.client.table(TABELA_FERIADOS).select("data, tribunal, descricao").order("data")
+            )
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar feriados: {e}")
+            return []
+    
+    def gravar_prazos(self, prazos: List[Dict], substituir: bool = False) -> bool:
+        """
+        Grava os vencimentos calculados (um por intimação e prazo)
+        
+        Args:
+            prazos: Linhas geradas por prazos.gerar_prazos
+            substituir: Sobrescreve os já gravados (recálculo) em vez de ignorá-los
+            
+        Returns:
+            bool: True se gravado com sucesso
+        """
+        if not prazos:
+            return True
+        
+        try:
+            self._executar(
+                "gravar_prazos",
+                self.client.table(TABELA_PRAZOS).upsert(
+                    prazos, on_conflict="id_intimacao,dias_prazo", ignore_duplicates=not substituir
+                )
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao gravar prazos: {e}")
+            return False
+    
+    def substituir_prazos(self, ids_intimacao: List[str], prazos: List[Dict]) -> bool:
+        """
+        Troca todos os prazos das intimações pelos recalculados (função djen_substituir_prazos):
+        os prazos que sumiram do texto de uma nova versão são removidos
+        
+        Args:
+            ids_intimacao: Intimações recalculadas (mesmo as que ficaram sem prazo)
+            prazos: Linhas geradas por prazos.gerar_prazos
+            
+        Returns:
+            bool: True se gravado com sucesso
+        """
+        if not ids_intimacao:
+            return True
+        
+        try:
+            self._executar(
+                "substituir_prazos",
+                self.client.rpc("djen_substituir_prazos", {"p_ids": ids_intimacao, "p_linhas": prazos})
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao substituir prazos de {len(ids_intimacao)} intimações: {e}")
+            return False
+    
+    def listar_prazos(self, data_inicio: str, data_fim: str, tribunal: Optional[str] = None,
+                      limite: int = 200) -> List[Dict]:
+        """
+        Prazos que vencem num intervalo (índice em data_vencimento)
+        
+        Args:
+            data_inicio: Vencimento mínimo (YYYY-MM-DD)
+            data_fim: Vencimento máximo (YYYY-MM-DD)
+            tribunal: Sigla do tribunal (opcional)
+            limite: Número máximo de prazos
+            
+        Returns:
+            List[Dict]: Prazos, vencimento mais próximo primeiro
+        """
+        try:
+            query = (
+                self.client.table(TABELA_PRAZOS).select("*")
+                .gte("data_vencimento", data_inicio).lte("data_vencimento", data_fim)
+            )
+            if tribunal:
+                query = query.eq("tribunal", tribunal.upper())
+            result = self._executar("listar_prazos", query.order("data_vencimento").limit(limite))
+            return result.data
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao listar prazos: {e}")
+            return []
+    
+    def buscar_intimacao(self, id_intimacao: str) -> Optional[Dict]:
+        """
+        Busca uma intimação pelo ID da API
+        
+        Args:
+            id_intimacao: ID da intimação
+            
+        Returns:
+            Optional[Dict]: Intimação ou None se não existir
+        """
+        try:
+            result = self._executar(
+                "buscar_intimacao",
+                self.client.table(TABELA_INTIMACOES).select(COLUNAS_INTIMACAO).eq("id_intimacao", id_intimacao).limit(1)
+            )
+            return result.data[0] if result.data else None
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar intimação {id_intimacao}: {e}")
+            return None
+    
+    def obter_payloads(self, ids_intimacao: List[str], tamanho_lote: int = 200,
+                       falhar: bool = False) -> Dict[str, Dict]:
+        """
+        Itens brutos completos da tabela fria, em lote (reprocessamento, arquivamento)
+        
+        Args:
+            ids_intimacao: IDs das intimações
+            tamanho_lote: IDs por consulta
+            falhar: Se True, propaga o erro de leitura em vez de omitir o lote
+            
+        Returns:
+            Dict[str, Dict]: Item bruto por id_intimacao (apenas os encontrados)
+        """
+        payloads = {}
+        for inicio in range(0, len(ids_intimacao), tamanho_lote):
+            try:
+                result = self._executar(
+                    "obter_payloads",
+                    self.client.table(TABELA_PAYLOADS).select("id_intimacao, payload")
+                    .in_("id_intimacao", ids_intimacao[inicio:inicio + tamanho_lote])
+                )
+                payloads.update({row["id_intimacao"]: descomprimir_payload(row["payload"]) for row in result.data})
+            except Exception as e:
+                if falhar:
+                    raise
+                self.logger.warning(f"⚠️ Payloads indisponíveis na tabela fria: {e}")
+        return payloads
+    
+    def obter_conteudo_original(self, id_intimacao: str, intimacao: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Carrega sob demanda o item bruto completo da API (com 'texto')
+        Linhas gravadas antes da compressão têm o item completo em conteudo_original.
+        
+        Args:
+            id_intimacao: ID da intimação
+            intimacao: Linha já carregada (evita nova consulta no fallback)
+            
+        Returns:
+            Optional[Dict]: Item bruto da API ou None
+        """
+        try:
+            result = self._executar(
+                "obter_payload",
+                self.client.table(TABELA_PAYLOADS).select("payload").eq("id_intimacao", id_intimacao).limit(1)
+            )
+            if result.data:
+                return descomprimir_payload(result.data[0]["payload"])
+        except Exception as e:
+            self.logger.warning(f"⚠️ Payload de {id_intimacao} indisponível na tabela fria: {e}")
+        
+        intimacao = intimacao or self.buscar_intimacao(id_intimacao)
+        return descomprimir_payload(intimacao.get("conteudo_original")) if intimacao else None
+    
     def registrar_log_execucao(self, log_dados: Dict) -> bool:
         """
         Registra um log de execução
@@ -299,19 +1432,9 @@ class SupabaseClient:
         """
         try:
             # Preparar dados do log
-            dados_log = {
-                "total_encontradas": log_dados.get("total_encontradas", 0),
-                "total_novas": log_dados.get("total_novas", 0),
-                "total_duplicadas": log_dados.get("total_duplicadas", 0),
-                "status_execucao": log_dados.get("status_execucao", "sucesso"),
-                "erro_detalhes": log_dados.get("erro_detalhes"),
-                "tempo_execucao_segundos": log_dados.get("tempo_execucao_segundos", 0),
-                "parametros_busca": json.dumps(log_dados.get("parametros_busca", {}), ensure_ascii=False),
-                "response_api": json.dumps(log_dados.get("response_api", {}), ensure_ascii=False),
-                "data_extracao": datetime.now().isoformat()
-            }
+            dados_log = preparar_dados_log(log_dados)
             
-            result = self.client.table(TABELA_LOGS).insert(dados_log).execute()
+            result = self._executar("registrar_log", self.client.table(TABELA_LOGS).insert(dados_log))
             
             if result.data:
                 self.logger.info("✅ Log de execução registrado")
@@ -333,17 +1456,19 @@ class SupabaseClient:
         """
         try:
             # Total de intimações
-            total_intimacoes = self.client.table(TABELA_INTIMACOES).select("id", count="exact").execute()
+            total_intimacoes = self._executar("estatisticas_base_total", self.client.table(TABELA_INTIMACOES).select("id", count="exact"))
             
             # Total por tribunal
-            tribunais = self.client.table(TABELA_INTIMACOES).select("tribunal").execute()
+            tribunais = self._executar("estatisticas_base_tribunais", self.client.table(TABELA_INTIMACOES).select("tribunal"))
             
             # Últimas execuções
-            ultimas_execucoes = self.client.table(TABELA_LOGS)\
-                .select("*")\
-                .order("data_extracao", desc=True)\
-                .limit(5)\
-                .execute()
+            ultimas_execucoes = self._executar(
+                "estatisticas_base_logs",
+                self.client.table(TABELA_LOGS)
+                .select("*")
+                .order("data_extracao", desc=True)
+                .limit(5)
+            )
             
             # Contar por tribunal
             tribunais_count = {}
@@ -378,8 +1503,8 @@ class SupabaseClient:
                 return False
             
             # Limpar tabelas
-            self.client.table(TABELA_INTIMACOES).delete().neq("id", "").execute()
-            self.client.table(TABELA_LOGS).delete().neq("id", "").execute()
+            self._executar("limpar_intimacoes", self.client.table(TABELA_INTIMACOES).delete().neq("id", ""))
+            self._executar("limpar_logs", self.client.table(TABELA_LOGS).delete().neq("id", ""))
             
             self.logger.warning("⚠️ Dados de teste removidos")
             return True
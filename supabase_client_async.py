@@ -0,0 +1,287 @@
+"""
+Cliente Supabase assíncrono para gravação em lote das intimações
+"""
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, TABELA_INTIMACOES, TABELA_LOGS, TABELA_PAYLOADS,
+    COMPRIMIR_PAYLOADS, DETECTAR_ALTERACOES, ASYNC_MAX_ESCRITAS_SUPABASE, ASYNC_TAMANHO_LOTE
+)
+from supabase_client import (
+    preparar_dados_intimacao, preparar_dados_log, preparar_payload_intimacao,
+    preparar_alteracao, selecionar_alteradas
+)
+from instrumentacao import cronometrar
+from metricas import SUPABASE_OPERACOES, SUPABASE_LATENCIA
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+class AsyncSupabaseClient:
+    """
+    Cliente Supabase assíncrono
+
+    A deduplicação é feita com consultas `in` por lote (em vez de uma consulta
+    por intimação) e as inserções são enviadas em lotes concorrentes, limitados
+    por um semáforo.
+    """
+
+    def __init__(self, max_concorrencia: int = ASYNC_MAX_ESCRITAS_SUPABASE,
+                 tamanho_lote: int = ASYNC_TAMANHO_LOTE):
+        self.client: Optional["AsyncClient"] = None
+        self.semaforo = asyncio.Semaphore(max_concorrencia)
+        self.tamanho_lote = tamanho_lote
+        self.logger = logging.getLogger(__name__)
+
+    async def conectar(self):
+        """
+        Cria o cliente assíncrono (deve ser chamado dentro do event loop)
+        """
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise ValueError("Configurações do Supabase não encontradas")
+        from supabase import acreate_client
+        self.client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+
+    async def fechar(self):
+        """
+        Encerra as conexões HTTP do cliente
+        """
+        if self.client:
+            await self.client.postgrest.aclose()
+            self.client = None
+
+    async def _executar(self, operacao: str, query):
+        """
+        Executa uma query do PostgREST registrando latência e resultado
+        """
+        inicio = time.perf_counter()
+        try:
+            result = await query.execute()
+        except Exception:
+            SUPABASE_OPERACOES.inc(operacao=operacao, resultado='erro')
+            raise
+        finally:
+            SUPABASE_LATENCIA.observar(time.perf_counter() - inicio, operacao=operacao)
+
+        SUPABASE_OPERACOES.inc(operacao=operacao, resultado='sucesso')
+        return result
+
+    def _lotes(self, itens: List) -> List[List]:
+        return [itens[i:i + self.tamanho_lote] for i in range(0, len(itens), self.tamanho_lote)]
+
+    @cronometrar('deduplicacao')
+    async def _buscar_existentes(self, coluna: str, valores: List[str]) -> set:
+        """
+        Retorna os valores de `coluna` que já existem na base
+
+        Args:
+            coluna: Coluna consultada (id_intimacao ou hash_conteudo)
+            valores: Valores a verificar
+
+        Returns:
+            set: Valores já existentes
+        """
+        async def consultar(lote):
+            async with self.semaforo:
+                result = await self._executar("verificar_duplicatas_lote", self.client.table(TABELA_INTIMACOES).select(coluna).in_(coluna, lote))
+            return {row[coluna] for row in result.data}
+
+        resultados = await asyncio.gather(*[consultar(lote) for lote in self._lotes(valores)])
+        return set().union(*resultados) if resultados else set()
+
+    @cronometrar('insercao')
+    async def _inserir_lote(self, lote: List[Dict], estatisticas: Dict):
+        """
+        Insere um lote; se o lote falhar, tenta as intimações individualmente
+        """
+        linhas = [preparar_dados_intimacao(intimacao) for intimacao in lote]
+
+        try:
+            async with self.semaforo:
+                result = await self._executar("inserir_lote", self.client.table(TABELA_INTIMACOES).insert(linhas))
+            estatisticas["novas_inseridas"] += len(result.data or [])
+            estatisticas["ids_inseridas"].extend(row["id_intimacao"] for row in result.data or [])
+            await self._gravar_payloads(lote, estatisticas)
+            return
+        except Exception as e:
+            self.logger.warning(f"Falha no lote de {len(lote)} intimações, inserindo individualmente: {e}")
+
+        inseridas = []
+        for intimacao, linha in zip(lote, linhas):
+            try:
+                async with self.semaforo:
+                    result = await self._executar("inserir_intimacao", self.client.table(TABELA_INTIMACOES).insert(linha))
+                if result.data:
+                    estatisticas["novas_inseridas"] += 1
+                    estatisticas["ids_inseridas"].append(linha["id_intimacao"])
+                    inseridas.append(intimacao)
+                else:
+                    estatisticas["erros"] += 1
+                    estatisticas["detalhes_erros"].append(f"Erro ao inserir {linha['id_intimacao']}")
+                    estatisticas["ids_erros"].append(linha["id_intimacao"])
+            except Exception as e:
+                estatisticas["erros"] += 1
+                estatisticas["detalhes_erros"].append(f"Erro ao inserir {linha['id_intimacao']}: {e}")
+                estatisticas["ids_erros"].append(linha["id_intimacao"])
+
+        await self._gravar_payloads(inseridas, estatisticas)
+
+    @cronometrar('payloads')
+    async def _gravar_payloads(self, intimacoes: List[Dict], estatisticas: Dict, substituir: bool = False):
+        """
+        Grava os itens brutos comprimidos na tabela fria (COMPRIMIR_PAYLOADS)
+        """
+        if not COMPRIMIR_PAYLOADS or not intimacoes:
+            return
+
+        linhas = [preparar_payload_intimacao(intimacao) for intimacao in intimacoes]
+        try:
+            async with self.semaforo:
+                await self._executar(
+                    "gravar_payloads",
+                    self.client.table(TABELA_PAYLOADS).upsert(linhas, on_conflict="id_intimacao", ignore_duplicates=not substituir)
+                )
+        except Exception as e:
+            estatisticas["detalhes_erros"].append(f"Erro ao gravar payloads de {len(linhas)} intimações: {e}")
+            self.logger.error(f"❌ Erro ao gravar payloads: {e}")
+
+    async def _obter_impressoes(self, ids_intimacao: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Returns:
+            Dict[str, Optional[str]]: impressao_digital armazenada por id_intimacao
+        """
+        async def consultar(lote):
+            async with self.semaforo:
+                result = await self._executar(
+                    "obter_impressoes",
+                    self.client.table(TABELA_INTIMACOES).select("id_intimacao, impressao_digital").in_("id_intimacao", lote)
+                )
+            return {row["id_intimacao"]: row["impressao_digital"] for row in result.data}
+
+        impressoes = {}
+        for parcial in await asyncio.gather(*[consultar(lote) for lote in self._lotes(ids_intimacao)]):
+            impressoes.update(parcial)
+        return impressoes
+
+    @cronometrar('alteracoes')
+    async def _registrar_alteracoes(self, intimacoes: List[Dict], estatisticas: Dict):
+        """
+        Grava como nova versão as intimações existentes cuja impressão digital mudou
+        (mesma função djen_registrar_alteracoes do SupabaseClient)
+        """
+        try:
+            impressoes = await self._obter_impressoes([i["id_intimacao"] for i in intimacoes])
+            alteradas = selecionar_alteradas(intimacoes, impressoes)
+
+            async def registrar(lote):
+                async with self.semaforo:
+                    result = await self._executar("registrar_alteracoes", self.client.rpc("djen_registrar_alteracoes", {
+                        "p_linhas": [preparar_alteracao(intimacao) for intimacao in lote]
+                    }))
+                return [row["alterada"] for row in result.data or []]
+
+            versionadas = set()
+            for parcial in await asyncio.gather(*[registrar(lote) for lote in self._lotes(alteradas)]):
+                versionadas.update(parcial)
+        except Exception as e:
+            estatisticas["detalhes_erros"].append(f"Erro ao registrar alterações: {e}")
+            self.logger.error(f"❌ Erro ao registrar alterações: {e}")
+            return
+
+        estatisticas["alteracoes_registradas"] = len(versionadas)
+        estatisticas["ids_alteradas"] = list(versionadas)
+        if versionadas:
+            self.logger.info(f"✏️ {len(versionadas)} intimações alteradas na origem (nova versão gravada)")
+            await self._gravar_payloads([i for i in alteradas if i["id_intimacao"] in versionadas],
+                                        estatisticas, substituir=True)
+
+    async def processar_intimacoes(self, intimacoes: List[Dict]) -> Dict:
+        """
+        Processa uma lista de intimações, verificando duplicatas e inserindo novas
+
+        Args:
+            intimacoes: Lista de intimações processadas
+
+        Returns:
+            Dict: Estatísticas do processamento (mesmo formato do SupabaseClient)
+        """
+        estatisticas = {
+            "total_processadas": len(intimacoes),
+            "novas_inseridas": 0,
+            "duplicatas_encontradas": 0,
+            "erros": 0,
+            "alteracoes_registradas": 0,
+            "detalhes_erros": [],
+            "ids_erros": [],
+            "ids_inseridas": [],
+            "ids_alteradas": []
+        }
+
+        self.logger.info(f"Processando {len(intimacoes)} intimações (async)")
+
+        try:
+            ids = [i["id_intimacao"] for i in intimacoes]
+            hashes = [i["hash_conteudo"] for i in intimacoes if i.get("hash_conteudo")]
+
+            ids_existentes, hashes_existentes = await asyncio.gather(
+                self._buscar_existentes("id_intimacao", ids),
+                self._buscar_existentes("hash_conteudo", hashes)
+            )
+        except Exception as e:
+            estatisticas["erros"] = len(intimacoes)
+            estatisticas["detalhes_erros"].append(f"Erro ao verificar duplicatas: {e}")
+            estatisticas["ids_erros"] = [i.get("id_intimacao") for i in intimacoes]
+            self.logger.error(f"Erro ao verificar duplicatas: {e}")
+            return estatisticas
+
+        novas = []
+        existentes = []
+        vistos = set()
+        for intimacao in intimacoes:
+            chave = intimacao["id_intimacao"]
+            hash_conteudo = intimacao.get("hash_conteudo")
+
+            if (chave in ids_existentes or chave in vistos
+                    or (hash_conteudo and hash_conteudo in hashes_existentes)):
+                estatisticas["duplicatas_encontradas"] += 1
+                if chave in ids_existentes and chave not in vistos:
+                    existentes.append(intimacao)
+                vistos.add(chave)
+                continue
+
+            vistos.add(chave)
+            if hash_conteudo:
+                hashes_existentes.add(hash_conteudo)
+            novas.append(intimacao)
+
+        tarefas = [self._inserir_lote(lote, estatisticas) for lote in self._lotes(novas)]
+        if DETECTAR_ALTERACOES and existentes:
+            tarefas.append(self._registrar_alteracoes(existentes, estatisticas))
+        await asyncio.gather(*tarefas)
+
+        self.logger.info(f"Processamento concluído: {estatisticas['novas_inseridas']} inseridas, "
+                         f"{estatisticas['duplicatas_encontradas']} duplicatas, "
+                         f"{estatisticas['alteracoes_registradas']} alteradas, "
+                         f"{estatisticas['erros']} erros")
+
+        return estatisticas
+
+    async def registrar_log_execucao(self, log_dados: Dict) -> bool:
+        """
+        Registra um log de execução
+
+        Args:
+            log_dados: Dados do log de execução
+
+        Returns:
+            bool: True se inserido com sucesso
+        """
+        try:
+            result = await self._executar("registrar_log", self.client.table(TABELA_LOGS).insert(preparar_dados_log(log_dados)))
+            return bool(result.data)
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar log: {e}")
+            return False
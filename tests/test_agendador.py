@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from agendador import Agendador, ExpressaoCron, cron_do_horario
+
+
+def proxima(expressao: str, apos: str) -> str:
+    return ExpressaoCron(expressao).proxima(datetime.fromisoformat(apos)).isoformat(timespec='minutes')
+
+
+@pytest.mark.parametrize("expressao, apos, esperado", [
+    # Diária: estritamente depois do instante de referência
+    ("0 6 * * *", "2025-03-10T05:59:30", "2025-03-10T06:00"),
+    ("0 6 * * *", "2025-03-10T06:00:00", "2025-03-11T06:00"),
+    # Passos e faixas em dias úteis: sexta à noite vai para segunda cedo
+    ("*/30 7-20 * * 1-5", "2025-03-12T07:10", "2025-03-12T07:30"),
+    ("*/30 7-20 * * 1-5", "2025-03-14T20:30", "2025-03-17T07:00"),
+    ("5/15 * * * *", "2025-03-10T10:50", "2025-03-10T11:05"),
+    # Dia do mês e dia da semana restritos: vale qualquer um dos dois
+    ("0 0 13 * 5", "2025-03-01T00:00", "2025-03-07T00:00"),
+    ("0 0 13 * 5", "2025-03-07T00:00", "2025-03-13T00:00"),
+    # Domingo como 7
+    ("0 9 * * 7", "2025-03-10T00:00", "2025-03-16T09:00"),
+    # Virada de mês e de ano; meses sem o dia pedido são pulados
+    ("0 0 31 * *", "2025-01-31T00:00", "2025-03-31T00:00"),
+    ("0 0 31 * *", "2025-12-31T12:00", "2026-01-31T00:00"),
+    ("0 0 29 2 *", "2025-01-01T00:00", "2028-02-29T00:00"),
+])
+def test_proxima(expressao, apos, esperado):
+    assert proxima(expressao, apos) == esperado
+
+
+def test_proxima_mantem_fuso():
+    fuso = timezone(timedelta(hours=-3))
+    resultado = ExpressaoCron("30 5 * * *").proxima(datetime(2025, 3, 10, 6, 0, tzinfo=fuso))
+    assert resultado == datetime(2025, 3, 11, 5, 30, tzinfo=fuso)
+
+
+@pytest.mark.parametrize("expressao", ["0 6 * *", "60 * * * *", "0 24 * * *", "0 0 0 * *", "0 0 * 13 *", "0 0 * * 8"])
+def test_expressao_invalida(expressao):
+    with pytest.raises(ValueError):
+        ExpressaoCron(expressao)
+
+
+def test_cron_do_horario():
+    assert cron_do_horario("06:00") == "0 6 * * *"
+    assert cron_do_horario("18:45") == "45 18 * * *"
+
+
+def test_calcular_periodo_recupera_desde_a_ultima_execucao():
+    agendamento = {'parametros': {'dias': 1}, 'recuperar_perdidas': True,
+                   'ultima_execucao': '2025-03-07T06:00:00-03:00'}
+    assert Agendador.calcular_periodo(agendamento, date(2025, 3, 10)) == ('2025-03-07', '2025-03-10')
+
+    agendamento['recuperar_perdidas'] = False
+    assert Agendador.calcular_periodo(agendamento, date(2025, 3, 10)) == ('2025-03-09', '2025-03-10')
@@ -0,0 +1,36 @@
+import io
+
+import pytest
+
+from exportacao import gerar_parquet
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.parquet  # noqa: E402
+
+
+def _ler_parquet(partes):
+    return pyarrow.parquet.read_table(io.BytesIO(b"".join(partes)))
+
+
+def test_parquet_com_id_uuid_e_versao():
+    linhas = [
+        {"id": "0b6f6f3e-8f0c-4f39-9f43-3f7f2b0a2c11", "id_intimacao": "123", "versao": 2,
+         "metadados": {"partes": ["A", "B"]}},
+        {"id": "5a1d2f4b-1c3e-4a5b-8c7d-9e0f1a2b3c4d", "id_intimacao": "456", "versao": None,
+         "metadados": None},
+    ]
+
+    tabela = _ler_parquet(gerar_parquet(iter(linhas), ["id", "id_intimacao", "versao", "metadados"]))
+
+    assert tabela.schema.field("id").type == pyarrow.string()
+    assert tabela.schema.field("versao").type == pyarrow.int64()
+    assert tabela.column("id").to_pylist() == [linhas[0]["id"], linhas[1]["id"]]
+    assert tabela.column("versao").to_pylist() == [2, None]
+    assert tabela.column("metadados").to_pylist() == ['{"partes": ["A", "B"]}', None]
+
+
+def test_parquet_sem_linhas_gera_arquivo_valido():
+    tabela = _ler_parquet(gerar_parquet(iter([]), ["id", "id_intimacao"]))
+
+    assert tabela.num_rows == 0
+    assert tabela.column_names == ["id", "id_intimacao"]
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+from prazos import CalendarioForense, em_recesso, extrair_prazos, feriados_nacionais, gerar_prazos, pascoa
+
+
+@pytest.mark.parametrize("ano, esperado", [
+    (2024, date(2024, 3, 31)),
+    (2025, date(2025, 4, 20)),
+    (2026, date(2026, 4, 5)),
+])
+def test_pascoa(ano, esperado):
+    assert pascoa(ano) == esperado
+
+
+def test_feriados_moveis_e_consciencia_negra():
+    feriados = feriados_nacionais(2025)
+    # Carnaval, Sexta-feira Santa e Corpus Christi
+    assert {date(2025, 3, 3), date(2025, 3, 4), date(2025, 4, 18), date(2025, 6, 19)} <= feriados
+    assert date(2025, 11, 20) in feriados
+    assert date(2023, 11, 20) not in feriados_nacionais(2023)
+
+
+def test_recesso_inclui_os_extremos():
+    assert em_recesso(date(2025, 12, 20)) and em_recesso(date(2026, 1, 20))
+    assert not em_recesso(date(2025, 12, 19)) and not em_recesso(date(2026, 1, 21))
+
+
+@pytest.mark.parametrize("disponibilizacao, dias, tribunal, publicacao, inicio, vencimento", [
+    # Semana sem feriados: publicação no dia útil seguinte, contagem a partir do próximo (CPC art. 224)
+    ("2025-03-10", 15, "", "2025-03-11", "2025-03-12", "2025-04-01"),
+    # Carnaval adia a publicação
+    ("2025-02-28", 5, "", "2025-03-05", "2025-03-06", "2025-03-12"),
+    # Sexta-feira Santa e Tiradentes (segunda-feira)
+    ("2025-04-17", 5, "", "2025-04-22", "2025-04-23", "2025-04-29"),
+    # Recesso de 20/12 a 20/01 suspende o início da contagem
+    ("2025-12-18", 15, "", "2025-12-19", "2026-01-21", "2026-02-10"),
+    # Feriado cadastrado só para o TRF4 (08/12)
+    ("2025-12-05", 5, "TRF4", "2025-12-09", "2025-12-10", "2025-12-16"),
+    ("2025-12-05", 5, "", "2025-12-08", "2025-12-09", "2025-12-15"),
+])
+def test_calcular_vencimento(disponibilizacao, dias, tribunal, publicacao, inicio, vencimento):
+    calendario = CalendarioForense([{"data": "2025-12-08", "tribunal": "TRF4"}])
+
+    datas = calendario.calcular_vencimento(date.fromisoformat(disponibilizacao), dias, tribunal)
+
+    assert datas == {
+        "data_publicacao_efetiva": date.fromisoformat(publicacao),
+        "data_inicio_contagem": date.fromisoformat(inicio),
+        "data_vencimento": date.fromisoformat(vencimento),
+    }
+
+
+def test_extrair_prazos_distintos_e_validos():
+    metadados = {"metadados_texto": {"prazos_encontrados": [["15", "quinze"], ["5", "cinco"], "15", ["0", ""], "abc"]}}
+    assert extrair_prazos(metadados) == [5, 15]
+    assert extrair_prazos(None) == []
+
+
+def test_gerar_prazos():
+    intimacao = {
+        "id_intimacao": "123", "numero_processo": "5000000-00.2025.4.04.7100", "tribunal": "TRF4",
+        "data_publicacao": "2025-03-10T00:00:00",
+        "metadados": {"metadados_texto": {"prazos_encontrados": [["15", "quinze"]]}},
+    }
+
+    assert gerar_prazos(intimacao, CalendarioForense()) == [{
+        "id_intimacao": "123",
+        "numero_processo": "5000000-00.2025.4.04.7100",
+        "tribunal": "TRF4",
+        "dias_prazo": 15,
+        "data_publicacao": "2025-03-10",
+        "data_publicacao_efetiva": "2025-03-11",
+        "data_inicio_contagem": "2025-03-12",
+        "data_vencimento": "2025-04-01",
+    }]
+    assert gerar_prazos({**intimacao, "data_publicacao": None}, CalendarioForense()) == []
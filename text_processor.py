@@ -2,11 +2,44 @@
 Sistema de processamento de texto para intimações do DJEN
 """
 import re
+import json
+import hashlib
 import logging
 from html import unescape
 from typing import Dict, Optional
 from datetime import datetime
 
+def normalizar_numero_processo(numero: Optional[str]) -> Optional[str]:
+    """
+    Reduz o número do processo aos 20 dígitos do padrão CNJ
+    
+    Args:
+        numero: Número com ou sem máscara (ex.: 5001234-56.2024.4.04.7100)
+        
+    Returns:
+        Optional[str]: Somente dígitos, ou None se não tiver 20 dígitos
+    """
+    digitos = re.sub(r'\D', '', numero or '')
+    return digitos if len(digitos) == 20 else None
+
+# Campos que a API altera depois da publicação (cancelamentos, retificações de texto)
+CAMPOS_MUTAVEIS = ('texto', 'status', 'ativo', 'tipoComunicacao', 'tipoDocumento')
+
+def calcular_impressao_digital(item_api: Dict) -> str:
+    """
+    Impressão digital dos campos mutáveis de um item da API
+    Gravada na ingestão; itens repetidos com impressão diferente são alterações.
+    
+    Args:
+        item_api: Item da resposta da API DJEN
+        
+    Returns:
+        str: Hash BLAKE2b de 128 bits em hexadecimal
+    """
+    campos = [item_api.get(campo) for campo in CAMPOS_MUTAVEIS]
+    serializado = json.dumps(campos, ensure_ascii=False, default=str)
+    return hashlib.blake2b(serializado.encode('utf-8'), digest_size=16).hexdigest()
+
 class TextProcessor:
     """
     Classe para processar e limpar o texto das intimações
@@ -144,9 +177,11 @@ class TextProcessor:
                 # IDs e controle
                 'id_intimacao': str(item_api.get('id', '')),
                 'hash_conteudo': item_api.get('hash', ''),
+                'impressao_digital': calcular_impressao_digital(item_api),
                 
                 # Dados principais
-                'numero_processo': item_api.get('numero_processo') or item_api.get('numeroprocessocommascara', ''),
+                'numero_processo': (item_api.get('numero_processo') or item_api.get('numeroprocessocommascara')
+                                    or metadados_texto.get('numero_processo_extraido', '')),
                 'tribunal': item_api.get('siglaTribunal', ''),
                 'orgao_julgador': item_api.get('nomeOrgao', ''),
                 'tipo_comunicacao': item_api.get('tipoComunicacao', ''),
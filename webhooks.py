@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Webhooks de saída: intimações novas empurradas para os consumidores (N8N, BI)
+O trigger trg_webhooks_saida grava as novas na fila durável (TABELA_WEBHOOKS, uma
+linha por destino ativo de TABELA_WEBHOOKS_DESTINOS e intimação) na mesma transação
+da inserção; o despachante reserva lotes, envia um POST por lote num pool limitado
+de threads e reagenda as falhas com backoff exponencial. O agendador repassa a fila
+a cada minuto para as novas tentativas:
+
+    python webhooks.py --despachar
+    python webhooks.py --receptor 9100     # receptor local para testes
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+
+from config import (
+    WEBHOOK_URLS, WEBHOOK_SEGREDO, WEBHOOK_TAMANHO_LOTE, WEBHOOK_CONCORRENCIA, WEBHOOK_TIMEOUT,
+    WEBHOOK_MAX_TENTATIVAS, WEBHOOK_BACKOFF_SEGUNDOS
+)
+from metricas import WEBHOOK_ENTREGAS, WEBHOOK_LATENCIA
+
+logger = logging.getLogger(__name__)
+
+EVENTO_NOVAS = "intimacoes.novas"
+
+
+def assinar(corpo: bytes, segredo: str) -> str:
+    """
+    Assinatura HMAC-SHA256 do corpo (cabeçalho X-DJEN-Assinatura)
+
+    Args:
+        corpo: Corpo da requisição
+        segredo: WEBHOOK_SEGREDO
+
+    Returns:
+        str: 'sha256=<hex>'
+    """
+    return "sha256=" + hmac.new(segredo.encode(), corpo, hashlib.sha256).hexdigest()
+
+
+class DespachanteWebhooks:
+    """
+    Envio em lote das intimações novas (enfileiradas pelo banco) para WEBHOOK_URLS
+
+    Várias instâncias (workers, agendador) podem despachar ao mesmo tempo: a
+    reserva no banco (djen_reservar_webhooks) entrega cada linha a uma só.
+    """
+
+    def __init__(self, cliente, urls: Optional[List[str]] = None, tamanho_lote: int = WEBHOOK_TAMANHO_LOTE,
+                 concorrencia: int = WEBHOOK_CONCORRENCIA, timeout: int = WEBHOOK_TIMEOUT,
+                 segredo: str = WEBHOOK_SEGREDO):
+        """
+        Args:
+            cliente: SupabaseClient com a fila de webhooks
+            urls: Destinos (padrão: WEBHOOK_URLS)
+            tamanho_lote: Intimações por POST
+            concorrencia: Envios simultâneos
+            timeout: Timeout de cada POST em segundos
+            segredo: Chave do HMAC (vazio = sem assinatura)
+        """
+        self.cliente = cliente
+        self.urls = list(WEBHOOK_URLS if urls is None else urls)
+        self.tamanho_lote = tamanho_lote
+        self.concorrencia = concorrencia
+        self.timeout = timeout
+        self.segredo = segredo
+        # A reserva expira se o processo morrer no meio do envio
+        self.lease_segundos = timeout * 2 + 30
+
+        self._executor = ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix='webhook')
+        self._sessao = requests.Session()
+        self._lock = threading.Lock()
+        self._em_andamento = False
+        self._repetir = False
+
+    def sincronizar_destinos(self) -> bool:
+        """
+        Ativa os destinos configurados (e desativa os que saíram) na tabela lida
+        pelo trigger de enfileiramento
+
+        Returns:
+            bool: True se sincronizado com sucesso
+        """
+        return self.cliente.sincronizar_destinos_webhooks(self.urls)
+
+    def enviar_lote(self, destino: str, entregas: List[Dict]) -> Optional[str]:
+        """
+        Envia um lote num único POST
+
+        Args:
+            destino: URL do webhook
+            entregas: Linhas reservadas da fila (mesmo destino)
+
+        Returns:
+            Optional[str]: None se o destino respondeu 2xx, senão o motivo da falha
+        """
+        corpo = json.dumps({
+            "evento": EVENTO_NOVAS,
+            "enviado_em": datetime.now().astimezone().isoformat(),
+            "total": len(entregas),
+            "intimacoes": [entrega["payload"] for entrega in entregas]
+        }, ensure_ascii=False, default=str).encode("utf-8")
+
+        cabecalhos = {"Content-Type": "application/json", "X-DJEN-Evento": EVENTO_NOVAS}
+        if self.segredo:
+            cabecalhos["X-DJEN-Assinatura"] = assinar(corpo, self.segredo)
+
+        inicio = time.perf_counter()
+        try:
+            resposta = self._sessao.post(destino, data=corpo, headers=cabecalhos, timeout=self.timeout)
+        except requests.RequestException as e:
+            return f"{type(e).__name__}: {e}"
+        finally:
+            WEBHOOK_LATENCIA.observar(time.perf_counter() - inicio)
+
+        if 200 <= resposta.status_code < 300:
+            return None
+        return f"HTTP {resposta.status_code}: {resposta.text[:200]}"
+
+    def despachar(self) -> Dict:
+        """
+        Envia tudo o que estiver vencido na fila, em rodadas de até
+        tamanho_lote x concorrencia entregas
+
+        Returns:
+            Dict: enviadas, falhas e lotes
+        """
+        estatisticas = {"enviadas": 0, "falhas": 0, "lotes": 0}
+        limite = self.tamanho_lote * self.concorrencia
+
+        while True:
+            reservadas = self.cliente.reservar_webhooks(limite, self.lease_segundos)
+            if not reservadas:
+                break
+
+            por_destino: Dict[str, List[Dict]] = {}
+            for entrega in reservadas:
+                por_destino.setdefault(entrega["destino"], []).append(entrega)
+            lotes = [
+                (destino, entregas[inicio:inicio + self.tamanho_lote])
+                for destino, entregas in por_destino.items()
+                for inicio in range(0, len(entregas), self.tamanho_lote)
+            ]
+
+            futuros = {self._executor.submit(self.enviar_lote, destino, lote): (destino, lote)
+                       for destino, lote in lotes}
+            for futuro in as_completed(futuros):
+                destino, lote = futuros[futuro]
+                ids = [entrega["id"] for entrega in lote]
+                erro = futuro.result()
+                estatisticas["lotes"] += 1
+
+                if erro is None:
+                    self.cliente.concluir_webhooks(ids)
+                    estatisticas["enviadas"] += len(lote)
+                    WEBHOOK_ENTREGAS.inc(len(lote), resultado='enviada')
+                else:
+                    logger.warning(f"⚠️ Webhook {destino} falhou para {len(lote)} intimações: {erro}")
+                    self.cliente.reagendar_webhooks(ids, erro, WEBHOOK_BACKOFF_SEGUNDOS, WEBHOOK_MAX_TENTATIVAS)
+                    estatisticas["falhas"] += len(lote)
+                    WEBHOOK_ENTREGAS.inc(len(lote), resultado='falha')
+
+            if len(reservadas) < limite:
+                break
+
+        if estatisticas["lotes"]:
+            logger.info(f"📨 Webhooks: {estatisticas['enviadas']} enviadas, {estatisticas['falhas']} com falha "
+                        f"em {estatisticas['lotes']} lotes")
+        return estatisticas
+
+    def despachar_em_segundo_plano(self) -> bool:
+        """
+        Dispara despachar() numa thread, sem bloquear a ingestão; se já houver um
+        despacho em andamento, ele faz mais uma rodada ao terminar
+
+        Returns:
+            bool: True se uma nova thread foi iniciada
+        """
+        with self._lock:
+            if self._em_andamento:
+                self._repetir = True
+                return False
+            self._em_andamento = True
+
+        def executar():
+            while True:
+                try:
+                    self.despachar()
+                except Exception as e:
+                    logger.error(f"❌ Erro ao despachar webhooks: {e}")
+                with self._lock:
+                    if not self._repetir:
+                        self._em_andamento = False
+                        return
+                    self._repetir = False
+
+        # Não-daemon: uma execução pela linha de comando espera o envio terminar
+        threading.Thread(target=executar, name='despacho-webhooks').start()
+        return True
+
+
+def receptor_local(porta: int):
+    """
+    Servidor HTTP que imprime cada lote recebido (testes dos webhooks)
+    """
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Receptor(BaseHTTPRequestHandler):
+        def do_POST(self):
+            corpo = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            dados = json.loads(corpo)
+            assinatura = self.headers.get('X-DJEN-Assinatura')
+            valida = '' if not assinatura or not WEBHOOK_SEGREDO else \
+                (' ✅' if hmac.compare_digest(assinatura, assinar(corpo, WEBHOOK_SEGREDO)) else ' ❌ assinatura')
+            print(f"📥 {dados['evento']}: {dados['total']} intimações{valida}", flush=True)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"📡 Receptor de webhooks em http://127.0.0.1:{porta}/")
+    HTTPServer(('127.0.0.1', porta), Receptor).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhooks de saída das intimações novas")
+    parser.add_argument('--sincronizar', action='store_true', help="Grava WEBHOOK_URLS como os destinos ativos")
+    parser.add_argument('--despachar', action='store_true', help="Envia as entregas pendentes da fila")
+    parser.add_argument('--resumo', action='store_true', help="Entregas por status")
+    parser.add_argument('--receptor', type=int, metavar='PORTA', help="Sobe um receptor local para testes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.receptor:
+        receptor_local(args.receptor)
+        return
+
+    from supabase_client import SupabaseClient
+    cliente = SupabaseClient()
+
+    if args.sincronizar:
+        despachante = DespachanteWebhooks(cliente)
+        print(f"{'✅' if despachante.sincronizar_destinos() else '❌'} Destinos ativos: {', '.join(despachante.urls) or '(nenhum)'}")
+    if args.despachar:
+        print(f"✅ {DespachanteWebhooks(cliente).despachar()}")
+    if args.resumo:
+        for status, total in cliente.resumo_webhooks().items():
+            print(f"{status:10} {total}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""
+Ponto de entrada WSGI para servidores de produção
+
+Exemplo:
+    gunicorn -w 4 -k gthread --threads 4 -b 0.0.0.0:8000 wsgi:app
+
+Sem --preload cada worker importa este módulo e cria seus próprios clientes.
+O agendador NÃO roda nos workers: execute `python agendador.py` em um
+processo separado para que a extração diária aconteça uma única vez.
+"""
+from api_server import app, inicializar_extractor
+
+inicializar_extractor()